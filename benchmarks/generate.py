@@ -0,0 +1,365 @@
+"""
+Generate synthetic deliveries for the benchmarks.
+
+A delivery is made from a test fixture (tests/input/check_*) and a
+configuration file: data files are tiled up to `rows * scale` rows, with a
+share of rows broken on purpose, and files whose rules store data for other
+files (dictionaries) are copied as they are. Dictionaries that other files
+depend on and the fixture does not have are taken from the other fixtures,
+or written with only their header. Headers are taken from the
+configuration file. Rows are only broken with errors the rules report, not
+with values that cancel the run. Deliveries and a manifest.json with the
+cases are written to the output directory.
+
+Usage:
+
+    python -m benchmarks.generate [--scale 1 10 100] [--rows 20000] [--error-rate 0.001] [--seed 0] [--output benchmarks/data] [fixture ...]
+"""
+import argparse
+import csv
+import fnmatch
+import json
+import os
+import random
+import shutil
+import sys
+from collections import defaultdict
+from types import SimpleNamespace
+
+from input_validator.data_validator import DataValidator
+from input_validator.plan import compile_rule_specs
+from input_validator.scheduler import get_storage_names
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+FIXTURES_PATH = os.path.join(DIR_PATH, "..", "tests", "input")
+CONFIGURATION_PATH = os.path.join(FIXTURES_PATH, "configuration_files")
+OUTPUT_PATH = os.path.join(DIR_PATH, "data")
+DATE = "20200627"  # date of the fixture file names
+# (configuration, date) of the fixtures that are not named as their configuration
+FIXTURE_CONFIGURATIONS = {
+    "diccionario_calendario": [("diccionario_tipo_dia", "20210405")],
+    "evasion": [("evasion_servicio", DATE), ("evasion_zona777", DATE)],
+}
+# fixtures of the file name and function name checks, they are not deliveries
+NOT_DELIVERIES = ["fun_name", "name_data"]
+INJECTION_ATTEMPTS = 20  # errors tried on a row before leaving it as it is
+
+
+def get_fixtures() -> list:
+    """Return the names of the delivery fixtures."""
+    return [
+        name.replace("check_", "", 1)
+        for name in sorted(os.listdir(FIXTURES_PATH))
+        if name.startswith("check_") and name.replace("check_", "", 1) not in NOT_DELIVERIES
+    ]
+
+
+def get_configurations(fixture) -> list:
+    """Return the (configuration, date) benchmark cases of a fixture.
+
+    Raises:
+        ValueError: if the fixture has no configuration file
+    """
+    configurations = FIXTURE_CONFIGURATIONS.get(fixture, [(fixture, DATE)])
+    for configuration, _ in configurations:
+        if not os.path.isfile(get_configuration_path(configuration)):
+            raise ValueError(
+                "El fixture check_{0} no tiene el archivo de configuración "
+                "configuration_{1}.json".format(fixture, configuration)
+            )
+    return configurations
+
+
+def get_configuration_path(configuration) -> str:
+    return os.path.join(CONFIGURATION_PATH, f"configuration_{configuration}.json")
+
+
+def get_file_nodes(node) -> list:
+    """Return the configuration nodes of csv files, the ones with a header."""
+    nodes = []
+    if node["path"].get("header"):
+        nodes.append(node)
+    for child in node.get("children", []):
+        nodes.extend(get_file_nodes(child))
+    return nodes
+
+
+def get_dependency_nodes(config) -> list:
+    """Return (directory, node) of the csv files named by their file name
+    that other nodes of the configuration depend on."""
+    patterns = []
+    nodes = []
+
+    def add_nodes(node, path):
+        patterns.extend(node["path"].get("dependencies", []))
+        if node["path"]["type"] == "name" and node["path"].get("header"):
+            nodes.append((path, node))
+        if node["path"]["type"] != "multi-regex":
+            path = os.path.join(path, node["path"]["name"])
+        for child in node.get("children", []):
+            add_nodes(child, path)
+
+    add_nodes(config, "")
+    return [
+        (path, node)
+        for path, node in nodes
+        if any(fnmatch.fnmatch(node["path"]["name"], pattern) for pattern in patterns)
+    ]
+
+
+def find_fixture_file(file_name):
+    """Return the path of a file of the delivery fixtures, or None."""
+    for fixture in get_fixtures():
+        for directory, _, file_names in sorted(os.walk(os.path.join(FIXTURES_PATH, f"check_{fixture}"))):
+            if file_name in file_names:
+                return os.path.join(directory, file_name)
+    return None
+
+
+def find_node(nodes, file_name):
+    """Return the configuration node whose name pattern matches a file name."""
+    for node in nodes:
+        names = node["path"]["name"]
+        if isinstance(names, str):
+            names = [names]
+        if any(fnmatch.fnmatch(file_name, name) for name in names):
+            return node
+    return None
+
+
+def get_row_checker(node, file_name):
+    """Return a function that tells if the rules of a node can check a row.
+
+    Rules that fail on a row (like a float rule on "x") cancel the run,
+    the function applies new validators of the node to the row as
+    DataValidator.check_rules does and returns False if any of them fails.
+    Storage rules read an empty storage, multi-row rules (of multi-regex
+    nodes) get the row as the rows of every file.
+
+    Args:
+        node: configuration node of the file
+        file_name: file name
+
+    Returns:
+        function: called with a row, True if its errors are reported
+    """
+    header = node["path"]["header"]
+    rule_specs = compile_rule_specs(node["rules"], header, file_name, [])
+    data_validator = SimpleNamespace(storage={})
+
+    def can_check(row) -> bool:
+        rules_dict = defaultdict(list)
+        for rule_spec in rule_specs:
+            rule_args = {**rule_spec.args, "file_name": file_name, "header": header}
+            fun_object = rule_spec.fun_class(rule_args)
+            fun_object.args["data_validator"] = data_validator
+            rules_dict[fun_object.get_fun_type().name].append(fun_object)
+        rules_lists = [rules_dict["ROW"], rules_dict["FILE"], rules_dict["STORAGE"]]
+        row_width, rules = DataValidator.compile_rules(*rules_lists)
+        if len(row) < row_width:
+            rules = [
+                [(named_fun, named_fun.apply) for named_fun in rules_list]
+                for rules_list in rules_lists
+            ]
+        try:
+            for named_fun in rules_dict["MULTIROW"]:
+                named_fun.apply([row])
+            for rules_list in rules:
+                for _, apply in rules_list:
+                    apply(row)
+        except Exception:
+            return False
+        return True
+
+    return can_check
+
+
+def inject_error(row, rng, can_check=None):
+    """Return a copy of a row with a random error.
+
+    Args:
+        row: row values
+        rng: random generator
+        can_check: function that returns True if the rules report the
+            errors of a row instead of cancelling the run, None to not check
+
+    Returns:
+        list: row with an empty value, a non ASCII value, a not valid value
+        or a missing column, None if no error the rules report was found
+    """
+    for _ in range(INJECTION_ATTEMPTS):
+        broken_row = list(row)
+        index = rng.randrange(len(broken_row))
+        kind = rng.choice(["empty", "non_ascii", "not_valid", "missing_col"])
+        if kind == "empty":
+            broken_row[index] = ""
+        elif kind == "non_ascii":
+            broken_row[index] = broken_row[index] + "ñ"
+        elif kind == "not_valid":
+            broken_row[index] = "x" * (len(broken_row[index]) + 1)
+        else:
+            del broken_row[index]
+        if can_check is None or can_check(broken_row):
+            return broken_row
+    return None
+
+
+def count_rows(path) -> int:
+    """Return the number of data rows of a csv file."""
+    with open(path, encoding="UTF-8-SIG", newline="") as file:
+        return max(sum(1 for row in csv.reader(file, delimiter=";") if row) - 1, 0)
+
+
+def write_scaled_file(source, target, header, rows, error_rate, rng, can_check=None) -> dict:
+    """Write a data file with the fixture rows repeated up to rows rows.
+
+    Args:
+        source: fixture file path
+        target: output file path
+        header: header from the configuration file
+        rows: number of data rows
+        error_rate: share of rows with an injected error
+        rng: random generator
+        can_check: row checker given to inject_error
+
+    Returns:
+        dict: number of rows and of injected errors
+    """
+    with open(source, encoding="UTF-8-SIG", newline="") as file:
+        fixture_rows = [row for row in csv.reader(file, delimiter=";") if row][1:]
+    if not fixture_rows:
+        shutil.copyfile(source, target)
+        return {"rows": 0, "errors": 0}
+
+    errors = 0
+    with open(target, "w", encoding="UTF-8", newline="") as file:
+        writer = csv.writer(file, delimiter=";", lineterminator="\n")
+        writer.writerow(header)
+        for index in range(rows):
+            row = fixture_rows[index % len(fixture_rows)]
+            if rng.random() < error_rate:
+                broken_row = inject_error(row, rng, can_check)
+                if broken_row is not None:
+                    row = broken_row
+                    errors += 1
+            writer.writerow(row)
+    return {"rows": rows, "errors": errors}
+
+
+def generate_delivery(
+    fixture, scale, rows, error_rate, seed, output, configuration=None, date=DATE
+) -> dict:
+    """Generate the delivery of a fixture at a scale.
+
+    Args:
+        fixture: fixture name, the check_ directory without prefix
+        scale: size multiplier
+        rows: data rows per file at scale 1
+        error_rate: share of rows with an injected error
+        seed: random seed
+        output: output directory
+        configuration: configuration name, the fixture name by default
+        date: date of the delivery
+
+    Returns:
+        dict: benchmark case
+    """
+    configuration = configuration or fixture
+    name = f"{configuration}_{scale}x"
+    configuration = get_configuration_path(configuration)
+    with open(configuration, encoding="UTF-8-SIG") as file:
+        config = json.load(file)
+    nodes = get_file_nodes(config)
+    fixture_path = os.path.join(FIXTURES_PATH, f"check_{fixture}")
+    data_path = os.path.join(output, name)
+    shutil.rmtree(data_path, ignore_errors=True)
+    rng = random.Random(f"{seed}-{name}")
+
+    files = {}
+    for directory, _, file_names in sorted(os.walk(fixture_path)):
+        target_directory = os.path.join(data_path, os.path.relpath(directory, fixture_path))
+        os.makedirs(target_directory, exist_ok=True)
+        for file_name in sorted(file_names):
+            source = os.path.join(directory, file_name)
+            target = os.path.join(target_directory, file_name)
+            node = find_node(nodes, file_name)
+            if node is None or node["rules"] is None:
+                shutil.copyfile(source, target)
+                continue
+            # dictionaries are read by other files, they keep their size
+            if get_storage_names(node["rules"])[0]:
+                shutil.copyfile(source, target)
+                files[file_name] = {"rows": count_rows(source), "errors": 0}
+                continue
+            files[file_name] = write_scaled_file(
+                source,
+                target,
+                node["path"]["header"],
+                rows * scale,
+                error_rate,
+                rng,
+                get_row_checker(node, file_name),
+            )
+    # without its dependencies a file is not validated
+    for directory, node in get_dependency_nodes(config):
+        file_name = node["path"]["name"]
+        target = os.path.join(data_path, directory, file_name)
+        if os.path.exists(target):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        source = find_fixture_file(file_name)
+        if source:
+            shutil.copyfile(source, target)
+        else:
+            with open(target, "w", encoding="UTF-8", newline="") as file:
+                csv.writer(file, delimiter=";", lineterminator="\n").writerow(
+                    node["path"]["header"]
+                )
+        files[file_name] = {"rows": count_rows(target), "errors": 0}
+    return {
+        "name": name,
+        "configuration": os.path.abspath(configuration),
+        "data_path": os.path.abspath(data_path),
+        "date": date,
+        "files": files,
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="generate benchmark deliveries.")
+    parser.add_argument("fixtures", nargs="*", help="fixtures to use, all by default")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument(
+        "--rows", type=int, default=20000, help="data rows per file at scale 1"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.001, help="share of rows with an error"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args(argv[1:])
+
+    cases = [
+        generate_delivery(
+            fixture,
+            scale,
+            args.rows,
+            args.error_rate,
+            args.seed,
+            args.output,
+            configuration,
+            date,
+        )
+        for fixture in args.fixtures or get_fixtures()
+        for configuration, date in get_configurations(fixture)
+        for scale in args.scale
+    ]
+    with open(os.path.join(args.output, "manifest.json"), "w", encoding="UTF-8") as file:
+        json.dump(cases, file, indent=2)
+    for case in cases:
+        rows = sum(file["rows"] for file in case["files"].values())
+        print(f"{case['name']}: {len(case['files'])} archivos, {rows} filas")
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,199 @@
+"""
+Time the validation of the deliveries made by benchmarks.generate.
+
+Every case is validated in a new process, so its peak RSS is its own. The
+time of every file and rows per second are reported, with --per-rule the
+profile counters of every rule too, which makes the run slower. Results can be saved
+and compared with a baseline, the run fails if a file is slower than the
+baseline by more than the tolerance. A case that fails is recorded with its
+error and the other cases are still run, the run fails too.
+
+Usage:
+
+    python -m benchmarks.run [--data benchmarks/data] [--engine row] [--jobs 1] [--per-rule] [--output results.json] [--baseline results.json] [--tolerance 0.2] [case ...]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from input_validator.configuration import ConfigFromFile
+from input_validator.data_validator import DataValidator
+from input_validator.profiling import Profiler
+from input_validator.sinks import CsvErrorSink
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+DATA_PATH = os.path.join(DIR_PATH, "data")
+
+
+def run_case(case, engine="row", jobs=1, per_rule=False) -> dict:
+    """Validate a benchmark case.
+
+    Args:
+        case: case from the manifest
+        engine: row or chunked engine
+        jobs: number of processes
+        per_rule: count the time of every rule
+
+    Returns:
+        dict: total time, rows, peak RSS in KB, the times of every file and
+        the counters of every rule
+    """
+    profiler = Profiler(validators=per_rule)
+    with CsvErrorSink(os.devnull) as error_sink:
+        data_validator = DataValidator(
+            ConfigFromFile(case["configuration"]),
+            case["data_path"],
+            case["date"],
+            engine=engine,
+            jobs=jobs,
+            error_sink=error_sink,
+            profiler=profiler,
+        )
+        start = time.perf_counter()
+        data_validator.start_iteration_over_configuration_tree()
+        seconds = time.perf_counter() - start
+
+    profile = profiler.to_dict()
+    files = {
+        # the files of a multi-regex node are read together
+        stats["file"]: {
+            "rows": sum(
+                case["files"].get(file_name, {}).get("rows", 0)
+                for file_name in stats["file"].split(", ")
+            ),
+            "seconds": stats["seconds"],
+        }
+        for stats in profile["files"]
+    }
+    return {
+        "name": case["name"],
+        "seconds": seconds,
+        "rows": sum(file["rows"] for file in case["files"].values()),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if resource
+        else None,
+        "files": files,
+        "rules": profile["validators"],
+    }
+
+
+def get_rows_per_second(rows, seconds):
+    return rows / seconds if seconds else None
+
+
+def find_regressions(results, baseline, tolerance) -> list:
+    """Return the files with less rows per second than the baseline.
+
+    Args:
+        results: results of this run
+        baseline: results of a previous run
+        tolerance: allowed slowdown, 0.2 is 20 % less rows per second
+
+    Returns:
+        list: (case, file, baseline rows/s, rows/s)
+    """
+    baseline_cases = {result["name"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        baseline_result = baseline_cases.get(result["name"])
+        if baseline_result is None or "error" in result or "error" in baseline_result:
+            continue
+        for name, file in result["files"].items():
+            baseline_file = baseline_result["files"].get(name)
+            if baseline_file is None:
+                continue
+            speed = get_rows_per_second(file["rows"], file["seconds"])
+            baseline_speed = get_rows_per_second(
+                baseline_file["rows"], baseline_file["seconds"]
+            )
+            if speed and baseline_speed and speed < baseline_speed * (1 - tolerance):
+                regressions.append((result["name"], name, baseline_speed, speed))
+    return regressions
+
+
+def print_result(result) -> None:
+    if "error" in result:
+        print("{0}: falló, {1}".format(result["name"], result["error"]))
+        return
+    print(
+        "{0}: {1:.2f} s, {2} filas, {3} KB RSS".format(
+            result["name"], result["seconds"], result["rows"], result["peak_rss_kb"]
+        )
+    )
+    for name, file in result["files"].items():
+        speed = get_rows_per_second(file["rows"], file["seconds"])
+        if speed is not None:
+            print(
+                "    {0}: {1:.3f} s, {2:.0f} filas/s".format(name, file["seconds"], speed)
+            )
+        for rule in result["rules"]:
+            if rule["file"] == name:
+                print(
+                    "        {0}: {1:.3f} s, {2} llamadas, {3} fallas".format(
+                        rule["rule"], rule["seconds"], rule["calls"], rule["failures"]
+                    )
+                )
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="time benchmark deliveries.")
+    parser.add_argument("cases", nargs="*", help="cases to run, all by default")
+    parser.add_argument("--data", default=DATA_PATH, help="benchmarks.generate output")
+    parser.add_argument("--engine", choices=["row", "chunked"], default="row")
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--per-rule", action="store_true", help="time every rule")
+    parser.add_argument("--output", help="json file to save the results")
+    parser.add_argument("--baseline", help="results json file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv[1:])
+
+    with open(os.path.join(args.data, "manifest.json"), encoding="UTF-8") as file:
+        cases = json.load(file)
+    if args.cases:
+        cases = [case for case in cases if case["name"] in args.cases]
+
+    results = []
+    for case in cases:
+        try:
+            # a new process per case, so peak RSS is measured for the case alone
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=get_context("spawn")
+            ) as executor:
+                result = executor.submit(
+                    run_case, case, args.engine, args.jobs, args.per_rule
+                ).result()
+        except (Exception, SystemExit) as e:
+            # a cancelled validation does not stop the other cases
+            result = {"name": case["name"], "error": str(e) or type(e).__name__}
+        print_result(result)
+        results.append(result)
+    failed = any("error" in result for result in results)
+
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="UTF-8") as file:
+            regressions = find_regressions(results, json.load(file), args.tolerance)
+        for case_name, name, baseline_speed, speed in regressions:
+            print(
+                "Regresión en {0}, {1}: {2:.0f} filas/s, antes {3:.0f} filas/s".format(
+                    case_name, name, speed, baseline_speed
+                )
+            )
+        if regressions:
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -2,21 +2,30 @@ import argparse
 import logging
 import os
 import pathlib
-import shutil
 import sys
 import zipfile
 
 from pyfiglet import Figlet
 
-from input_validator.configuration import ConfigFromFile, ConfigFromString
+from input_validator.cache import ResultCache
 from input_validator.data_validator import DataValidator
-from input_validator.utils import write_errors_to_csv
+from input_validator.filesystem import LocalFileSystem, ZipFileSystem
+from input_validator.plan import PlanError, load_plan
+from input_validator.profiling import Profiler
+from input_validator.sinks import (
+    CappedErrorSink,
+    LogErrorSink,
+    RunLengthErrorSink,
+    TeeErrorSink,
+    error_sinks,
+)
 
 logger = logging.getLogger(__name__)
 
 DIR_PATH = os.path.dirname(os.path.realpath(__file__))
 INPUTS_PATH = os.path.join(DIR_PATH, "input")
 OUTPUT_PATH = os.path.join(DIR_PATH, "output")
+CACHE_PATH = os.path.join(DIR_PATH, "cache")
 OUTPUT_NAME = "errores.csv"
 CONFIG_PATH = os.path.join(INPUTS_PATH, "configuration.json")
 
@@ -43,61 +52,223 @@ def main(argv):
     parser.add_argument(
         "-v", "--verbose", help="increase output verbosity", action="store_true"
     )
+    parser.add_argument(
+        "--engine",
+        choices=["row", "chunked"],
+        default="row",
+        help="validate files row by row or in chunks of rows",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1024,
+        help="number of rows per chunk when the chunked engine is used",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of processes used to validate independent files",
+    )
+    parser.add_argument(
+        "--split-size",
+        type=int,
+        default=128,
+        metavar="MB",
+        help="with --jobs, stateless rules of files of at least MB megabytes are checked over byte ranges of the file in parallel, 0 to never split files",
+    )
+    parser.add_argument(
+        "--format",
+        choices=list(error_sinks),
+        default="csv",
+        help="report file format, errors are written while files are validated",
+    )
+    parser.add_argument(
+        "--no-row-ranges",
+        action="store_true",
+        help="report every failing row, errors of a rule in consecutive rows are merged by default",
+    )
+    parser.add_argument(
+        "--max-errors-per-file",
+        type=int,
+        help="max errors reported per file, the rest are counted in the summary",
+    )
+    parser.add_argument(
+        "--max-errors-per-rule",
+        type=int,
+        help="max errors reported per rule of a file",
+    )
+    parser.add_argument(
+        "--max-errors-per-column",
+        type=int,
+        help="max errors reported per rule and column(s) of a file",
+    )
+    parser.add_argument(
+        "--preflight",
+        type=int,
+        nargs="?",
+        const=100,
+        metavar="LINES",
+        help="only check file names, headers and the UTF-8 encoding of the first LINES lines of every file (100 by default)",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        type=int,
+        metavar="K",
+        help="stop validating a file after its first K errors",
+    )
+    parser.add_argument(
+        "--fail-fast-scope",
+        choices=["file", "run"],
+        default="file",
+        help="stop each file, or the whole run, after the first K errors of --fail-fast",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="validate every file and compile the configuration, results of files that did not change and the compiled configuration are reused by default",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=CACHE_PATH,
+        help="directory of the results and configuration cache",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        help="max size of the results cache in MB, the least recently used results are removed",
+    )
+    parser.add_argument(
+        "--storage-snapshot",
+        help="file where a full validation saves the stored dictionary data, a validation of a list of paths loads it",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="count calls, failures and time of every validator and the read time of every file",
+    )
+    parser.add_argument(
+        "--profile-output",
+        help="json file to save the profile counters, used with --profile",
+    )
 
     args = parser.parse_args(argv[1:])
+    if args.preflight is not None and args.preflight < 0:
+        parser.error("--preflight no puede ser negativo")
+    if args.fail_fast is not None and args.fail_fast < 1:
+        parser.error("--fail-fast debe ser mayor que 0")
+    if args.split_size < 0:
+        parser.error("--split-size no puede ser negativo")
     output_name = args.output
     configuration_file_content = args.parser
     is_path_list = len(args.path) > 1
 
+    file_system = LocalFileSystem()
     if is_path_list:
         input_path = args.path
     else:
         input_path = args.path[0]
         if zipfile.is_zipfile(input_path):
-            with zipfile.ZipFile(input_path, "r") as zip_ref:
-                temporal_path = os.path.join(INPUTS_PATH, "tmp")
-                zip_ref.extractall(temporal_path)
-                input_path = os.path.join(temporal_path, zip_ref.namelist()[0].replace("/", ""))
+            # zip members are read in place, the zip file is not extracted
+            file_system = ZipFileSystem(input_path)
+            input_path = file_system.names[0].replace("/", "")
 
     # date with file format
     date = pathlib.Path(args.path[0]).stem.replace("-", "")
     output_name = f'{date}_{output_name}'
-
-    if configuration_file_content is None:
-        config_obj = ConfigFromFile(CONFIG_PATH)
-    else:
-        configuration_file_content = configuration_file_content.replace('\'', '"')
-        config_obj = ConfigFromString(configuration_file_content)
-    data_validator = DataValidator(config_obj, input_path, date, logger=logger)
-
-    if is_path_list:
-        data_validator.start_iteration_over_path_list()
-    else:
-        data_validator.start_iteration_over_configuration_tree()
-
-    # for success in validator.report:
-    #    logger.info("{0} found in {1}".format(success[0], success[1]))
-    if args.verbose:
-        for key, value in data_validator.report_errors.items():
-            logger.error(f"{key} contiene los siguientes errores:")
-            for error in value:
-                logger.error(error)
+    if args.format != "csv":
+        output_name = f'{os.path.splitext(output_name)[0]}.{args.format}'
 
     # increase validation version automatically
     while True:
         file_path = os.path.join(OUTPUT_PATH, output_name)
         if os.path.isfile(file_path):
-            date, version, name = output_name.split('_')
+            output_date, version, name = output_name.split('_')
             version = int(version.replace('v', '')) + 1
-            output_name = f'{date}_v{version}_{name}'
+            output_name = f'{output_date}_v{version}_{name}'
         else:
             break
 
-    write_errors_to_csv(file_path, data_validator)
+    if configuration_file_content is None:
+        with open(CONFIG_PATH, encoding="utf-8-SIG") as json_config:
+            configuration_file_content = json_config.read()
+    else:
+        configuration_file_content = configuration_file_content.replace('\'', '"')
+    # the configuration is compiled, or read from the plan cache, before any file is read
+    try:
+        config_obj = load_plan(
+            configuration_file_content,
+            None if args.no_cache else os.path.join(args.cache_dir, "plans"),
+        )
+    except PlanError as e:
+        logger.error("Archivo de configuración mal formado")
+        logger.error(str(e))
+        sys.exit("Procesamiento cancelado.")
+
+    # errors are written to the report while files are validated
+    try:
+        if error_sinks[args.format].appends:
+            # reports of every date are added to the same file
+            report_name = os.path.splitext(output_name)[0]
+            file_path = os.path.join(
+                OUTPUT_PATH, f'{os.path.splitext(args.output)[0]}.{args.format}'
+            )
+            error_sink = error_sinks[args.format](file_path, report_name=report_name)
+        else:
+            error_sink = error_sinks[args.format](file_path)
+    except ImportError as e:
+        parser.error(str(e))
+    if args.verbose:
+        error_sink = TeeErrorSink(error_sink, LogErrorSink(logger))
+    if not args.no_row_ranges:
+        error_sink = RunLengthErrorSink(error_sink)
+    error_caps = [
+        args.max_errors_per_file,
+        args.max_errors_per_rule,
+        args.max_errors_per_column,
+    ]
+    if any(cap is not None for cap in error_caps) or error_sinks[args.format].summarized:
+        # capped errors are counted in a summary section of the report, formats
+        # with a summary table get it without caps too
+        error_sink = CappedErrorSink(error_sink, *error_caps)
+    profiler = Profiler() if args.profile else None
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    with error_sink:
+        data_validator = DataValidator(
+            config_obj,
+            input_path,
+            date,
+            logger=logger,
+            engine=args.engine,
+            chunk_size=args.chunk_size,
+            jobs=args.jobs,
+            file_system=file_system,
+            error_sink=error_sink,
+            profiler=profiler,
+            preflight_lines=args.preflight,
+            fail_fast=args.fail_fast,
+            fail_fast_run=args.fail_fast_scope == "run",
+            cache=cache,
+            storage_snapshot=args.storage_snapshot,
+            split_size=args.split_size * 1024 * 1024 if args.split_size else None,
+        )
+
+        if is_path_list:
+            data_validator.start_iteration_over_path_list()
+        else:
+            data_validator.start_iteration_over_configuration_tree()
+
+    # for success in validator.report:
+    #    logger.info("{0} found in {1}".format(success[0], success[1]))
+    file_system.close()
 
-    tmp_file_path = os.path.join(INPUTS_PATH, "tmp")
-    if not is_path_list and os.path.exists(tmp_file_path):
-        shutil.rmtree(tmp_file_path)
+    if profiler:
+        logger.info("Perfil de la validación:\n{0}".format(profiler.format_table()))
+        if args.profile_output:
+            profiler.write_json(args.profile_output)
 
     logger.info('Archivos procesados, los resultados se encuentran en {0}'.format(file_path))
 
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+
+from input_validator.errors import CachedErrorRecord, ErrorRecord
+from input_validator.sinks import ErrorSink
+
+MAX_CACHED_ERRORS = 100000  # files with more errors are not cached
+
+
+@lru_cache(maxsize=None)
+def get_code_version() -> str:
+    """Return a hash of the package sources, so results cached by another
+    version of the validators are not used."""
+    digest = hashlib.sha256()
+    package_path = os.path.dirname(os.path.realpath(__file__))
+    for name in sorted(os.listdir(package_path)):
+        if name.endswith(".py"):
+            digest.update(name.encode("utf-8"))
+            with open(os.path.join(package_path, name), "rb") as file:
+                digest.update(file.read())
+    return digest.hexdigest()
+
+
+def hash_file(file) -> str:
+    """Return the sha256 hash of the content of a binary file."""
+    digest = hashlib.sha256()
+    for block in iter(lambda: file.read(1 << 20), b""):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def get_rules_hash(name, rules, header) -> str:
+    """Return the hash of the rules of a file, as written in the configuration file."""
+    rules_json = json.dumps([name, rules, header], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(rules_json.encode("utf-8")).hexdigest()
+
+
+def pack_errors(errors) -> list:
+    """Return errors as (rule index, col indexes, error dict, rule columns)
+    tuples.
+
+    Records of the same validator get the same rule index, error dicts have
+    no rule.
+    """
+    rules = {}
+    packed_errors = []
+    for error in errors:
+        if isinstance(error, ErrorRecord):
+            rule = rules.get(id(error.validator))
+            if rule is None:
+                rule = rules[id(error.validator)] = (
+                    len(rules),
+                    error.validator.get_rule_columns(),
+                )
+            packed_errors.append((rule[0], error.columns, error.render(), rule[1]))
+        else:
+            packed_errors.append((None, None, error, None))
+    return packed_errors
+
+
+def unpack_errors(packed_errors) -> list:
+    """Return the errors of pack_errors as cached error records and error dicts."""
+    return [
+        error
+        if rule is None
+        else CachedErrorRecord((rule, error["name"]), columns, error, rule_columns)
+        for rule, columns, error, rule_columns in packed_errors
+    ]
+
+
+class RecordingErrorSink(ErrorSink):
+    """Write errors to a sink and keep them to cache them.
+
+    Only the first max_errors errors are kept, if a file has more errors
+    its result is not cached.
+    """
+
+    def __init__(self, error_sink, max_errors=MAX_CACHED_ERRORS):
+        """
+        Args:
+            error_sink: sink to write the errors
+            max_errors: max errors kept
+        """
+        self.error_sink = error_sink
+        self.max_errors = max_errors
+        self.errors = []
+        self.complete = True
+
+    @property
+    def caps(self):
+        return self.error_sink.caps
+
+    def write(self, name, error) -> None:
+        self.error_sink.write(name, error)
+        if not self.complete:
+            return
+        if len(self.errors) >= self.max_errors:
+            self.complete = False
+            self.errors = []
+        else:
+            self.errors.append(error)
+
+    def write_summary(self, summaries) -> None:
+        self.error_sink.write_summary(summaries)
+
+    def flush(self) -> None:
+        self.error_sink.flush()
+
+
+class ResultCache:
+    """Errors and storage of validated files, saved on disk.
+
+    Entries are keyed by the hash of the file content, of its rules and of
+    the validators code, so a file that did not change between deliveries
+    is not read again. Entries are pickle files in a directory; when the
+    directory grows over max_size bytes, the least recently used entries
+    are removed.
+    """
+
+    def __init__(self, cache_path, max_size=1024 * 1024 * 1024):
+        """
+        Args:
+            cache_path: cache directory, it is created if it does not exist
+            max_size: max size of the directory in bytes
+        """
+        self.cache_path = cache_path
+        self.max_size = max_size
+
+    def get_key(self, file_hash, rules_hash) -> str:
+        key = "{0}-{1}-{2}".format(file_hash, rules_hash, get_code_version())
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get_entry_path(self, key) -> str:
+        return os.path.join(self.cache_path, "{0}.pickle".format(key))
+
+    def get(self, key):
+        """Return the cached result of a key, or None.
+
+        Returns:
+            dict: errors and storage of the file
+        """
+        entry_path = self.get_entry_path(key)
+        try:
+            with open(entry_path, "rb") as file:
+                result = pickle.load(file)
+            # entries are evicted by last use
+            os.utime(entry_path)
+            result["errors"] = unpack_errors(result["errors"])
+        except Exception:
+            # a missing or broken entry, the file is validated again
+            return None
+        return result
+
+    def put(self, key, errors, storage) -> None:
+        """Save the result of a file and evict old entries.
+
+        Args:
+            key: cache key
+            errors: error dicts or error records of the file
+            storage: storage written by the rules of the file
+        """
+        os.makedirs(self.cache_path, exist_ok=True)
+        data = pickle.dumps(
+            {"errors": pack_errors(errors), "storage": storage},
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        if len(data) > self.max_size:
+            return
+        # written to a temporary file first, workers may read the entry
+        file_descriptor, temporal_path = tempfile.mkstemp(dir=self.cache_path, suffix=".tmp")
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(data)
+        os.replace(temporal_path, self.get_entry_path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries over max_size bytes."""
+        entries = []
+        with os.scandir(self.cache_path) as directory:
+            for entry in directory:
+                if not entry.name.endswith(".pickle"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, entry_path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
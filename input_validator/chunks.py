@@ -0,0 +1,237 @@
+import bisect
+import io
+
+
+class RowChunk:
+    """A block of csv rows that validators can read column by column."""
+
+    def __init__(self, rows: list):
+        """
+        Args:
+            rows: list of csv rows
+        """
+        self.rows = rows
+        self._columns = {}
+        self._widths = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def widths(self) -> list:
+        """Number of columns of every row."""
+        if self._widths is None:
+            self._widths = [len(row) for row in self.rows]
+        return self._widths
+
+    @property
+    def min_width(self) -> int:
+        return min(self.widths, default=0)
+
+    def column(self, index: int) -> list:
+        """Return the values of a column, all rows must have it.
+
+        Args:
+            index: column index
+
+        Returns:
+            list: column values
+        """
+        column = self._columns.get(index)
+        if column is None:
+            column = [row[index] for row in self.rows]
+            self._columns[index] = column
+        return column
+
+    def get_wide_rows(self, width: int) -> tuple:
+        """Return the rows with at least `width` columns.
+
+        Args:
+            width: minimal number of columns
+
+        Returns:
+            tuple: (chunk with the wide rows, offsets of those rows in this chunk)
+        """
+        if self.min_width >= width:
+            return self, range(len(self.rows))
+        offsets = [offset for offset, row_width in enumerate(self.widths) if row_width >= width]
+        return RowChunk([self.rows[offset] for offset in offsets]), offsets
+
+
+def read_chunks(csv_reader, chunk_size: int):
+    """Read a csv reader in lists of `chunk_size` rows.
+
+    If the reader fails, the rows read before the error are returned first
+    and then the error is raised.
+
+    Args:
+        csv_reader: csv reader
+        chunk_size: number of rows per chunk
+
+    Returns:
+        generator: lists of rows
+    """
+    rows = []
+    try:
+        for row in csv_reader:
+            rows.append(row)
+            if len(rows) == chunk_size:
+                yield rows
+                rows = []
+    except Exception:
+        if rows:
+            yield rows
+        raise
+    if rows:
+        yield rows
+
+
+def find_quote_toggles(block: bytes, quoted: bool, previous: bytes) -> tuple:
+    """Find where quoted fields open and close in a block of a csv file.
+
+    As in the csv module, a quote opens a quoted field only at the start of
+    a field, other quotes of an unquoted field are part of its value, and a
+    quoted field closes at a quote that is not doubled.
+
+    Args:
+        block: bytes of the file, not ending in a quote
+        quoted: True if the block starts inside a quoted field
+        previous: byte before the block, b"" at the file start
+
+    Returns:
+        tuple: (offsets of the quotes that open or close a quoted field,
+        True if the block ends inside a quoted field)
+    """
+    toggles = []
+    index = block.find(b'"')
+    while index != -1:
+        if quoted:
+            if block[index + 1 : index + 2] == b'"':
+                # an escaped quote
+                index = block.find(b'"', index + 2)
+                continue
+            quoted = False
+            toggles.append(index)
+        elif (block[index - 1 : index] if index else previous) in (b"", b";", b"\n", b"\r"):
+            quoted = True
+            toggles.append(index)
+        index = block.find(b'"', index + 1)
+    return toggles, quoted
+
+
+def find_row_starts(file, offsets: list, block_size: int = 1 << 20) -> list:
+    """Return the first csv row start at or after every offset of a file.
+
+    Rows start at the beginning of the file and after every newline that is
+    not inside a quoted field, so the file is read from its start following
+    its quoted fields.
+
+    Args:
+        file: csv file opened as bytes, at its start
+        offsets: byte offsets, in increasing order
+        block_size: bytes read at once
+
+    Returns:
+        list: a row start per offset, the file size for offsets after the
+        last row start
+    """
+    starts = []
+    pending = iter(offsets)
+    offset = next(pending, None)
+    while offset == 0:
+        starts.append(0)
+        offset = next(pending, None)
+    position = 0
+    quoted = False
+    previous = b""
+    while offset is not None:
+        block = file.read(block_size)
+        if not block:
+            break
+        # an escaped quote is not split between blocks
+        while block.endswith(b'"'):
+            next_byte = file.read(1)
+            if not next_byte:
+                break
+            block += next_byte
+        toggles, next_quoted = find_quote_toggles(block, quoted, previous)
+        newline = block.find(b"\n", max(offset - 1 - position, 0))
+        while offset is not None and newline != -1:
+            if quoted ^ (bisect.bisect(toggles, newline) % 2 == 1):
+                # the newline is inside a quoted field
+                newline = block.find(b"\n", newline + 1)
+                continue
+            start = position + newline + 1
+            while offset is not None and offset <= start:
+                starts.append(start)
+                offset = next(pending, None)
+            if offset is not None:
+                newline = block.find(b"\n", max(offset - 1 - position, newline + 1))
+        quoted = next_quoted
+        previous = block[-1:]
+        position += len(block)
+    while offset is not None:
+        starts.append(position)
+        offset = next(pending, None)
+    return starts
+
+
+def split_byte_ranges(file, size: int, parts: int) -> list:
+    """Split the rows of a csv file after its header in byte ranges.
+
+    Ranges start and end at row starts, so every range can be read on its
+    own as a csv file.
+
+    Args:
+        file: csv file opened as bytes, at its start
+        size: file size in bytes
+        parts: number of ranges, ranges of a small file can be less
+
+    Returns:
+        list: (start, end) byte offsets of every range, in file order
+    """
+    starts = find_row_starts(file, [1] + [size * part // parts for part in range(1, parts)])
+    # the first row start after offset 1 is the end of the header
+    starts = sorted(set(starts)) + [size]
+    return [(start, end) for start, end in zip(starts, starts[1:]) if start < end]
+
+
+class ByteRange(io.RawIOBase):
+    """A byte range of a binary file, read as a file of its own."""
+
+    def __init__(self, file, start: int, end: int):
+        """
+        Args:
+            file: file opened as bytes, it is not closed with the range
+            start: first byte offset
+            end: byte offset after the range
+        """
+        super().__init__()
+        file.seek(start)
+        self.file = file
+        self.remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.file.read(min(len(buffer), self.remaining))
+        buffer[: len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+def open_byte_range(file, start: int, end: int):
+    """Open a byte range of a csv file as UTF-8 text.
+
+    Args:
+        file: csv file opened as bytes
+        start: first byte offset, a row start
+        end: byte offset after the range, a row start
+
+    Returns:
+        file object
+    """
+    return io.TextIOWrapper(
+        io.BufferedReader(ByteRange(file, start, end)), encoding="UTF-8", errors="strict"
+    )
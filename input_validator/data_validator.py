@@ -1,10 +1,31 @@
 import csv
 import fnmatch
+import heapq
+import itertools
 import os
+import pickle
 import sys
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 
+from input_validator.cache import RecordingErrorSink, get_rules_hash, hash_file
+from input_validator.chunks import RowChunk, open_byte_range, read_chunks, split_byte_ranges
+from input_validator.configuration import ConfigFromString
+from input_validator.errors import ErrorRecord, render_error
+from input_validator.filesystem import LocalFileSystem
+from input_validator.plan import ExecutionPlan, PlanError, compile_plan, compile_rule_specs
+from input_validator.scheduler import NodeScheduler, get_storage_names
+from input_validator.sinks import (
+    CappedErrorSink,
+    FailFastReport,
+    MemoryErrorSink,
+    StreamingReport,
+)
+from input_validator.storage import load_storage_snapshot, save_storage_snapshot
 from input_validator.validators import (
+    FunType,
     HeaderValidator,
     NotEmptyRowValidator,
     check_name_functions,
@@ -15,17 +36,78 @@ from input_validator.validators import (
 class DataValidator:
     """A class to iterate over a tree configuration json file and validate data"""
 
-    def __init__(self, config_obj, data_path, date, logger=None):
+    def __init__(
+        self,
+        config_obj,
+        data_path,
+        date,
+        logger=None,
+        engine="row",
+        chunk_size=1024,
+        jobs=1,
+        file_system=None,
+        error_sink=None,
+        profiler=None,
+        preflight_lines=None,
+        fail_fast=None,
+        fail_fast_run=False,
+        cache=None,
+        storage_snapshot=None,
+        split_size=None,
+    ):
         self.config = config_obj.get_config()
-        self.report_errors = defaultdict(list)
+        # compiled configuration, a plan can be given as the configuration
+        self.plan = config_obj if isinstance(config_obj, ExecutionPlan) else None
+        self.error_records = defaultdict(list)
         self.report = []
         self.data_path = data_path
         self.path_list_dict = []
+        self.path_list_positions = []
         self.storage = {}
         self.log = logger
         self.temp_name = None
         self.files_checked = set()
         self.date = date
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.jobs = jobs
+        self.file_system = file_system or LocalFileSystem()
+        self.scheduler = None
+        self.error_sink = error_sink
+        self.profiler = profiler
+        # only names, headers and the first lines of files are checked
+        self.preflight_lines = preflight_lines
+        # errors that stop a file, or the whole run with fail_fast_run
+        self.fail_fast = fail_fast
+        self.fail_fast_run = fail_fast_run
+        self.errors_count = 0
+        # ResultCache of unchanged files, or None
+        self.cache = cache
+        # storage file saved by a full run and loaded by a path list run
+        self.storage_snapshot = storage_snapshot
+        # files of at least split_size bytes have their stateless rules
+        # checked over byte ranges in range_executor, None to never split
+        self.split_size = split_size
+        self.range_executor = None
+
+    @property
+    def report_errors(self) -> defaultdict:
+        """Errors by file name as error dicts.
+
+        Errors are stored as error records in error_records, this view
+        renders all of them, use iter_errors to render one at a time. Errors
+        written to an error sink are not kept.
+        """
+        report_errors = defaultdict(list)
+        for name, error in self.iter_errors():
+            report_errors[name].append(error)
+        return report_errors
+
+    def iter_errors(self):
+        """Yield (file name, error dict) for every error, in report order."""
+        for name, errors in self.error_records.items():
+            for error in errors:
+                yield name, render_error(error)
 
     def configuration_file_error(self, exception: Exception):
         """Send a file error message to the log and exit the program
@@ -38,17 +120,6 @@ class DataValidator:
             self.log.error(str(exception))
         sys.exit("Procesamiento cancelado.")
 
-    def configuration_fun_error(self, exception: Exception, fun_name: str):
-        """Send a function's name error message to the log and exit the program.
-
-        Args:
-            exception: function's exception
-            fun_name: function's name that throws the exception
-        """
-        if self.log:
-            self.log.error("Nombre de función '{0}' no válida.".format(fun_name))
-        self.configuration_file_error(exception)
-
     def configuration_args_error(self, exception: Exception, fun_name: str):
         """Send a function's args error message to the log and exit the program.
 
@@ -65,10 +136,190 @@ class DataValidator:
         self.configuration_file_error(exception)
 
     def start_iteration_over_configuration_tree(self):
-        """Start the iteration over a configuration file."""
-        self.iterate_over_configuration_tree(self.config, "")
+        """Start the iteration over a configuration file.
+
+        With more than one job, node rules are validated in a process pool.
+        With a storage snapshot, the storage is saved when the run ends, if
+        every file was read to its end.
+        """
+        self.compile_configuration()
+        # preflight and a run that stops at its first errors are sequential
+        if self.jobs <= 1 or self.preflight_lines is not None or self.fail_fast_run:
+            self.iterate_over_configuration_tree(self.config, "")
+        else:
+            self.scheduler = NodeScheduler(self, self.jobs, self.plan.nodes)
+            self.range_executor = self.scheduler.executor
+            try:
+                self.add_configuration_node(self.config, "", ())
+                self.scheduler.join()
+            finally:
+                self.scheduler.close()
+                self.scheduler = None
+                self.range_executor = None
+
+        # with fail-fast, files stop at their first errors and their storage
+        # is not complete
+        if self.storage_snapshot and self.preflight_lines is None:
+            if self.fail_fast is None:
+                save_storage_snapshot(self.storage, self.storage_snapshot, self.date)
+                if self.log:
+                    self.log.info("Almacenamiento guardado en {0}".format(self.storage_snapshot))
+            elif self.log:
+                self.log.warning(
+                    "Almacenamiento no guardado en {0}, los archivos no se revisan "
+                    "completos con fail-fast".format(self.storage_snapshot)
+                )
 
-    def iterate_over_configuration_tree(self, node, path):
+    def compile_configuration(self):
+        """Compile the configuration into a plan, if it was not given one,
+        so configuration errors stop the run before any file is read."""
+        if self.plan is None:
+            try:
+                self.plan = compile_plan(self.config)
+            except PlanError as e:
+                self.configuration_file_error(e)
+        if self.log:
+            for warning in self.plan.warnings:
+                self.log.warning(warning)
+
+    def add_errors(self, name, errors):
+        """Add errors to a file report, in order with the scheduled nodes.
+
+        Args:
+            name: file name
+            errors: error list
+        """
+        if self.scheduler:
+            self.scheduler.add_errors(name, errors)
+            return
+        if isinstance(errors, FailFastReport):
+            self.errors_count += errors.errors
+        else:
+            if self.fail_fast_run:
+                errors = errors[: self.get_max_errors()]
+            self.errors_count += len(errors)
+        self.store_errors(name, errors)
+
+    def get_max_errors(self):
+        """Return the errors a file can report with fail-fast, or None."""
+        if self.fail_fast is None:
+            return None
+        if self.fail_fast_run:
+            return max(self.fail_fast - self.errors_count, 0)
+        return self.fail_fast
+
+    @property
+    def stopped(self) -> bool:
+        """True if the run reached its fail-fast errors."""
+        return self.fail_fast_run and self.errors_count >= self.fail_fast
+
+    def store_errors(self, name, errors, summaries=None):
+        """Write errors to the error sink, or keep them if there is no sink.
+
+        Args:
+            name: file name
+            errors: error list
+            summaries: summary dicts if the errors were capped by a worker
+        """
+        if summaries is not None:
+            self.error_sink.write_capped(name, errors, summaries)
+        elif self.error_sink:
+            for error in errors:
+                self.error_sink.write(name, error)
+        else:
+            for error in errors:
+                self.error_records[name].append(error)
+
+    def create_report(self, name) -> list:
+        """Return the list where the errors of a file are collected.
+
+        With an error sink, errors are written while the file is checked.
+        With fail-fast, the list keeps only the first errors.
+
+        Args:
+            name: file name
+
+        Returns:
+            list: error list
+        """
+        max_errors = self.get_max_errors()
+        if max_errors is not None:
+            return FailFastReport(max_errors, self.error_sink, name)
+        if self.error_sink:
+            return StreamingReport(self.error_sink, name)
+        return []
+
+    def run_node_rules(self, type_name, path, name, rules, header, rule_specs=None):
+        """Validate node rules and report the errors, in a worker if there
+        is a scheduler.
+
+        Args:
+            type_name: node type
+            path: file path
+            name: file name or name list (multi-regex)
+            rules: format and semantic rules
+            header: file header
+            rule_specs: rule specs of the node plan, None to compile the rules
+        """
+        # errors of a multi-regex node are about all its files
+        report_name = ", ".join(name) if type_name == "multi-regex" else name
+        if (
+            self.scheduler
+            and type_name != "multi-regex"
+            and self.splits_file(path, name, rules)
+        ):
+            # the file is checked here with its ranges in the pool
+            self.add_errors(
+                name, self.validate_node_rules(path, name, rules, header, rule_specs)
+            )
+        elif self.scheduler:
+            task = self.scheduler.submit(
+                validate_node_task,
+                rules,
+                self.data_path,
+                self.date,
+                self.log,
+                self.engine,
+                self.chunk_size,
+                self.file_system,
+                type_name,
+                path,
+                name,
+                header,
+                self.error_sink.caps if self.error_sink else None,
+                self.profiler.empty_copy() if self.profiler else None,
+                self.fail_fast,
+                self.cache,
+                rule_specs,
+            )
+            self.add_errors(report_name, task)
+        elif type_name == "multi-regex":
+            self.add_errors(
+                report_name,
+                self.validate_multi_node_rules(path, name, rules, header, rule_specs),
+            )
+        else:
+            self.add_errors(
+                name, self.validate_node_rules(path, name, rules, header, rule_specs)
+            )
+
+    def add_configuration_node(self, node, path, position):
+        """Validate a configuration node, with a scheduler the node is
+        validated when the nodes it depends on are.
+
+        Args:
+            node: configuration file's node to validate
+            path: configuration file's path of the node
+            position: child indexes from the root to the node
+        """
+        if self.scheduler:
+            self.scheduler.add_node(
+                position, self.iterate_over_configuration_tree, node, path, position
+            )
+        else:
+            self.iterate_over_configuration_tree(node, path, position)
+
+    def iterate_over_configuration_tree(self, node, path, position=()):
         """Iterate recursively a configuration file checking name format,
         path format, dependencies and validation rules.
 
@@ -79,7 +330,10 @@ class DataValidator:
             node: configuration file's node to validate
             path: configuration file's path that contains the directory or
             files to validate
+            position: child indexes from the root to the node
         """
+        if self.stopped:
+            return
         # get variables
         try:
             name = node["path"]["name"]
@@ -92,10 +346,17 @@ class DataValidator:
             else:
                 new_path = path
             rules = node["rules"]
+            node_plan = self.plan.get_node_plan(position) if self.plan else None
+            rule_specs = node_plan.rule_specs if node_plan else None
 
             # check name and path format
             validator = check_name_functions[type_name](
-                {"path": absolute_path, "name": name, "date": self.date}
+                {
+                    "path": absolute_path,
+                    "name": name,
+                    "date": self.date,
+                    "file_system": self.file_system,
+                }
             )
             # check dependencies
             missing_dependencies = []
@@ -131,61 +392,64 @@ class DataValidator:
                             "row": "",
                             "cols": "",
                         }
-                        self.report_errors[name].append(error)
+                        self.add_errors(name, [error])
                     return
                 if rules:
-                    if type_name == "multi-regex":
-                        status = self.validate_multi_node_rules(absolute_path, name, rules, header)
-                        for error in status:
-                            self.report_errors[name].append(error)
-                    elif type_name == "service_detail_regex":
+                    if type_name == "service_detail_regex":
                         for n in name:
-                            status = self.validate_node_rules(absolute_path, n, rules, header)
-                            for error in status:
-                                self.report_errors[n].append(error)
+                            self.run_node_rules(
+                                type_name, absolute_path, n, rules, header, rule_specs
+                            )
                     else:
-                        status = self.validate_node_rules(absolute_path, name, rules, header)
-                        for error in status:
-                            self.report_errors[name].append(error)
+                        self.run_node_rules(
+                            type_name, absolute_path, name, rules, header, rule_specs
+                        )
 
                 # if not root case
                 if name and new_path:
-                    self.report.append([name, new_path])
+                    if self.scheduler:
+                        self.scheduler.add_report([name, new_path])
+                    else:
+                        self.report.append([name, new_path])
 
                 # iterate over children
-                for child in node.get("children", []):
-                    self.iterate_over_configuration_tree(child, new_path)
+                for index, child in enumerate(node.get("children", [])):
+                    self.add_configuration_node(child, new_path, position + (index,))
             else:
                 # report name and path errors
                 self.report_error_by_validator(name, validator)
         except KeyError as e:
             self.configuration_file_error(e)
 
-    def dispatch_rules(self, rules: dict, header: list, file_name: str) -> dict:
+    def dispatch_rules(
+        self, rules: dict, header: list, file_name: str, rule_specs=None
+    ) -> dict:
         """Take the rules dict and split them by type
 
+        Rules with the rule specs of the configuration plan are already
+        resolved and checked, other rules are checked here, so an invalid
+        rule stops the run before the file is read.
+
         Args:
             rules: rules dict
             header: file's header
             file_name: file name
+            rule_specs: rule specs of the node plan, None to compile the rules
 
         Returns:
 
         """
-        format_rules = rules.get("formatRules", [])
-        semantic_rules = rules.get("semanticRules", [])
-        rules_list = format_rules + semantic_rules
-        rules_dict = defaultdict(list)
+        if rule_specs is None:
+            errors = []
+            rule_specs = compile_rule_specs(rules, header, file_name, errors)
+            if errors:
+                self.configuration_file_error(PlanError(errors))
 
-        for rule in rules_list:
-            rule_name = rule["function"]
-            rule_args = {**rule["args"], **{"file_name": file_name}, "header": header}
-            try:
-                fun_object = file_functions[rule_name](rule_args)
-                fun_type = fun_object.get_fun_type().name
-                rules_dict[fun_type].append(fun_object)
-            except KeyError as e:
-                self.configuration_fun_error(e, rule_name)
+        rules_dict = defaultdict(list)
+        for rule_spec in rule_specs:
+            rule_args = {**rule_spec.args, "file_name": file_name, "header": header}
+            fun_object = rule_spec.fun_class(rule_args)
+            rules_dict[fun_object.get_fun_type().name].append(fun_object)
         return rules_dict
 
     def check_rules(self, rules_dict, path, name, header) -> list:
@@ -197,19 +461,39 @@ class DataValidator:
         :param header: file header
         :return: list
         """
-        report = []
+        if self.engine == "chunked":
+            return self.check_rules_by_chunks(rules_dict, path, name, header)
+
+        report = self.create_report(name)
         files_rules_list = rules_dict.get("FILE", [])
         row_rules_list = rules_dict.get("ROW", [])
         storage_rule_list = rules_dict.get("STORAGE", [])
         for storage_fun in storage_rule_list:
             storage_fun.args["data_validator"] = self
+        for file_fun in files_rules_list:
+            file_fun.file_name = name
+
+        # compile rules: rows with all the columns skip each validator's check
+        row_width, wide_row_rules = self.compile_rules(
+            row_rules_list, files_rules_list, storage_rule_list
+        )
+        short_row_rules = [
+            [(named_fun, named_fun.apply) for named_fun in rules_list]
+            for rules_list in [row_rules_list, files_rules_list, storage_rule_list]
+        ]
+        if self.profiler:
+            wide_row_rules = self.profiler.wrap_rules(name, wide_row_rules)
+            short_row_rules = self.profiler.wrap_rules(name, short_row_rules)
 
         header_validator = HeaderValidator({"header": header})
         not_empty_row_validator = NotEmptyRowValidator({})
+        fail_fast = isinstance(report, FailFastReport)
 
         # open file
-        file = open(os.path.join(path, name), encoding="UTF-8-SIG", errors="strict")
+        file = self.file_system.open(os.path.join(path, name))
         csv_reader = csv.reader(file, delimiter=";")
+        if self.profiler:
+            csv_reader = self.profiler.read_rows(name, csv_reader)
         if self.log:
             self.log.info("Procesando {0} ...".format(name))
         try:
@@ -221,24 +505,30 @@ class DataValidator:
 
             # check rules
             for row in csv_reader:
+                if fail_fast and report.full:
+                    break
                 if not not_empty_row_validator.apply(row):
-                    report.append(not_empty_row_validator.get_error())
+                    report.append(ErrorRecord(not_empty_row_validator))
                     continue
 
+                if len(row) >= row_width:
+                    row_rules, file_rules, storage_rules = wide_row_rules
+                else:
+                    row_rules, file_rules, storage_rules = short_row_rules
+
                 # check row fun
                 named_fun = 'function_not_defined'
                 try:
-                    for named_fun in row_rules_list:
-                        if not named_fun.apply(row):
-                            report.append(named_fun.get_error())
+                    for named_fun, apply in row_rules:
+                        if not apply(row):
+                            report.append(ErrorRecord(named_fun))
                     # apply file fun
-                    for named_fun in files_rules_list:
-                        named_fun.file_name = name
-                        named_fun.apply(row)
+                    for named_fun, apply in file_rules:
+                        apply(row)
                     # apply storage fun
-                    for named_fun in storage_rule_list:
-                        if not named_fun.apply(row):
-                            report.append(named_fun.get_error())
+                    for named_fun, apply in storage_rules:
+                        if not apply(row):
+                            report.append(ErrorRecord(named_fun))
                 except Exception as e:
                     file.close()
                     self.configuration_args_error(e, named_fun)
@@ -262,25 +552,487 @@ class DataValidator:
         self.files_checked.add(name)
         return report
 
-    def validate_node_rules(self, path, name, rules, header) -> list:
+    @staticmethod
+    def compile_rules(*rules_lists) -> tuple:
+        """
+        Compile the rules of a file once before reading it
+
+        :param rules_lists: validator lists
+        :return: (number of columns every rule needs, list of
+            [(validator, apply method for rows with those columns), ...]
+            for each validator list)
+        """
+        row_width = max(
+            (
+                named_fun.required_width
+                for rules_list in rules_lists
+                for named_fun in rules_list
+            ),
+            default=0,
+        )
+        compiled_rules = [
+            [(named_fun, named_fun.compile_apply()) for named_fun in rules_list]
+            for rules_list in rules_lists
+        ]
+        return row_width, compiled_rules
+
+    def check_rules_by_chunks(self, rules_dict, path, name, header) -> list:
+        """
+        Check all rules over a csv file reading it in chunks of rows
+
+        Validators with a batch implementation check a whole chunk at once,
+        the others are applied row by row. Only the failed rows of the batch
+        checks are kept, errors are reported as rows are reached, in the same
+        order and with the same content as in check_rules.
+        :param rules_dict: rules to check
+        :param path: file path
+        :param name: file name
+        :param header: file header
+        :return: list
+        """
+        report = self.create_report(name)
+        files_rules_list = rules_dict.get("FILE", [])
+        row_rules_list = rules_dict.get("ROW", [])
+        storage_rule_list = rules_dict.get("STORAGE", [])
+        for storage_fun in storage_rule_list:
+            storage_fun.args["data_validator"] = self
+        for file_fun in files_rules_list:
+            file_fun.file_name = name
+
+        # storage checks must see the values stored by previous rows
+        stores_data = any(fun.stores_data for fun in storage_rule_list)
+        checked_rules_list = row_rules_list + storage_rule_list
+        batch_positions = {
+            position
+            for position, named_fun in enumerate(checked_rules_list)
+            if not (stores_data and named_fun in storage_rule_list)
+        }
+
+        row_width, wide_row_rules = self.compile_rules(
+            checked_rules_list, files_rules_list
+        )
+        short_row_rules = [
+            [(named_fun, named_fun.apply) for named_fun in rules_list]
+            for rules_list in [checked_rules_list, files_rules_list]
+        ]
+        if self.profiler:
+            wide_row_rules = self.profiler.wrap_rules(name, wide_row_rules)
+            short_row_rules = self.profiler.wrap_rules(name, short_row_rules)
+
+        header_validator = HeaderValidator({"header": header})
+        not_empty_row_validator = NotEmptyRowValidator({})
+        fail_fast = isinstance(report, FailFastReport)
+
+        # open file
+        file = self.file_system.open(os.path.join(path, name))
+        csv_reader = csv.reader(file, delimiter=";")
+        if self.profiler:
+            csv_reader = self.profiler.read_rows(name, csv_reader)
+        if self.log:
+            self.log.info("Procesando {0} ...".format(name))
+        try:
+            # check header
+            if not header_validator.apply(next(csv_reader)):
+                report.append(header_validator.get_error())
+                file.close()
+                return report
+
+            # check rules
+            for rows in read_chunks(csv_reader, self.chunk_size):
+                if fail_fast and report.full:
+                    break
+                chunk = RowChunk([row for row in rows if row])
+
+                named_fun = "function_not_defined"
+                try:
+                    # check batch fun, only the rows that failed are kept
+                    batch_failures = defaultdict(list)
+                    row_positions = []
+                    for position in range(len(checked_rules_list)):
+                        named_fun = checked_rules_list[position]
+                        start = time.perf_counter() if self.profiler else 0
+                        failed_offsets = (
+                            named_fun.apply_batch(chunk)
+                            if position in batch_positions
+                            else None
+                        )
+                        if failed_offsets is None:
+                            row_positions.append(position)
+                            continue
+                        if self.profiler:
+                            self.profiler.add_batch(
+                                name,
+                                named_fun,
+                                time.perf_counter() - start,
+                                len(chunk),
+                                len(failed_offsets),
+                            )
+                        for offset in failed_offsets:
+                            batch_failures[offset].append((position, named_fun))
+                    wide_rules = [
+                        [wide_row_rules[0][position] for position in row_positions],
+                        wide_row_rules[1],
+                    ]
+                    short_rules = [
+                        [short_row_rules[0][position] for position in row_positions],
+                        short_row_rules[1],
+                    ]
+
+                    # check row fun, errors are written in row order
+                    offset = -1
+                    for row in rows:
+                        if not not_empty_row_validator.apply(row):
+                            report.append(ErrorRecord(not_empty_row_validator))
+                            continue
+                        offset += 1
+                        if len(row) >= row_width:
+                            checked_rules, file_rules = wide_rules
+                        else:
+                            checked_rules, file_rules = short_rules
+                        failures = batch_failures.get(offset)
+                        if failures is None:
+                            for named_fun, apply in checked_rules:
+                                if not apply(row):
+                                    report.append(ErrorRecord(named_fun))
+                        else:
+                            # batch and row fun errors go in rule order
+                            errors = [
+                                (position, named_fun.get_batch_error(chunk, offset))
+                                for position, named_fun in failures
+                            ]
+                            for position, (named_fun, apply) in zip(
+                                row_positions, checked_rules
+                            ):
+                                if not apply(row):
+                                    errors.append((position, ErrorRecord(named_fun)))
+                            errors.sort(key=lambda error: error[0])
+                            report.extend(error for _, error in errors)
+                        # apply file fun
+                        for named_fun, apply in file_rules:
+                            apply(row)
+                except Exception as e:
+                    file.close()
+                    self.configuration_args_error(e, named_fun)
+        except UnicodeDecodeError:
+            error = {
+                "name": "Error de encoding",
+                "type": "formato",
+                "message": "El archivo {0} no se encuentra en UTF-8.".format(name),
+                "row": "",
+                "cols": "",
+            }
+            report.append(error)
+        file.close()
+
+        # check all file rules errors
+        for file_fun in files_rules_list:
+            if not file_fun.status:
+                report.append(file_fun.get_error())
+
+        # save file
+        self.files_checked.add(name)
+        return report
+
+    def splits_file(self, path, name, rules) -> bool:
+        """
+        Return True if the stateless rules of a file are checked over byte
+        ranges of the file in the range pool: the file has at least
+        split_size bytes and some stateless rule. Files are not split in
+        fail-fast and profiled runs
+        :param path: file path
+        :param name: file name
+        :param rules: format and semantic rules
+        :return: bool
+        """
+        if (
+            self.range_executor is None
+            or self.split_size is None
+            or self.fail_fast is not None
+            or self.profiler
+        ):
+            return False
+        # storage checks of a file that stores data are not stateless
+        produced, _ = get_storage_names(rules)
+        if not any(
+            getattr(file_functions.get(rule.get("function")), "stateless", False)
+            and not (produced and "storage_name" in rule.get("args", {}))
+            for rule in rules.get("formatRules", []) + rules.get("semanticRules", [])
+        ):
+            return False
+        try:
+            return self.file_system.getsize(os.path.join(path, name)) >= self.split_size
+        except OSError:
+            return False
+
+    def check_rules_by_ranges(self, rules_dict, path, name, header) -> list:
+        """
+        Check all rules over a large csv file, its stateless rules over byte
+        ranges of the file in the range pool
+
+        The rows after the header are split in a byte range per job. While
+        the stateless rules check the ranges, the other rules check the
+        whole file here, in a single ordered pass. Errors are merged by row
+        and rule position, and the row numbers of a range are moved by the
+        rows of the previous ranges, so the report is the same as in
+        check_rules. In a file that is not UTF-8, the rows checked before the
+        encoding error can be some more or less than in check_rules.
+
+        A file on disk is mapped in memory and its row index splits it in
+        ranges of about the same rows. A range of a zip member is
+        decompressed from the member start, which is fast next to checking
+        its rows.
+        :param rules_dict: rules to check
+        :param path: file path
+        :param name: file name
+        :param header: file header
+        :return: list
+        """
+        report = self.create_report(name)
+        files_rules_list = rules_dict.get("FILE", [])
+        row_rules_list = rules_dict.get("ROW", [])
+        storage_rule_list = rules_dict.get("STORAGE", [])
+        for storage_fun in storage_rule_list:
+            storage_fun.args["data_validator"] = self
+        for file_fun in files_rules_list:
+            file_fun.file_name = name
+
+        # storage checks must see the values stored by previous rows
+        stores_data = any(fun.stores_data for fun in storage_rule_list)
+        checked_rules_list = row_rules_list + storage_rule_list
+        range_positions = [
+            position
+            for position, named_fun in enumerate(checked_rules_list)
+            if named_fun.stateless
+            and not (stores_data and named_fun in storage_rule_list)
+        ]
+        ordered_positions = [
+            position
+            for position in range(len(checked_rules_list))
+            if position not in range_positions
+        ]
+        range_rules_list = [checked_rules_list[position] for position in range_positions]
+        row_width, wide_row_rules = self.compile_rules(
+            [checked_rules_list[position] for position in ordered_positions],
+            files_rules_list,
+        )
+        short_row_rules = [
+            [(named_fun, named_fun.apply) for named_fun, _ in rules_list]
+            for rules_list in wide_row_rules
+        ]
+
+        header_validator = HeaderValidator({"header": header})
+        not_empty_row_validator = NotEmptyRowValidator({})
+        encoding_error = False
+        file_path = os.path.join(path, name)
+        if self.log:
+            self.log.info("Procesando {0} ...".format(name))
+
+        # check header
+        file = self.file_system.open(file_path)
+        try:
+            if not header_validator.apply(next(csv.reader(file, delimiter=";"))):
+                report.append(header_validator.get_error())
+                return report
+        except UnicodeDecodeError:
+            encoding_error = True
+        finally:
+            file.close()
+
+        # check stateless fun over the ranges, the validators are sent once as
+        # bytes with the storage they read, and the ones here only render the
+        # errors of the ranges
+        futures = []
+        if not encoding_error:
+            # a mapped file is split in ranges of about the same rows
+            line_index = self.file_system.open_line_index(file_path)
+            if line_index is not None:
+                with line_index:
+                    byte_ranges = line_index.split(self.jobs)
+            else:
+                with self.file_system.open_binary(file_path) as file:
+                    byte_ranges = split_byte_ranges(
+                        file, self.file_system.getsize(file_path), self.jobs
+                    )
+            storage = {
+                named_fun.args["storage_name"]: self.storage[named_fun.args["storage_name"]]
+                for named_fun in range_rules_list
+                if named_fun in storage_rule_list
+                and named_fun.args["storage_name"] in self.storage
+            }
+            for named_fun in range_rules_list:
+                if named_fun in storage_rule_list:
+                    del named_fun.args["data_validator"]
+            try:
+                range_validators = pickle.dumps(
+                    (range_rules_list, storage), protocol=pickle.HIGHEST_PROTOCOL
+                )
+            finally:
+                for named_fun in range_rules_list:
+                    if named_fun in storage_rule_list:
+                        named_fun.args["data_validator"] = self
+            futures = [
+                self.range_executor.submit(
+                    check_range_task,
+                    range_validators,
+                    self.file_system,
+                    file_path,
+                    start,
+                    end,
+                    self.engine,
+                    self.chunk_size,
+                )
+                for start, end in byte_ranges
+            ]
+
+        # check the other fun in order, empty rows are reported by the ranges.
+        # Without other fun, file fun that only count rows take the rows
+        # counted by the ranges and the file is not read again
+        counts_rows = not ordered_positions and all(
+            file_fun.counts_rows for file_fun in files_rules_list
+        )
+        ordered_errors = []
+        if not encoding_error and not counts_rows:
+            file = self.file_system.open(file_path)
+            csv_reader = csv.reader(file, delimiter=";")
+            try:
+                next(csv_reader)
+                for row_index, row in enumerate(csv_reader):
+                    if not row:
+                        continue
+                    if len(row) >= row_width:
+                        checked_rules, file_rules = wide_row_rules
+                    else:
+                        checked_rules, file_rules = short_row_rules
+
+                    named_fun = "function_not_defined"
+                    try:
+                        for position, (named_fun, apply) in zip(
+                            ordered_positions, checked_rules
+                        ):
+                            if not apply(row):
+                                ordered_errors.append(
+                                    ((row_index, position), ErrorRecord(named_fun))
+                                )
+                        # apply file fun
+                        for named_fun, apply in file_rules:
+                            apply(row)
+                    except Exception as e:
+                        file.close()
+                        self.configuration_args_error(e, named_fun)
+            except UnicodeDecodeError:
+                encoding_error = True
+            file.close()
+
+        # merge the range errors, rows are counted from the previous ranges
+        range_errors = []
+        row_base = 0
+        empty_rows = 0
+        row_counters = [0] * len(range_rules_list)
+        for number, future in enumerate(futures):
+            result = future.result()
+            if result["exception"] is not None:
+                rule_index, e = result["exception"]
+                self.configuration_args_error(e, range_rules_list[rule_index])
+            for offset, rule_index, state in result["errors"]:
+                if rule_index < 0:
+                    named_fun, position, row_counter = not_empty_row_validator, -1, row_base
+                    empty_rows += 1
+                else:
+                    named_fun = range_rules_list[rule_index]
+                    position = range_positions[rule_index]
+                    row_counter = row_counters[rule_index]
+                named_fun.set_error_state((state[0] + row_counter,) + state[1:])
+                range_errors.append(
+                    ((row_base + offset, position), ErrorRecord(named_fun))
+                )
+            row_base += result["rows"]
+            row_counters = [
+                row_counter + range_row_counter
+                for row_counter, range_row_counter in zip(
+                    row_counters, result["row_counters"]
+                )
+            ]
+            if result["encoding_error"]:
+                # rows after the range are not checked, as in check_rules
+                encoding_error = True
+                for next_future in futures[number + 1:]:
+                    next_future.cancel()
+                break
+        if counts_rows:
+            for file_fun in files_rules_list:
+                file_fun.apply_count(row_base - empty_rows)
+
+        report.extend(
+            error
+            for _, error in heapq.merge(
+                ordered_errors, range_errors, key=lambda error: error[0]
+            )
+        )
+        if encoding_error:
+            error = {
+                "name": "Error de encoding",
+                "type": "formato",
+                "message": "El archivo {0} no se encuentra en UTF-8.".format(name),
+                "row": "",
+                "cols": "",
+            }
+            report.append(error)
+
+        # check all file rules errors
+        for file_fun in files_rules_list:
+            if not file_fun.status:
+                report.append(file_fun.get_error())
+
+        # save file
+        self.files_checked.add(name)
+        return report
+
+    def validate_node_rules(self, path, name, rules, header, rule_specs=None) -> list:
         """
         Validate node rules for a file
         :param path: file path
         :param name: file name
         :param rules: format and semantic rules
         :param header: file header
+        :param rule_specs: rule specs of the node plan, None to compile the rules
         :return:
         """
         report = []
-        if rules:
-            rules_dict = self.dispatch_rules(rules, header, name)
-            report = self.check_rules(rules_dict, path, name, header)
+        if rules and self.preflight_lines is not None:
+            report = self.create_report(name)
+            self.preflight_file(report, path, name, header)
+            self.files_checked.add(name)
+        elif rules:
+            cache_key = self.get_cache_key(path, name, rules, header)
+            cached_result = self.cache.get(cache_key) if cache_key else None
+            if cached_result is not None:
+                report = self.replay_cached_result(name, cached_result)
+            elif cache_key:
+                error_sink = self.error_sink
+                if error_sink:
+                    self.error_sink = RecordingErrorSink(error_sink)
+                try:
+                    report = self.check_node_rules(path, name, rules, header, rule_specs)
+                finally:
+                    recorder, self.error_sink = self.error_sink, error_sink
+                if not error_sink:
+                    self.cache_result(cache_key, rules, report)
+                elif recorder.complete:
+                    self.cache_result(cache_key, rules, recorder.errors)
+            else:
+                report = self.check_node_rules(path, name, rules, header, rule_specs)
+        if rules and self.error_sink:
+            self.error_sink.flush()
         return report
 
     def start_iteration_over_path_list(self):
         """
         Start iteration over a path list
+
+        Files are checked in order, with more than one job and a split size
+        large files are checked over byte ranges in a process pool.
         """
+        self.compile_configuration()
         path_list_names = []
         path_list_dict_name = {}
         for path in self.data_path:
@@ -288,57 +1040,235 @@ class DataValidator:
             path_list_names.append(name)
             path_list_dict_name[name] = os.path.dirname(path)
         self.create_path_dict(self.config, path_list_names)
+        if self.storage_snapshot:
+            self.load_storage_snapshot()
+        self.check_path_list_storage()
+        if self.jobs > 1 and self.split_size is not None:
+            self.range_executor = ProcessPoolExecutor(max_workers=self.jobs)
+        try:
+            for node, position in zip(self.path_list_dict, self.path_list_positions):
+                if self.stopped:
+                    break
+                # get variable
+                name = node["path"]["name"]
+                absolute_path = path_list_dict_name[name]
+                type_name = node["path"]["type"]
+                header = node["path"].get("header", "")
+                rules = node["rules"]
+                node_plan = self.plan.get_node_plan(position)
+                # check name and path format
+                validator = check_name_functions[type_name](
+                    {"path": absolute_path, "name": name, "file_system": self.file_system}
+                )
+                if validator.apply():
+                    # if name correct check rules and report errors
+                    if rules:
+                        status = self.validate_node_rules(
+                            absolute_path, name, rules, header, node_plan.rule_specs
+                        )
+                        self.add_errors(name, status)
+                        # if not root case
+                    if name:
+                        self.report.append([name, absolute_path])
+
+                else:
+                    # report name and path errors
+                    self.add_errors(name, [validator.get_error()])
+        finally:
+            if self.range_executor:
+                self.range_executor.shutdown(wait=True, cancel_futures=True)
+                self.range_executor = None
+
+    def load_storage_snapshot(self):
+        """
+        Load the storage saved by a full run, except the storage written by
+        the files of the path list, they write it again
+        """
+        try:
+            snapshot = load_storage_snapshot(self.storage_snapshot)
+        except (OSError, ValueError) as e:
+            if self.log:
+                self.log.error(
+                    "No se pudo cargar el almacenamiento {0}".format(self.storage_snapshot)
+                )
+                self.log.error(str(e))
+            sys.exit("Procesamiento cancelado.")
+        produced = set()
         for node in self.path_list_dict:
-            # get variable
-            name = node["path"]["name"]
-            absolute_path = path_list_dict_name[name]
-            type_name = node["path"]["type"]
-            header = node["path"].get("header", "")
-            rules = node["rules"]
-            # check name and path format
-            validator = check_name_functions[type_name](
-                {"path": absolute_path, "name": name}
+            if node["rules"]:
+                produced |= get_storage_names(node["rules"])[0]
+        for storage_name, values in snapshot["storage"].items():
+            if storage_name not in produced:
+                self.storage[storage_name] = values
+        if self.log:
+            self.log.info(
+                "Almacenamiento de la fecha {0} cargado desde {1}".format(
+                    snapshot["date"], self.storage_snapshot
+                )
             )
-            if validator.apply():
-                # if name correct check rules and report errors
-                if rules:
-                    status = self.validate_node_rules(
-                        absolute_path, name, rules, header
-                    )
-                    for error in status:
-                        self.report_errors[name].append(error)
-                    # if not root case
-                if name:
-                    self.report.append([name, absolute_path])
 
-            else:
-                # report name and path errors
-                self.report_errors[name].append(validator.get_error())
+    def check_path_list_storage(self):
+        """
+        Warn about the storage read by the files of the path list that no
+        file of the list writes and was not loaded, its rules fail every row
+        """
+        available = set(self.storage)
+        for node in self.path_list_dict:
+            if not node["rules"]:
+                continue
+            produced, consumed = get_storage_names(node["rules"])
+            missing = consumed - produced - available
+            if missing and self.log:
+                self.log.warning(
+                    "El archivo {0} usa el almacenamiento {1}, que no fue cargado "
+                    "(ver --storage-snapshot).".format(
+                        node["path"]["name"], ", ".join(sorted(missing))
+                    )
+                )
+            available |= produced
 
-    def create_path_dict(self, node, name_list):
+    def create_path_dict(self, node, name_list, position=()):
         """
         Iterate over path_dict and create
         :param node:
         :param name_list:
+        :param position: child indexes from the root to the node
         """
         name = node["path"]["name"]
         if name in name_list:
             self.path_list_dict.append(node)
-        for child in node["children"]:
-            self.create_path_dict(child, name_list)
+            self.path_list_positions.append(position)
+        for index, child in enumerate(node["children"]):
+            self.create_path_dict(child, name_list, position + (index,))
 
-    def validate_multi_node_rules(self, path, name_list, rules, header):
+    def check_node_rules(self, path, name, rules, header, rule_specs=None) -> list:
+        """
+        Check the rules of a node over a file
+        :param path: file path
+        :param name: file name
+        :param rules: format and semantic rules
+        :param header: file header
+        :param rule_specs: rule specs of the node plan, None to compile the rules
+        :return: list
+        """
+        rules_dict = self.dispatch_rules(rules, header, name, rule_specs)
+        if self.splits_file(path, name, rules):
+            return self.check_rules_by_ranges(rules_dict, path, name, header)
+        with self.profiler.time_file(name) if self.profiler else nullcontext():
+            return self.check_rules(rules_dict, path, name, header)
+
+    def get_cache_key(self, path, name, rules, header):
+        """
+        Return the result cache key of a file, or None if its result can not
+        be cached: its rules read storage written by other files, or append
+        to storage that other files have already written. Files are not
+        cached in fail-fast runs, nor when they are profiled, a cached file
+        is not read
+        :param path: file path
+        :param name: file name
+        :param rules: format and semantic rules
+        :param header: file header
+        :return: str or None
+        """
+        if self.cache is None or self.fail_fast is not None or self.profiler:
+            return None
+        produced, consumed = get_storage_names(rules)
+        if consumed - produced or produced & self.storage.keys():
+            return None
+        try:
+            with self.file_system.open_binary(os.path.join(path, name)) as file:
+                file_hash = hash_file(file)
+        except OSError:
+            return None
+        return self.cache.get_key(file_hash, get_rules_hash(name, rules, header))
+
+    def cache_result(self, cache_key, rules, errors) -> None:
+        """
+        Save the errors of a file and the storage its rules wrote
+        :param cache_key: cache key
+        :param rules: format and semantic rules
+        :param errors: file errors
+        """
+        produced, _ = get_storage_names(rules)
+        storage = {
+            storage_name: self.storage[storage_name]
+            for storage_name in produced
+            if storage_name in self.storage
+        }
+        self.cache.put(cache_key, errors, storage)
+
+    def replay_cached_result(self, name, result) -> list:
+        """
+        Report the cached errors of a file and restore its storage, without
+        reading the file
+        :param name: file name
+        :param result: cached errors and storage
+        :return: list
+        """
+        if self.log:
+            self.log.info("{0} sin cambios, se usa el resultado guardado".format(name))
+        self.storage.update(result["storage"])
+        self.files_checked.add(name)
+        report = self.create_report(name)
+        report.extend(result["errors"])
+        return report
+
+    def preflight_file(self, report, path, name, header, offset=0) -> None:
+        """
+        Check the header of a file and that its first lines are UTF-8,
+        without checking its rules
+        :param report: error list
+        :param path: file path
+        :param name: file name
+        :param header: file header
+        :param offset: lines before the header
+        """
+        header_validator = HeaderValidator({"header": header})
+        file = self.file_system.open(os.path.join(path, name))
+        csv_reader = csv.reader(file, delimiter=";")
+        if self.log:
+            self.log.info("Revisando {0} ...".format(name))
+        try:
+            for i in range(offset):
+                next(csv_reader)
+            if not header_validator.apply(next(csv_reader)):
+                report.append(header_validator.get_error())
+            else:
+                # reading the lines decodes them
+                for row in itertools.islice(csv_reader, self.preflight_lines):
+                    pass
+        except UnicodeDecodeError:
+            error = {
+                "name": "Error de encoding",
+                "type": "formato",
+                "message": "El archivo {0} no se encuentra en UTF-8.".format(name),
+                "row": "",
+                "cols": "",
+            }
+            report.append(error)
+        finally:
+            file.close()
+
+    def validate_multi_node_rules(self, path, name_list, rules, header, rule_specs=None):
         report = []
-        if rules:
-            rules_dict = self.dispatch_rules(rules, header, name_list)
-            report = self.check_multiple_rules(rules_dict, path, name_list, header)
+        if rules and self.preflight_lines is not None:
+            report = self.create_report(", ".join(name_list))
+            for name in name_list:
+                self.preflight_file(report, path, name, header, offset=4)
+        elif rules:
+            rules_dict = self.dispatch_rules(rules, header, name_list, rule_specs)
+            with self.profiler.time_file(
+                ", ".join(name_list)
+            ) if self.profiler else nullcontext():
+                report = self.check_multiple_rules(rules_dict, path, name_list, header)
 
         return report
 
     def check_multiple_rules(self, rules_dict, path, name_list, header) -> list:
         # set variables
         offset = 4
-        report = []
+        report_name = ", ".join(name_list)
+        report = self.create_report(report_name)
         files_rules_list = rules_dict.get("FILE", [])
         row_rules_list = rules_dict.get("ROW", [])
         storage_rule_list = rules_dict.get("STORAGE", [])
@@ -350,20 +1280,39 @@ class DataValidator:
         for storage_fun in storage_rule_list:
             storage_fun.args["data_validator"] = self
 
+        # rules applied to every row, storage rules are applied twice
+        multi_row_rules, file_rules, checked_rules, storage_rules = [
+            [(named_fun, named_fun.apply) for named_fun in rules_list]
+            for rules_list in [
+                multi_row_rules_list,
+                files_rules_list,
+                row_rules_list + storage_rule_list,
+                storage_rule_list,
+            ]
+        ]
+        if self.profiler:
+            multi_row_rules, file_rules, checked_rules, storage_rules = (
+                self.profiler.wrap_rules(
+                    report_name,
+                    [multi_row_rules, file_rules, checked_rules, storage_rules],
+                )
+            )
+
         # set always validators
         header_validator = HeaderValidator({"header": header})
         not_empty_row_validator = NotEmptyRowValidator({})
+        fail_fast = isinstance(report, FailFastReport)
 
         # open all files
         name = 'name_not_defined'
         try:
             for name in name_list:
                 # open file
-                file = open(
-                    os.path.join(path, name), encoding="UTF-8-SIG", errors="strict"
-                )
+                file = self.file_system.open(os.path.join(path, name))
                 opened_files.append(file)
                 csv_reader = csv.reader(file, delimiter=";")
+                if self.profiler:
+                    csv_reader = self.profiler.read_rows(name, csv_reader)
                 opened_csv_files.append(csv_reader)
                 if self.log:
                     self.log.info("Procesando {0} ...".format(name))
@@ -391,14 +1340,16 @@ class DataValidator:
 
         # check rules
         for csv_files in zip(*opened_csv_files):
+            if fail_fast and report.full:
+                break
             try:
                 # apply multirow fun
-                for named_fun in multi_row_rules_list:
-                    named_fun.apply(csv_files)
+                for named_fun, apply in multi_row_rules:
+                    apply(csv_files)
 
                 for row in csv_files:
                     if not not_empty_row_validator.apply(row):
-                        report.append(not_empty_row_validator.get_error())
+                        report.append(ErrorRecord(not_empty_row_validator))
                         continue
 
                     # check row fun
@@ -406,17 +1357,17 @@ class DataValidator:
                     named_fun = 'function_not_defined'
                     try:
                         # apply file fun
-                        for named_fun in files_rules_list:
-                            named_fun.apply(row)
+                        for named_fun, apply in file_rules:
+                            apply(row)
 
-                        for named_fun in row_rules_list + storage_rule_list:
-                            if not named_fun.apply(row):
-                                report.append(named_fun.get_error())
+                        for named_fun, apply in checked_rules:
+                            if not apply(row):
+                                report.append(ErrorRecord(named_fun))
 
                         # apply storage fun
-                        for named_fun in storage_rule_list:
-                            if not named_fun.apply(row):
-                                report.append(named_fun.get_error())
+                        for named_fun, apply in storage_rules:
+                            if not apply(row):
+                                report.append(ErrorRecord(named_fun))
                     except Exception as e:
                         opened_files[file_num].close()
                         self.configuration_args_error(e, named_fun)
@@ -443,6 +1394,207 @@ class DataValidator:
         """
         if isinstance(name, list):
             for n in name:
-                self.report_errors[n].append(validator.get_error())
+                self.add_errors(n, [validator.get_error()])
         else:
-            self.report_errors[name].append(validator.get_error())
+            self.add_errors(name, [validator.get_error()])
+
+
+def validate_node_task(
+    storage,
+    rules,
+    data_path,
+    date,
+    logger,
+    engine,
+    chunk_size,
+    file_system,
+    type_name,
+    path,
+    name,
+    header,
+    error_caps=None,
+    profiler=None,
+    fail_fast=None,
+    cache=None,
+    rule_specs=None,
+) -> dict:
+    """Validate node rules in a worker process.
+
+    With error caps, errors are capped in the worker, so the errors over a
+    cap are not rendered to be sent back.
+
+    Args:
+        storage: storage values the rules read or write
+        rules: format and semantic rules
+        data_path: data path
+        date: program date
+        logger: logger
+        engine: row or chunked engine
+        chunk_size: rows per chunk
+        file_system: file system with the data
+        type_name: node type
+        path: file path
+        name: file name or name list (multi-regex)
+        header: file header
+        error_caps: CappedErrorSink caps, None for no caps
+        profiler: empty profiler to count the node validation, or None
+        fail_fast: errors that stop the file, or None
+        cache: ResultCache, or None
+        rule_specs: rule specs of the node plan, None to compile the rules
+
+    Returns:
+        dict: errors, error summaries (None without caps), files checked, the
+        storage written by the rules (not the storage they only read) and the
+        profiler
+    """
+    error_sink = None
+    if error_caps:
+        error_sink = CappedErrorSink(MemoryErrorSink(), **error_caps)
+    data_validator = DataValidator(
+        ConfigFromString("{}"),
+        data_path,
+        date,
+        logger=logger,
+        engine=engine,
+        chunk_size=chunk_size,
+        file_system=file_system,
+        error_sink=error_sink,
+        profiler=profiler,
+        fail_fast=fail_fast,
+        cache=cache,
+    )
+    data_validator.storage = storage
+    try:
+        if type_name == "multi-regex":
+            errors = data_validator.validate_multi_node_rules(
+                path, name, rules, header, rule_specs
+            )
+        else:
+            errors = data_validator.validate_node_rules(
+                path, name, rules, header, rule_specs
+            )
+    except KeyError as e:
+        data_validator.configuration_file_error(e)
+    finally:
+        file_system.close()
+    summaries = None
+    if error_sink:
+        errors = [error for _, error in error_sink.error_sink.errors]
+        summaries = error_sink.get_summaries()
+    produced, _ = get_storage_names(rules)
+    return {
+        "errors": errors,
+        "summaries": summaries,
+        "profiler": profiler,
+        "files_checked": data_validator.files_checked,
+        "storage": {
+            storage_name: data_validator.storage[storage_name]
+            for storage_name in produced
+            if storage_name in data_validator.storage
+        },
+    }
+
+
+def check_range_task(
+    validators, file_system, file_path, start, end, engine, chunk_size
+) -> dict:
+    """Check stateless rules over a byte range of a csv file in a worker process.
+
+    Row numbers of the errors are counted from the range start, the data
+    validator moves them by the rows of the previous ranges.
+
+    Args:
+        validators: pickled list of stateless validators, with the storage
+            read by its storage checks
+        file_system: file system with the file
+        file_path: file path
+        start: first byte offset of the range, a row start
+        end: byte offset after the range, a row start
+        engine: row or chunked engine, with chunked validators with a batch
+            implementation check a whole chunk at once
+        chunk_size: rows per chunk
+
+    Returns:
+        dict: rows read, row counter increase of every validator, errors as
+        (row offset, validator index or -1 for empty rows, error state)
+        tuples in row order, True if the range is not UTF-8 and the
+        (validator index, exception) of a validator that failed, or None
+    """
+    validators, storage = pickle.loads(validators)
+    data_validator = DataValidator(ConfigFromString("{}"), None, None)
+    data_validator.storage = storage
+    for named_fun in validators:
+        if named_fun.get_fun_type() == FunType.STORAGE:
+            named_fun.args["data_validator"] = data_validator
+    rules = [(named_fun, named_fun.compile_apply()) for named_fun in validators]
+    not_empty_row_validator = NotEmptyRowValidator({})
+    errors = []
+    rows_read = 0
+    encoding_error = False
+    exception = None
+    with file_system.open_binary(file_path) as binary_file:
+        file = open_byte_range(binary_file, start, end)
+        try:
+            for rows in read_chunks(csv.reader(file, delimiter=";"), chunk_size):
+                offsets = []
+                for offset, row in enumerate(rows):
+                    if not_empty_row_validator.apply(row):
+                        offsets.append(offset)
+                    else:
+                        errors.append(
+                            (
+                                rows_read + offset,
+                                -1,
+                                not_empty_row_validator.get_error_state(),
+                            )
+                        )
+                chunk = RowChunk([rows[offset] for offset in offsets])
+
+                for rule_index, (named_fun, apply) in enumerate(rules):
+                    try:
+                        failed_offsets = None
+                        if engine == "chunked":
+                            failed_offsets = named_fun.apply_batch(chunk)
+                        if failed_offsets is not None:
+                            for offset in failed_offsets:
+                                errors.append(
+                                    (
+                                        rows_read + offsets[offset],
+                                        rule_index,
+                                        named_fun.get_batch_error(chunk, offset).state,
+                                    )
+                                )
+                            continue
+                        for offset, row in zip(offsets, chunk.rows):
+                            valid = (
+                                apply(row)
+                                if len(row) >= named_fun.required_width
+                                else named_fun.apply(row)
+                            )
+                            if not valid:
+                                errors.append(
+                                    (
+                                        rows_read + offset,
+                                        rule_index,
+                                        named_fun.get_error_state(),
+                                    )
+                                )
+                    except Exception as e:
+                        exception = (rule_index, e)
+                        break
+                rows_read += len(rows)
+                if exception is not None:
+                    break
+        except UnicodeDecodeError:
+            encoding_error = True
+        file.close()
+    file_system.close()
+
+    errors.sort(key=lambda error: error[:2])
+    return {
+        "rows": rows_read,
+        "row_counters": [named_fun.row_counter - 1 for named_fun in validators],
+        "errors": errors,
+        "encoding_error": encoding_error,
+        "exception": exception,
+    }
@@ -0,0 +1,159 @@
+import re
+
+
+class ErrorRecord:
+    """A validator error stored as the validator state needed to format it.
+
+    The error dict (and its message) is only built when the record is
+    rendered, usually when the report is written, so a file with many
+    errors keeps a small record per error instead of a formatted dict.
+    Records keep the error copy of the validator, without the data of the
+    whole file. Records can be compared with and read like error dicts.
+    """
+
+    __slots__ = ("validator", "state")
+
+    def __init__(self, validator):
+        """
+        Args:
+            validator: validator that has just failed
+        """
+        self.validator = validator.get_error_validator()
+        self.state = validator.get_error_state()
+
+    def render(self) -> dict:
+        """Return the error dict the validator gave when the record was made."""
+        # the error copy is only used to format errors, its state is not restored
+        self.validator.set_error_state(self.state)
+        return self.validator.get_error()
+
+    @property
+    def row(self):
+        """Row number of the error, read without rendering it."""
+        return self.state[0]
+
+    @property
+    def columns(self) -> tuple:
+        """Col indexes of the error, read without rendering it."""
+        return self.validator.get_error_columns(self.state)
+
+    def __getitem__(self, key):
+        return self.render()[key]
+
+    def __eq__(self, other):
+        return self.render() == render_error(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.render())
+
+    def __reduce__(self):
+        # records are sent between processes as error dicts
+        return dict, (self.render(),)
+
+
+class CachedErrorRecord:
+    """An error record read from the result cache.
+
+    Its validator is not available, it is replaced by a rule key, the col
+    indexes of the record and the columns of the rule, so cached errors are
+    capped, merged and summarized like the errors of the validator that made
+    them.
+    """
+
+    __slots__ = ("rule", "columns", "error", "rule_columns")
+
+    def __init__(self, rule, columns, error, rule_columns=()):
+        """
+        Args:
+            rule: hashable key of the validator, unique in the file
+            columns: col indexes of the error
+            error: error dict
+            rule_columns: names of the columns the validator checks
+        """
+        self.rule = rule
+        self.columns = columns
+        self.error = error
+        self.rule_columns = rule_columns
+
+    def render(self) -> dict:
+        return self.error
+
+    @property
+    def row(self):
+        return self.error["row"]
+
+    def __getitem__(self, key):
+        return self.error[key]
+
+    def __eq__(self, other):
+        return self.error == render_error(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.error)
+
+    def __reduce__(self):
+        return dict, (self.error,)
+
+
+def render_error(error) -> dict:
+    """Return the error dict of an error record, error dicts are returned as they are."""
+    if isinstance(error, (ErrorRecord, CachedErrorRecord)):
+        return error.render()
+    return error
+
+
+def get_error_key(error) -> tuple:
+    """Return the rule, row and col(s) of an error, without rendering records.
+
+    Args:
+        error: error dict or error record
+
+    Returns:
+        tuple: (validator copy of a record or error name, row, hashable cols)
+    """
+    if isinstance(error, ErrorRecord):
+        return error.validator, error.row, error.columns
+    if isinstance(error, CachedErrorRecord):
+        return error.rule, error.row, error.columns
+    cols = error["cols"]
+    return error["name"], error["row"], tuple(cols) if isinstance(cols, list) else cols
+
+
+def get_rule_columns(error) -> list:
+    """Return the names of the columns the rule of an error checks.
+
+    Error dicts have no rule, the columns of the error are returned.
+
+    Args:
+        error: error dict or error record
+
+    Returns:
+        list: column names
+    """
+    if isinstance(error, ErrorRecord):
+        return error.validator.get_rule_columns()
+    if isinstance(error, CachedErrorRecord):
+        return list(error.rule_columns)
+    cols = error["cols"]
+    if isinstance(cols, list):
+        return cols
+    return [cols] if cols else []
+
+
+def get_message_template(error: dict):
+    """Return the error message with its row number replaced by "{}".
+
+    Returns:
+        str: message template, None if the message does not name the row
+    """
+    template, count = re.subn(
+        r"la fila {0}\b".format(re.escape(str(error["row"]))),
+        "la fila {}",
+        error["message"],
+        count=1,
+    )
+    return template if count else None
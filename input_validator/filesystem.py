@@ -0,0 +1,146 @@
+import io
+import os
+import posixpath
+import zipfile
+
+from input_validator.lineindex import open_line_index
+
+
+class LocalFileSystem:
+    """Files and directories on disk."""
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def listdir(self, path: str) -> list:
+        return os.listdir(path)
+
+    def getsize(self, path: str) -> int:
+        return os.path.getsize(path)
+
+    def open(self, path: str):
+        """Open a csv file as text.
+
+        Args:
+            path: file path
+
+        Returns:
+            file object
+        """
+        return open(path, encoding="UTF-8-SIG", errors="strict")
+
+    def open_binary(self, path: str):
+        """Open a file as bytes."""
+        return open(path, "rb")
+
+    def open_line_index(self, path: str):
+        """Map a csv file in memory and index its rows."""
+        return open_line_index(path)
+
+    def close(self) -> None:
+        pass
+
+
+class ZipFileSystem:
+    """Members of a zip file seen as files and directories.
+
+    Directories are taken from the member names, so names can be matched
+    against `namelist()` and members are decompressed while they are read,
+    without extracting the zip file to disk.
+    """
+
+    def __init__(self, zip_path: str):
+        """
+        Args:
+            zip_path: zip file path
+        """
+        self.zip_path = zip_path
+        self.zip_file = None
+        self.files = {}
+        self.children = {"": {}}  # directory -> ordered child names
+
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            self.names = zip_ref.namelist()
+            self.sizes = {info.filename: info.file_size for info in zip_ref.infolist()}
+        for member in self.names:
+            path = self.normalize(member)
+            if not member.endswith("/"):
+                self.files[path] = member
+            # register every parent directory of the member
+            while path:
+                parent, name = posixpath.split(path)
+                if path not in self.children and path not in self.files:
+                    self.children[path] = {}
+                self.children.setdefault(parent, {})[name] = None
+                path = parent
+
+    def __getstate__(self) -> dict:
+        # the open zip file is not sent to workers, they open their own
+        state = self.__dict__.copy()
+        state["zip_file"] = None
+        return state
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        """Return a path as a member name without trailing slash, "" is the zip root."""
+        path = posixpath.normpath(path.replace(os.sep, "/")).strip("/")
+        return "" if path == "." else path
+
+    def exists(self, path: str) -> bool:
+        path = self.normalize(path)
+        return path in self.files or path in self.children
+
+    def listdir(self, path: str) -> list:
+        """Return the names in a zip directory, in zip order.
+
+        Raises:
+            FileNotFoundError: if the directory is not in the zip file
+        """
+        try:
+            return list(self.children[self.normalize(path)])
+        except KeyError:
+            raise FileNotFoundError(path)
+
+    def getsize(self, path: str) -> int:
+        """Return the uncompressed size of a zip member.
+
+        Raises:
+            FileNotFoundError: if the member is not in the zip file
+        """
+        try:
+            member = self.files[self.normalize(path)]
+        except KeyError:
+            raise FileNotFoundError(path)
+        return self.sizes[member]
+
+    def open(self, path: str):
+        """Open a zip member as text, it is decompressed while it is read.
+
+        Args:
+            path: member path
+
+        Returns:
+            file object
+        """
+        return io.TextIOWrapper(
+            self.open_binary(path), encoding="UTF-8-SIG", errors="strict"
+        )
+
+    def open_binary(self, path: str):
+        """Open a zip member as bytes, it is decompressed while it is read."""
+        if self.zip_file is None:
+            self.zip_file = zipfile.ZipFile(self.zip_path, "r")
+        try:
+            member = self.files[self.normalize(path)]
+        except KeyError:
+            raise FileNotFoundError(path)
+        return self.zip_file.open(member)
+
+    def open_line_index(self, path: str):
+        """Return None, zip members are decompressed and can not be mapped."""
+        return None
+
+    def close(self) -> None:
+        if self.zip_file is not None:
+            self.zip_file.close()
+            self.zip_file = None
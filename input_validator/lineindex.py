@@ -0,0 +1,95 @@
+import io
+import mmap
+
+import numpy
+
+from input_validator.chunks import find_quote_toggles
+
+
+class LineIndex:
+    """Byte offsets of the rows of a csv file mapped in memory.
+
+    The index is built with a single scan of the file and keeps an uint64
+    offset per row, so the file is split in ranges of about the same rows
+    without reading it as text. Rows start at the beginning of the file and
+    after every newline that is not inside a quoted field, the header is
+    row 0.
+    """
+
+    def __init__(self, file, block_size: int = 1 << 26):
+        """
+        Args:
+            file: csv file opened as bytes, it is closed with the index
+            block_size: bytes searched for newlines at once
+        """
+        self.file = file
+        self.size = self.file.seek(0, io.SEEK_END)
+        # an empty file can not be mapped
+        self.mapping = (
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        )
+        self.starts = self.find_starts(block_size)
+
+    def find_starts(self, block_size: int) -> numpy.ndarray:
+        data = numpy.frombuffer(self.mapping, dtype=numpy.uint8)
+        newlines = numpy.concatenate(
+            [numpy.zeros(0, dtype=numpy.int64)]
+            + [
+                numpy.flatnonzero(data[position : position + block_size] == ord("\n"))
+                + position
+                for position in range(0, self.size, block_size)
+            ]
+        )
+        if self.mapping.find(b'"') != -1:
+            toggles, _ = find_quote_toggles(self.mapping, False, b"")
+            # a newline after an odd number of toggles is inside a quoted field
+            quoted = numpy.searchsorted(toggles, newlines, side="right") % 2 == 1
+            newlines = newlines[~quoted]
+        starts = numpy.concatenate([[0], newlines + 1]).astype(numpy.uint64)
+        return starts[starts < self.size]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __enter__(self) -> "LineIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def split(self, parts: int) -> list:
+        """Split the rows after the header in ranges of about the same rows.
+
+        Args:
+            parts: number of ranges, ranges of a small file can be less
+
+        Returns:
+            list: (start, end) byte offsets of every range, in file order
+        """
+        rows = len(self) - 1
+        starts = sorted(
+            {int(self.starts[1 + rows * part // parts]) for part in range(parts) if rows > 0}
+        ) + [self.size]
+        return [(start, end) for start, end in zip(starts, starts[1:]) if start < end]
+
+    def close(self) -> None:
+        if self.size:
+            self.mapping.close()
+        self.file.close()
+
+
+def open_line_index(path: str) -> LineIndex:
+    """Map a csv file in memory and index its rows.
+
+    Args:
+        path: file path
+
+    Returns:
+        LineIndex: row index of the file
+    """
+    file = open(path, "rb")
+    try:
+        return LineIndex(file)
+    except Exception:
+        file.close()
+        raise
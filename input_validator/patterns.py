@@ -0,0 +1,74 @@
+import fnmatch
+import os
+import re
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def compile_regex(pattern: str) -> re.Pattern:
+    """Compile a value regex once and reuse it for the whole run.
+
+    Args:
+        pattern: regex pattern from the configuration file
+
+    Returns:
+        re.Pattern: compiled pattern
+
+    Raises:
+        re.error: if the pattern is not a valid regex
+    """
+    return re.compile(pattern)
+
+
+@lru_cache(maxsize=None)
+def compile_name_pattern(pattern: str) -> re.Pattern:
+    """Compile a unix filename pattern (as used by glob) once.
+
+    Args:
+        pattern: filename pattern, for instance `ShapeRutas_202[0-9]*.csv`
+
+    Returns:
+        re.Pattern: compiled pattern
+    """
+    return re.compile(fnmatch.translate(os.path.normcase(pattern)))
+
+
+def find_names(path: str, pattern: str, file_system=None) -> list:
+    """Return the names in path that match a unix filename pattern.
+
+    It gives the same names as `glob.glob(os.path.join(path, pattern))` but
+    only the base names are returned and the pattern is compiled just once.
+
+    Args:
+        path: directory to search
+        pattern: unix filename pattern
+        file_system: file system to search, the local one by default
+
+    Returns:
+        list: matching names in directory order
+    """
+    try:
+        names = file_system.listdir(path) if file_system else os.listdir(path)
+    except OSError:
+        return []
+    match = compile_name_pattern(pattern).match
+    include_hidden = pattern.startswith(".")
+    return [
+        name
+        for name in names
+        if (include_hidden or not name.startswith(".")) and match(os.path.normcase(name))
+    ]
+
+
+def search_batch(regex: re.Pattern, values) -> list:
+    """Search a compiled regex over a whole column chunk in one call.
+
+    Args:
+        regex: compiled regex
+        values: column values
+
+    Returns:
+        list: a bool per value, True if the regex was found in the value
+    """
+    search = regex.search
+    return [search(value) is not None for value in values]
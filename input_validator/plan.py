@@ -0,0 +1,262 @@
+import fnmatch
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+from typing import NamedTuple
+
+from input_validator.cache import get_code_version
+from input_validator.scheduler import get_storage_names
+from input_validator.validators import check_name_functions, file_functions
+
+
+class PlanError(Exception):
+    """Errors of a configuration file, all of them are found before reading data."""
+
+    def __init__(self, messages):
+        super().__init__("\n".join(messages))
+        self.messages = messages
+
+
+class RuleSpec(NamedTuple):
+    """A rule of a node with its validator class resolved and its args checked."""
+
+    function: str
+    fun_class: type
+    args: dict
+
+
+class NodePlan(NamedTuple):
+    """A node of the configuration tree, in the order nodes are validated.
+
+    Its position is the list of child indexes from the root to the node.
+    """
+
+    name: object
+    type_name: str
+    path: str
+    position: tuple
+    header: list
+    dependencies: tuple
+    rules: dict
+    rule_specs: tuple
+    produced: frozenset
+    consumed: frozenset
+
+
+def compile_rule_specs(rules, header, file_name, errors) -> tuple:
+    """Resolve the validator classes of node rules and check their args.
+
+    Every validator is built once with its args, which checks them and
+    compiles its patterns. Validators that read args from the file name
+    are checked when the file is found.
+
+    Args:
+        rules: node's format and semantic rules
+        header: file header
+        file_name: file name or name pattern of the node
+        errors: list where error messages are added
+
+    Returns:
+        tuple: RuleSpec of every rule, in the configuration order
+    """
+    rule_specs = []
+    for rule in rules.get("formatRules", []) + rules.get("semanticRules", []):
+        try:
+            rule_name = rule["function"]
+            rule_args = rule["args"]
+        except (KeyError, TypeError) as e:
+            errors.append(
+                "Regla sin la llave {0} en el archivo {1}.".format(e, file_name)
+            )
+            continue
+        fun_class = file_functions.get(rule_name)
+        if fun_class is None:
+            errors.append("Nombre de función '{0}' no válida.".format(rule_name))
+            continue
+        if not isinstance(rule_args, dict):
+            errors.append(
+                "Los argumentos de la función {0} del archivo {1} no son un objeto.".format(
+                    rule_name, file_name
+                )
+            )
+            continue
+        try:
+            fun_class({**rule_args, "file_name": file_name, "header": header})
+        except re.error as e:
+            errors.append(
+                "Expresión regular '{0}' no válida en la función '{1}'.".format(
+                    e.pattern, rule_name
+                )
+            )
+            continue
+        except KeyError as e:
+            errors.append(
+                "Error en la función {0} del archivo {1}, problema con el argumento {2}".format(
+                    rule_name, file_name, e
+                )
+            )
+            continue
+        except Exception as e:
+            if not fun_class.reads_file_name:
+                errors.append(
+                    "Error en la función {0} del archivo {1}, argumentos no válidos: {2}".format(
+                        rule_name, file_name, e
+                    )
+                )
+                continue
+        rule_specs.append(RuleSpec(rule_name, fun_class, rule_args))
+    return tuple(rule_specs)
+
+
+def compile_plan(config) -> "ExecutionPlan":
+    """Compile a configuration tree into an execution plan.
+
+    Args:
+        config: configuration file content
+
+    Returns:
+        ExecutionPlan: plan of the configuration
+
+    Raises:
+        PlanError: with every error of the configuration
+    """
+    nodes = []
+    errors = []
+
+    def compile_node(node, path, position):
+        try:
+            name = node["path"]["name"]
+            type_name = node["path"]["type"]
+            header = node["path"].get("header", "")
+            dependencies = tuple(node["path"].get("dependencies", []))
+            rules = node["rules"]
+        except (KeyError, TypeError, AttributeError) as e:
+            errors.append(
+                "Nodo de la configuración en '{0}' sin la llave {1}.".format(path, e)
+            )
+            return
+        if type_name not in check_name_functions:
+            errors.append("Tipo de ruta '{0}' no válido en '{1}'.".format(type_name, name))
+        rule_specs = ()
+        produced = consumed = frozenset()
+        if rules:
+            errors_count = len(errors)
+            rule_specs = compile_rule_specs(rules, header, name, errors)
+            if len(errors) == errors_count:
+                produced, consumed = map(frozenset, get_storage_names(rules))
+        new_path = path if type_name == "multi-regex" else os.path.join(path, str(name))
+        nodes.append(
+            NodePlan(
+                name,
+                type_name,
+                path,
+                position,
+                header,
+                dependencies,
+                rules,
+                rule_specs,
+                produced,
+                consumed,
+            )
+        )
+        for index, child in enumerate(node.get("children", [])):
+            compile_node(child, new_path, position + (index,))
+
+    compile_node(config, "", ())
+    if errors:
+        raise PlanError(errors)
+    return ExecutionPlan(config, nodes, get_plan_warnings(nodes))
+
+
+def get_plan_warnings(nodes) -> list:
+    """Return the problems of a plan that do not stop a run: dependencies
+    that no previous node matches and storage that no node writes."""
+    warnings = []
+    names = []
+    produced = set()
+    for node in nodes:
+        node_names = node.name if isinstance(node.name, list) else [node.name]
+        for dependency in node.dependencies:
+            if not any(fnmatch.fnmatch(str(name), dependency) for name in names):
+                warnings.append(
+                    "La dependencia {0} de {1} no corresponde a un archivo anterior "
+                    "de la configuración.".format(dependency, node.name)
+                )
+        names.extend(node_names)
+        produced |= node.produced
+    for node in nodes:
+        for storage_name in sorted(node.consumed - produced):
+            warnings.append(
+                "El almacenamiento {0} de {1} no se guarda en ningún archivo de "
+                "la configuración.".format(storage_name, node.name)
+            )
+    return warnings
+
+
+class ExecutionPlan:
+    """A configuration compiled once: its nodes in validation order, with the
+    validator classes of their rules resolved and their args checked.
+
+    A plan is used as a configuration object by the data validator, the
+    node plans are found by their position in the configuration tree.
+    """
+
+    def __init__(self, config, nodes, warnings):
+        """
+        Args:
+            config: configuration file content
+            nodes: NodePlan list, in validation order
+            warnings: problems that do not stop a run
+        """
+        self.config = config
+        self.nodes = tuple(nodes)
+        self.warnings = tuple(warnings)
+        self.nodes_by_position = {node.position: node for node in self.nodes}
+
+    def get_config(self) -> dict:
+        return self.config
+
+    def get_node_plan(self, position: tuple):
+        """Return the plan of the node at a position of the configuration, or None."""
+        return self.nodes_by_position.get(position)
+
+
+def load_plan(configuration: str, cache_path=None) -> ExecutionPlan:
+    """Return the plan of a configuration, compiled or from the plan cache.
+
+    Plans are cached by the hash of the configuration text and of the
+    validators code.
+
+    Args:
+        configuration: configuration file content
+        cache_path: plan cache directory, None to always compile
+
+    Returns:
+        ExecutionPlan: plan of the configuration
+
+    Raises:
+        PlanError: with every error of the configuration
+    """
+    key = hashlib.sha256(
+        "{0}-{1}".format(configuration, get_code_version()).encode("utf-8")
+    ).hexdigest()
+    plan_path = os.path.join(cache_path, "{0}.pickle".format(key)) if cache_path else None
+    if plan_path:
+        try:
+            with open(plan_path, "rb") as file:
+                return pickle.load(file)
+        except Exception:
+            # a missing or broken plan, the configuration is compiled again
+            pass
+
+    plan = compile_plan(json.loads(configuration))
+    if plan_path:
+        os.makedirs(cache_path, exist_ok=True)
+        file_descriptor, temporal_path = tempfile.mkstemp(dir=cache_path, suffix=".tmp")
+        with os.fdopen(file_descriptor, "wb") as file:
+            pickle.dump(plan, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal_path, plan_path)
+    return plan
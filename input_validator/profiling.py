@@ -0,0 +1,226 @@
+import json
+import time
+from contextlib import contextmanager
+
+
+def get_rule_name(named_fun) -> str:
+    """Return the validator class with the names of the columns it reads."""
+    header = named_fun.args.get("header") or []
+    cols = [
+        header[index] if isinstance(index, int) and index < len(header) else str(index)
+        for index in getattr(named_fun, "cols_indexes", [])
+    ]
+    if not cols:
+        return type(named_fun).__name__
+    if len(cols) > 3:
+        cols = cols[:3] + ["+{0}".format(len(cols) - 3)]
+    return "{0}({1})".format(type(named_fun).__name__, ",".join(cols))
+
+
+class ValidatorStats:
+    """Calls, failures and time of a validator of a file."""
+
+    __slots__ = ("file", "rule", "calls", "failures", "seconds")
+
+    def __init__(self, file, rule):
+        self.file = file
+        self.rule = rule
+        self.calls = 0
+        self.failures = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "file": self.file,
+            "rule": self.rule,
+            "calls": self.calls,
+            "failures": self.failures,
+            "seconds": self.seconds,
+        }
+
+
+class FileStats:
+    """Rows, read and parse time and total time of a file."""
+
+    __slots__ = ("file", "rows", "read_seconds", "seconds")
+
+    def __init__(self, file):
+        self.file = file
+        self.rows = 0
+        self.read_seconds = 0.0
+        self.seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "file": self.file,
+            "rows": self.rows,
+            "read_seconds": self.read_seconds,
+            "seconds": self.seconds,
+        }
+
+
+class Profiler:
+    """Counters of a validation run, per validator and per file.
+
+    The data validator only wraps its rules and csv readers with the
+    profiler when one is given, so runs without a profiler do not pay for it.
+    """
+
+    def __init__(self, validators=True):
+        """
+        Args:
+            validators: count calls, failures and time of every validator
+                and the read time of files, if False only file times are kept
+        """
+        self.validators = validators
+        self.validator_stats = []
+        self.file_stats = {}
+
+    def empty_copy(self):
+        """Return a profiler with the same options and no counters, for workers."""
+        return type(self)(self.validators)
+
+    def get_file_stats(self, name) -> FileStats:
+        stats = self.file_stats.get(name)
+        if stats is None:
+            stats = self.file_stats[name] = FileStats(name)
+        return stats
+
+    def get_validator_stats(self, name, named_fun) -> ValidatorStats:
+        # stats live in the validator, so every wrapper of a rule shares them
+        stats = getattr(named_fun, "profile_stats", None)
+        if stats is None:
+            stats = ValidatorStats(name, get_rule_name(named_fun))
+            named_fun.profile_stats = stats
+            self.validator_stats.append(stats)
+        return stats
+
+    def wrap_apply(self, name, named_fun, apply):
+        """Return apply counting its calls, failures and time.
+
+        File validators report their error after the last row, their calls
+        are not counted as failures.
+        """
+        stats = self.get_validator_stats(name, named_fun)
+        perf_counter = time.perf_counter
+        counts_failures = named_fun.get_fun_type().name != "FILE"
+
+        def profiled_apply(row):
+            start = perf_counter()
+            result = apply(row)
+            stats.seconds += perf_counter() - start
+            stats.calls += 1
+            if result is False and counts_failures:
+                stats.failures += 1
+            return result
+
+        return profiled_apply
+
+    def wrap_rules(self, name, rules_lists) -> list:
+        """Wrap the apply methods of lists of (validator, apply method).
+
+        Args:
+            name: file name
+            rules_lists: lists of (validator, apply method)
+
+        Returns:
+            list: the lists with profiled apply methods
+        """
+        if not self.validators:
+            return rules_lists
+        return [
+            [
+                (named_fun, self.wrap_apply(name, named_fun, apply))
+                for named_fun, apply in rules_list
+            ]
+            for rules_list in rules_lists
+        ]
+
+    def add_batch(self, name, named_fun, seconds, rows, failures) -> None:
+        """Count a batch check of a chunk of rows."""
+        if self.validators:
+            stats = self.get_validator_stats(name, named_fun)
+            stats.calls += rows
+            stats.failures += failures
+            stats.seconds += seconds
+
+    def read_rows(self, name, rows):
+        """Yield csv rows counting them and the time spent reading them."""
+        if not self.validators:
+            yield from rows
+            return
+        stats = self.get_file_stats(name)
+        perf_counter = time.perf_counter
+        iterator = iter(rows)
+        while True:
+            start = perf_counter()
+            try:
+                row = next(iterator)
+            except StopIteration:
+                stats.read_seconds += perf_counter() - start
+                return
+            stats.read_seconds += perf_counter() - start
+            stats.rows += 1
+            yield row
+
+    @contextmanager
+    def time_file(self, name):
+        """Add the time of the block to the time of a file."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.get_file_stats(name).seconds += time.perf_counter() - start
+
+    def merge(self, profiler) -> None:
+        """Add the counters of a worker profiler."""
+        self.validator_stats.extend(profiler.validator_stats)
+        for name, stats in profiler.file_stats.items():
+            file_stats = self.get_file_stats(name)
+            file_stats.rows += stats.rows
+            file_stats.read_seconds += stats.read_seconds
+            file_stats.seconds += stats.seconds
+
+    def to_dict(self) -> dict:
+        """Return the counters, validators sorted by time."""
+        return {
+            "files": [
+                stats.to_dict()
+                for stats in sorted(
+                    self.file_stats.values(), key=lambda stats: -stats.seconds
+                )
+            ],
+            "validators": [
+                stats.to_dict()
+                for stats in sorted(self.validator_stats, key=lambda stats: -stats.seconds)
+            ],
+        }
+
+    def write_json(self, file_path) -> None:
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+
+    def format_table(self) -> str:
+        """Return the counters as text tables, sorted by time."""
+        profile = self.to_dict()
+        lines = ["{0:<50} {1:>10} {2:>12} {3:>10}".format("Archivo", "Filas", "Lectura (s)", "Total (s)")]
+        for stats in profile["files"]:
+            lines.append(
+                "{0:<50} {1:>10} {2:>12.3f} {3:>10.3f}".format(
+                    stats["file"], stats["rows"], stats["read_seconds"], stats["seconds"]
+                )
+            )
+        if profile["validators"]:
+            lines.append("")
+            lines.append(
+                "{0:<50} {1:<50} {2:>10} {3:>10} {4:>10}".format(
+                    "Archivo", "Validador", "Llamadas", "Fallas", "Tiempo (s)"
+                )
+            )
+        for stats in profile["validators"]:
+            lines.append(
+                "{0:<50} {1:<50} {2:>10} {3:>10} {4:>10.3f}".format(
+                    stats["file"], stats["rule"], stats["calls"], stats["failures"], stats["seconds"]
+                )
+            )
+        return "\n".join(lines)
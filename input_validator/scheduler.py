@@ -0,0 +1,280 @@
+import fnmatch
+from collections import deque
+from concurrent import futures
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from input_validator.validators import file_functions
+
+
+def get_storage_names(rules: dict) -> tuple:
+    """Return the storage names that node rules write and read.
+
+    Args:
+        rules: node's format and semantic rules
+
+    Returns:
+        tuple: (set of produced storage names, set of consumed storage names)
+    """
+    produced = set()
+    consumed = set()
+    for rule in rules.get("formatRules", []) + rules.get("semanticRules", []):
+        fun_class = file_functions.get(rule.get("function"))
+        storage_name = rule.get("args", {}).get("storage_name")
+        if fun_class is None or storage_name is None:
+            continue
+        if fun_class.stores_data:
+            produced.add(storage_name)
+        else:
+            consumed.add(storage_name)
+    return produced, consumed
+
+
+class NodeTask:
+    """Rules validation of a configuration node sent to a worker."""
+
+    def __init__(self, produced: set, consumed: set, future: Future):
+        """
+        Args:
+            produced: storage names written by the task
+            consumed: storage names read by the task
+            future: worker result
+        """
+        self.produced = produced
+        self.consumed = consumed
+        self.future = future
+        self.merged = False
+
+
+class ScheduledNode:
+    """A configuration node waiting for its predecessors or validated, with
+    the errors and report rows of its validation and of its children."""
+
+    def __init__(self, position: tuple, fun, args: tuple):
+        """
+        Args:
+            position: child indexes from the root to the node
+            fun: node validation, called as fun(*args)
+            args: node validation args
+        """
+        self.position = position
+        self.fun = fun
+        self.args = args
+        self.tasks = []
+        self.reports = deque()
+        self.visited = False
+
+
+def get_node_predecessors(nodes) -> dict:
+    """Return the previous nodes of a plan that every node waits for.
+
+    A node waits for the previous nodes whose names match its dependencies,
+    for the ones that write a storage it reads or writes and for the ones
+    that read a storage it writes. A dependency that matches no previous
+    node name (a file name that only its regex matches) makes the node wait
+    for every previous node.
+
+    Args:
+        nodes: NodePlan list, in validation order
+
+    Returns:
+        dict: positions of the predecessors by node position
+    """
+    predecessors = {}
+    for index, node in enumerate(nodes):
+        previous_nodes = nodes[:index]
+        waits = set()
+        for dependency in node.dependencies:
+            matches = [
+                previous.position
+                for previous in previous_nodes
+                if any(
+                    fnmatch.fnmatch(str(name), dependency)
+                    for name in (
+                        previous.name if isinstance(previous.name, list) else [previous.name]
+                    )
+                )
+            ]
+            waits.update(matches or [previous.position for previous in previous_nodes])
+        waits.update(
+            previous.position
+            for previous in previous_nodes
+            if previous.produced & (node.produced | node.consumed)
+            or previous.consumed & node.produced
+        )
+        predecessors[node.position] = tuple(sorted(waits))
+    return predecessors
+
+
+class NodeScheduler:
+    """Run the rules of configuration nodes in a process pool.
+
+    Nodes are validated as soon as the previous nodes they depend on are:
+    the ones whose file names match their `dependencies` patterns and the
+    ones whose storage they read or write, as given by
+    get_node_predecessors. Storage written by a worker is shipped back and
+    merged into the data validator before being sent to the next node that
+    needs it, and errors are reported in the depth-first order of the
+    configuration tree, so the result is the same as a sequential run.
+    """
+
+    def __init__(self, data_validator, jobs: int, nodes):
+        """
+        Args:
+            data_validator: DataValidator that walks the configuration tree
+            jobs: number of worker processes
+            nodes: NodePlan list of the configuration, in validation order
+        """
+        self.data_validator = data_validator
+        self.executor = ProcessPoolExecutor(max_workers=jobs)
+        self.predecessors = get_node_predecessors(nodes)
+        self.nodes = {}
+        self.waiting = []
+        self.current = None
+        self.tasks = []
+        self.reports = deque()
+
+    def add_node(self, position: tuple, fun, *args) -> None:
+        """Add a configuration node, it is validated by join when the nodes
+        it depends on are.
+
+        Args:
+            position: child indexes from the root to the node
+            fun: node validation, called as fun(*args)
+        """
+        node = ScheduledNode(position, fun, args)
+        self.nodes[position] = node
+        self.waiting.append(node)
+        self.get_reports().append(node)
+
+    def is_finished(self, position: tuple) -> bool:
+        """Return True if a node was validated and its tasks were merged, or
+        if it is not validated because a parent did not reach it."""
+        node = self.nodes.get(position)
+        if node is not None:
+            return node.visited and all(task.merged for task in node.tasks)
+        if not position:
+            return False
+        parent = self.nodes.get(position[:-1])
+        if parent is not None:
+            return parent.visited
+        return self.is_finished(position[:-1])
+
+    def visit(self, node) -> None:
+        """Validate a node, its tasks and errors are added to the node."""
+        self.waiting.remove(node)
+        previous, self.current = self.current, node
+        try:
+            node.fun(*node.args)
+        finally:
+            self.current = previous
+            node.visited = True
+
+    def submit(self, fun, rules: dict, *args) -> NodeTask:
+        """Send a node's rules validation to the pool.
+
+        Args:
+            fun: worker function, called as fun(storage, rules, *args)
+            rules: node's format and semantic rules
+
+        Returns:
+            NodeTask: submitted task
+        """
+        produced, consumed = get_storage_names(rules)
+        # tasks of other nodes are ordered by the node predecessors, the ones
+        # of the same node (a file per service detail) are ordered here
+        self.wait_for(
+            task for task in self.tasks if task.produced & (produced | consumed)
+        )
+        storage = {
+            storage_name: self.data_validator.storage[storage_name]
+            for storage_name in produced | consumed
+            if storage_name in self.data_validator.storage
+        }
+        future = self.executor.submit(fun, storage, rules, *args)
+        task = NodeTask(produced, consumed, future)
+        self.tasks.append(task)
+        if self.current:
+            self.current.tasks.append(task)
+        return task
+
+    def wait_for(self, tasks) -> None:
+        """Wait for tasks and merge their results in the data validator."""
+        for task in list(tasks):
+            if task.merged:
+                continue
+            result = task.future.result()
+            self.data_validator.files_checked.update(result["files_checked"])
+            for storage_name, values in result["storage"].items():
+                self.data_validator.storage[storage_name] = values
+            if result["profiler"]:
+                self.data_validator.profiler.merge(result["profiler"])
+            task.merged = True
+
+    def get_reports(self) -> deque:
+        return self.current.reports if self.current else self.reports
+
+    def add_errors(self, name, errors) -> None:
+        """Queue errors of a file, errors is a list or a NodeTask."""
+        self.get_reports().append((name, errors))
+
+    def add_report(self, row: list) -> None:
+        """Queue a [name, path] row of the data validator report."""
+        self.get_reports().append(row)
+
+    def drain(self, wait=False) -> None:
+        """Store the queued errors and report rows, in the order of the
+        configuration tree, up to the first node or task that is not done.
+
+        Args:
+            wait: wait for the running tasks and store all the errors
+        """
+        self.drain_reports(self.reports, wait)
+
+    def drain_reports(self, reports: deque, wait: bool) -> bool:
+        while reports:
+            entry = reports[0]
+            if isinstance(entry, ScheduledNode):
+                if not (self.drain_reports(entry.reports, wait) and entry.visited):
+                    return False
+            elif isinstance(entry, list):
+                self.data_validator.report.append(entry)
+            else:
+                name, errors = entry
+                if isinstance(errors, NodeTask):
+                    if not (wait or errors.future.done()):
+                        return False
+                    result = errors.future.result()
+                    # the task keeps its result, stored errors are released
+                    errors, result["errors"] = result["errors"], []
+                    self.data_validator.store_errors(name, errors, result["summaries"])
+                else:
+                    self.data_validator.store_errors(name, errors)
+            reports.popleft()
+        return True
+
+    def join(self) -> None:
+        """Validate every node, each one when its predecessors are finished,
+        and report the errors in the order of the configuration tree."""
+        while True:
+            self.wait_for(task for task in self.tasks if task.future.done())
+            self.drain()
+            running = [task.future for task in self.tasks if not task.merged]
+            if not (self.waiting or running):
+                break
+            ready = [
+                node
+                for node in self.waiting
+                if all(
+                    self.is_finished(position)
+                    for position in self.predecessors.get(node.position, ())
+                )
+            ]
+            if ready or not running:
+                # the first node of the tree, a node never waits for a later one
+                self.visit(min(ready or self.waiting, key=lambda node: node.position))
+            else:
+                futures.wait(running, return_when=futures.FIRST_COMPLETED)
+        self.drain(wait=True)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
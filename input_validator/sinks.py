@@ -0,0 +1,847 @@
+import csv
+import json
+import os
+import sqlite3
+from collections import Counter, defaultdict, deque
+
+from input_validator.errors import (
+    get_error_key,
+    get_message_template,
+    get_rule_columns,
+    render_error,
+)
+
+CSV_HEADER = ["Archivo", "Error", "Tipo", "Fila", "Columna(s)", "Detalle"]
+SUMMARY_CSV_HEADER = [
+    "Archivo",
+    "Error",
+    "Tipo",
+    "Columna(s)",
+    "Errores",
+    "Errores omitidos",
+    "Primera fila",
+    "Última fila",
+]
+
+
+def get_csv_row(name, error) -> list:
+    """Return an error as a row of the errors csv file.
+
+    Args:
+        name: file name
+        error: error dict
+
+    Returns:
+        list: row values
+    """
+    return [
+        name,
+        error["name"],
+        error["type"],
+        error["row"],
+        ",".join(error["cols"]) if isinstance(error["cols"], list) else error["cols"],
+        error["message"],
+    ]
+
+
+ERROR_COLUMNS = ["file", "rule", "type", "first_row", "last_row", "cols", "message"]
+SUMMARY_COLUMNS = [
+    "file",
+    "rule",
+    "type",
+    "cols",
+    "errors",
+    "suppressed",
+    "first_row",
+    "last_row",
+]
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS errors (
+    report TEXT NOT NULL,
+    file TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    type TEXT,
+    first_row INTEGER,
+    last_row INTEGER,
+    cols TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS errors_file_rule_row ON errors (file, rule, first_row);
+CREATE INDEX IF NOT EXISTS errors_report ON errors (report);
+CREATE TABLE IF NOT EXISTS summary (
+    report TEXT NOT NULL,
+    file TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    type TEXT,
+    cols TEXT,
+    errors INTEGER,
+    suppressed INTEGER,
+    first_row INTEGER,
+    last_row INTEGER
+);
+CREATE INDEX IF NOT EXISTS summary_file_rule ON summary (file, rule);
+CREATE INDEX IF NOT EXISTS summary_report ON summary (report);
+"""
+
+
+def get_row_range(row) -> tuple:
+    """Return the first and last row of an error row, a number or a "first-last"
+    range. File errors have no rows.
+
+    Returns:
+        tuple: (first row, last row), (None, None) if there are no rows
+    """
+    if row == "":
+        return None, None
+    if isinstance(row, str):
+        first_row, _, last_row = row.partition("-")
+        return int(first_row), int(last_row or first_row)
+    return row, row
+
+
+def get_error_values(name, error) -> tuple:
+    """Return an error as the values of ERROR_COLUMNS.
+
+    Args:
+        name: file name
+        error: error dict
+
+    Returns:
+        tuple: column values
+    """
+    return (
+        name if isinstance(name, str) else str(name),
+        error["name"],
+        error["type"],
+        *get_row_range(error["row"]),
+        ",".join(error["cols"]) if isinstance(error["cols"], list) else error["cols"],
+        error["message"],
+    )
+
+
+def get_summary_values(summary) -> tuple:
+    """Return a summary dict as the values of SUMMARY_COLUMNS."""
+    first_row = summary["first_row"]
+    last_row = summary["last_row"]
+    return (
+        summary["file"] if isinstance(summary["file"], str) else str(summary["file"]),
+        summary["name"],
+        summary["type"],
+        ",".join(summary["cols"]),
+        summary["errors"],
+        summary["suppressed"],
+        None if first_row == "" else first_row,
+        None if last_row == "" else last_row,
+    )
+
+
+def get_summary_csv_row(summary) -> list:
+    """Return a rule summary as a row of the errors csv file.
+
+    Args:
+        summary: summary dict
+
+    Returns:
+        list: row values
+    """
+    return [
+        summary["file"],
+        summary["name"],
+        summary["type"],
+        ",".join(summary["cols"]),
+        summary["errors"],
+        summary["suppressed"],
+        summary["first_row"],
+        summary["last_row"],
+    ]
+
+
+class ErrorSink:
+    """Destination of the errors found while validating."""
+
+    caps = None  # error caps applied by the sink, workers apply them too
+    appends = False  # True if reports of many runs can be written to the same file
+    summarized = False  # True if the report always has a summary, even without caps
+
+    def write(self, name, error) -> None:
+        """Write an error.
+
+        Args:
+            name: file name
+            error: error dict or error record
+        """
+        raise NotImplementedError
+
+    def write_summary(self, summaries) -> None:
+        """Write the error summary of the validation.
+
+        Args:
+            summaries: summary dicts, one per file and rule
+        """
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class StreamingReport(list):
+    """A file error list that writes its errors to a sink instead of keeping them."""
+
+    def __init__(self, error_sink, name):
+        """
+        Args:
+            error_sink: sink to write the errors
+            name: file name
+        """
+        super().__init__()
+        self.error_sink = error_sink
+        self.name = name
+
+    def append(self, error) -> None:
+        self.error_sink.write(self.name, error)
+
+    def extend(self, errors) -> None:
+        for error in errors:
+            self.append(error)
+
+
+class FailFastReport(list):
+    """A file error list that keeps its first max_errors errors and drops the
+    rest, the file check stops reading rows when it is full."""
+
+    def __init__(self, max_errors, error_sink=None, name=None):
+        """
+        Args:
+            max_errors: number of errors to keep
+            error_sink: sink to write the errors, or None to keep them
+            name: file name
+        """
+        super().__init__()
+        self.max_errors = max_errors
+        self.error_sink = error_sink
+        self.name = name
+        self.errors = 0
+
+    @property
+    def full(self) -> bool:
+        return self.errors >= self.max_errors
+
+    def append(self, error) -> None:
+        if self.errors >= self.max_errors:
+            return
+        self.errors += 1
+        if self.error_sink:
+            self.error_sink.write(self.name, error)
+        else:
+            super().append(error)
+
+    def extend(self, errors) -> None:
+        for error in errors:
+            self.append(error)
+
+    def __reduce__(self):
+        # sent back from workers as the kept errors
+        return list, (list(self),)
+
+
+class MemoryErrorSink(ErrorSink):
+    """Keep errors in memory, as they were written."""
+
+    def __init__(self):
+        self.errors = []
+        self.summaries = []
+
+    def write(self, name, error) -> None:
+        self.errors.append((name, error))
+
+    def write_summary(self, summaries) -> None:
+        self.summaries.extend(summaries)
+
+    @property
+    def report_errors(self) -> defaultdict:
+        """Errors by file name as error dicts."""
+        report_errors = defaultdict(list)
+        for name, error in self.errors:
+            report_errors[name].append(render_error(error))
+        return report_errors
+
+
+class BufferedErrorSink(ErrorSink):
+    """Render errors and write them in blocks of `buffer_size` errors."""
+
+    def __init__(self, buffer_size=1000):
+        """
+        Args:
+            buffer_size: number of errors kept before writing them
+        """
+        self.buffer_size = buffer_size
+        self.buffer = []
+
+    def write_buffer(self) -> None:
+        raise NotImplementedError
+
+    def write(self, name, error) -> None:
+        self.buffer.append((name, render_error(error)))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.write_buffer()
+            self.buffer = []
+
+
+class BufferedFileErrorSink(BufferedErrorSink):
+    """Write rendered errors to a text file in blocks.
+
+    Every block is flushed to disk, so a killed run keeps the errors found
+    until its last flush and memory does not grow with the number of errors.
+    """
+
+    encoding = "utf-8"
+
+    def __init__(self, file_path, buffer_size=1000):
+        """
+        Args:
+            file_path: output file path
+            buffer_size: number of errors kept before writing them
+        """
+        super().__init__(buffer_size)
+        self.file = open(file_path, "w", newline="", encoding=self.encoding)
+        self.write_header()
+        self.file.flush()
+
+    def write_header(self) -> None:
+        pass
+
+    def flush(self) -> None:
+        super().flush()
+        self.file.flush()
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+class CsvErrorSink(BufferedFileErrorSink):
+    """Errors csv file, with the same columns as write_errors_to_csv."""
+
+    encoding = "utf-8-SIG"
+
+    def write_header(self) -> None:
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(CSV_HEADER)
+
+    def write_buffer(self) -> None:
+        self.writer.writerows(get_csv_row(name, error) for name, error in self.buffer)
+
+    def write_summary(self, summaries) -> None:
+        if not summaries:
+            return
+        # the summary section goes after the errors, separated by an empty row
+        self.flush()
+        self.writer.writerow([])
+        self.writer.writerow(SUMMARY_CSV_HEADER)
+        self.writer.writerows(get_summary_csv_row(summary) for summary in summaries)
+        self.file.flush()
+
+
+class JsonLinesErrorSink(BufferedFileErrorSink):
+    """One json object per error, with the file name in the `file` key."""
+
+    def write_buffer(self) -> None:
+        self.file.writelines(
+            json.dumps({"file": name, **error}, ensure_ascii=False) + "\n"
+            for name, error in self.buffer
+        )
+
+    def write_summary(self, summaries) -> None:
+        self.flush()
+        self.file.writelines(
+            json.dumps({"summary": summary}, ensure_ascii=False) + "\n"
+            for summary in summaries
+        )
+        self.file.flush()
+
+
+class SqliteErrorSink(BufferedErrorSink):
+    """Errors in a SQLite database, one row per error.
+
+    Errors go to the `errors` table and the failures of every rule to the
+    `summary` table, both indexed by file and rule. Rows are tagged with the
+    report name, so reports of many days can be added to the same database,
+    a report that is written again replaces its rows. The summary is the one
+    given to write_summary, wrap the sink in a CappedErrorSink, with or
+    without caps, to count it.
+    """
+
+    appends = True
+    summarized = True
+
+    def __init__(self, file_path, report_name=None, buffer_size=10000):
+        """
+        Args:
+            file_path: database path, it is created if it does not exist
+            report_name: name of the report rows, the file name without
+                extension by default
+            buffer_size: number of errors kept before inserting them
+        """
+        super().__init__(buffer_size)
+        self.report_name = report_name or os.path.splitext(os.path.basename(file_path))[0]
+        self.connection = sqlite3.connect(file_path)
+        self.connection.executescript(SQLITE_SCHEMA)
+        summary_columns = [
+            column[1] for column in self.connection.execute("PRAGMA table_info(summary)")
+        ]
+        if "cols" not in summary_columns:
+            # databases of older reports have no rule columns in their summary
+            self.connection.execute("ALTER TABLE summary ADD COLUMN cols TEXT")
+        for table in ["errors", "summary"]:
+            self.connection.execute(
+                f"DELETE FROM {table} WHERE report = ?", (self.report_name,)
+            )
+        self.connection.commit()
+
+    def write_buffer(self) -> None:
+        self.connection.executemany(
+            "INSERT INTO errors VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (self.report_name,) + get_error_values(name, error)
+                for name, error in self.buffer
+            ],
+        )
+
+    def flush(self) -> None:
+        super().flush()
+        self.connection.commit()
+
+    def write_summary(self, summaries) -> None:
+        self.connection.executemany(
+            "INSERT INTO summary (report, {0}) VALUES (?, {1})".format(
+                ", ".join(SUMMARY_COLUMNS), ", ".join("?" * len(SUMMARY_COLUMNS))
+            ),
+            [
+                (self.report_name,) + get_summary_values(summary)
+                for summary in summaries
+            ],
+        )
+
+    def close(self) -> None:
+        if self.connection is None:
+            return
+        self.flush()
+        self.connection.close()
+        self.connection = None
+
+
+class ParquetErrorSink(BufferedErrorSink):
+    """Errors in a parquet file, written in a row group per block of errors.
+
+    The summary is written to a `_resumen.parquet` file next to the errors
+    file. Needs pyarrow.
+    """
+
+    def __init__(self, file_path, buffer_size=65536):
+        """
+        Args:
+            file_path: output file path
+            buffer_size: number of errors per row group
+
+        Raises:
+            ImportError: if pyarrow is not installed
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("El formato parquet necesita el paquete pyarrow.")
+        super().__init__(buffer_size)
+        self.pyarrow = pyarrow
+        self.file_path = file_path
+        self.schema = pyarrow.schema(
+            [
+                (column, pyarrow.int64() if column.endswith("_row") else pyarrow.string())
+                for column in ERROR_COLUMNS
+            ]
+        )
+        self.writer = pyarrow.parquet.ParquetWriter(file_path, self.schema)
+
+    def write_buffer(self) -> None:
+        rows = [
+            dict(zip(ERROR_COLUMNS, get_error_values(name, error)))
+            for name, error in self.buffer
+        ]
+        self.writer.write_table(
+            self.pyarrow.Table.from_pylist(rows, schema=self.schema)
+        )
+
+    def write_summary(self, summaries) -> None:
+        rows = [
+            dict(zip(SUMMARY_COLUMNS, get_summary_values(summary)))
+            for summary in summaries
+        ]
+        self.pyarrow.parquet.write_table(
+            self.pyarrow.Table.from_pylist(rows),
+            os.path.splitext(self.file_path)[0] + "_resumen.parquet",
+        )
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.flush()
+            self.writer.close()
+            self.writer = None
+
+
+class LogErrorSink(ErrorSink):
+    """Log errors, grouped under the name of their file."""
+
+    def __init__(self, logger):
+        self.log = logger
+        self.last_name = None
+
+    def write(self, name, error) -> None:
+        if name != self.last_name:
+            self.log.error(f"{name} contiene los siguientes errores:")
+            self.last_name = name
+        self.log.error(render_error(error))
+
+    def write_summary(self, summaries) -> None:
+        if summaries:
+            self.log.info("Resumen de errores:")
+        for summary in summaries:
+            self.log.info(summary)
+
+
+class TeeErrorSink(ErrorSink):
+    """Write errors to several sinks."""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def write(self, name, error) -> None:
+        error = render_error(error)
+        for sink in self.sinks:
+            sink.write(name, error)
+
+    def write_summary(self, summaries) -> None:
+        for sink in self.sinks:
+            sink.write_summary(summaries)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+class RuleSummary:
+    """Failures of a rule in a file."""
+
+    __slots__ = (
+        "name",
+        "first_error",
+        "columns",
+        "errors",
+        "reported",
+        "first_row",
+        "last_row",
+    )
+
+    def __init__(self, name, first_error):
+        """
+        Args:
+            name: file name
+            first_error: first error of the rule, error dict or error record
+        """
+        self.name = name
+        self.first_error = first_error
+        self.columns = get_rule_columns(first_error)
+        self.errors = 0
+        self.reported = 0
+        self.first_row = ""
+        self.last_row = ""
+
+    def add(self, row) -> int:
+        """Count the failures of an error of the rule.
+
+        Args:
+            row: error row, a "first-last" row range or "" for file errors
+
+        Returns:
+            int: number of failures of the error
+        """
+        first_row, last_row = get_row_range(row)
+        if first_row is None:
+            self.errors += 1
+            return 1
+        if self.first_row == "":
+            self.first_row = first_row
+        self.last_row = last_row
+        count = last_row - first_row + 1
+        self.errors += count
+        return count
+
+    def get_summary(self) -> dict:
+        """Return the summary dict, the first error is rendered to name the rule.
+
+        Rules with the same name, like two duplicate checks, are told apart by
+        the columns they check.
+        """
+        error = render_error(self.first_error)
+        return {
+            "file": self.name,
+            "name": error["name"],
+            "type": error["type"],
+            "cols": self.columns,
+            "errors": self.errors,
+            "suppressed": self.errors - self.reported,
+            "first_row": self.first_row,
+            "last_row": self.last_row,
+        }
+
+
+class CappedErrorSink(ErrorSink):
+    """Write at most a number of errors per file, per rule and per rule column.
+
+    Caps apply inside a file, a rule is a validator of the file. Errors over
+    a cap are counted but not written, error records over a cap are never
+    rendered, so a rule that fails every row does not format its messages.
+    When the sink is closed, a summary with the failures of every rule is
+    written to the wrapped sink.
+    """
+
+    def __init__(
+        self,
+        error_sink,
+        max_file_errors=None,
+        max_rule_errors=None,
+        max_column_errors=None,
+    ):
+        """
+        Args:
+            error_sink: sink to write the errors under the caps
+            max_file_errors: max errors written per file, None for no cap
+            max_rule_errors: max errors written per rule, None for no cap
+            max_column_errors: max errors written per rule and columns, None
+                for no cap
+        """
+        self.error_sink = error_sink
+        self.caps = {
+            "max_file_errors": max_file_errors,
+            "max_rule_errors": max_rule_errors,
+            "max_column_errors": max_column_errors,
+        }
+        self.file_errors = Counter()
+        self.rule_errors = Counter()
+        self.column_errors = Counter()
+        self.rule_summaries = {}  # (file, rule) -> RuleSummary
+        self.summaries = []  # RuleSummary or summary dicts made by workers
+
+    @staticmethod
+    def is_full(count, cap) -> bool:
+        return cap is not None and count >= cap
+
+    def write(self, name, error) -> None:
+        file_key = tuple(name) if isinstance(name, list) else name
+        rule, row, columns = get_error_key(error)
+
+        summary = self.rule_summaries.get((file_key, rule))
+        if summary is None:
+            summary = RuleSummary(name, error)
+            self.rule_summaries[(file_key, rule)] = summary
+            self.summaries.append(summary)
+        count = summary.add(row)
+
+        column_key = (file_key, rule, columns)
+        if (
+            self.is_full(self.file_errors[file_key], self.caps["max_file_errors"])
+            or self.is_full(
+                self.rule_errors[(file_key, rule)], self.caps["max_rule_errors"]
+            )
+            or self.is_full(
+                self.column_errors[column_key], self.caps["max_column_errors"]
+            )
+        ):
+            return
+        self.file_errors[file_key] += 1
+        self.rule_errors[(file_key, rule)] += 1
+        self.column_errors[column_key] += 1
+        summary.reported += count
+        self.error_sink.write(name, error)
+
+    def write_capped(self, name, errors, summaries) -> None:
+        """Write errors a worker has already capped, with their summaries.
+
+        Args:
+            name: file name
+            errors: errors under the caps
+            summaries: summary dicts of the worker
+        """
+        for error in errors:
+            self.error_sink.write(name, error)
+        self.summaries.extend(summaries)
+
+    def get_summaries(self) -> list:
+        """Return the summary dicts, in the order rules first failed."""
+        return [
+            summary if isinstance(summary, dict) else summary.get_summary()
+            for summary in self.summaries
+        ]
+
+    def flush(self) -> None:
+        self.error_sink.flush()
+
+    def close(self) -> None:
+        self.error_sink.write_summary(self.get_summaries())
+        self.error_sink.close()
+
+
+class ErrorRun:
+    """Errors of a rule in consecutive rows that only differ in their row."""
+
+    __slots__ = (
+        "name",
+        "error",
+        "key",
+        "first_row",
+        "last_row",
+        "rendered",
+        "template",
+        "closed",
+    )
+
+    def __init__(self, name, error, key):
+        """
+        Args:
+            name: file name
+            error: first error, error dict or error record
+            key: (rule, row, cols) of the error
+        """
+        self.name = name
+        self.error = error
+        self.key = key
+        self.first_row = self.last_row = key[1]
+        self.rendered = None
+        self.template = None
+        self.closed = False
+
+    def get_template(self):
+        """Return the message template of the run, the first error is rendered once."""
+        if self.rendered is None:
+            self.rendered = render_error(self.error)
+            self.template = get_message_template(self.rendered)
+        return self.template
+
+    def extends(self, row, error) -> bool:
+        """Return True if the error of the rule in row continues the run."""
+        if row != self.last_row + 1:
+            return False
+        template = self.get_template()
+        return template is not None and template == get_message_template(
+            render_error(error)
+        )
+
+    def get_error(self):
+        """Return the error of the run, with a row range if it has many rows."""
+        if self.first_row == self.last_row:
+            return self.error
+        rows = "{0}-{1}".format(self.first_row, self.last_row)
+        error = dict(self.rendered)
+        error["row"] = rows
+        error["message"] = self.template.replace("la fila {}", "las filas " + rows, 1)
+        return error
+
+
+class RunLengthErrorSink(ErrorSink):
+    """Merge the errors of a rule in consecutive rows into a row range error.
+
+    Errors of the same file, rule and col(s) in consecutive rows are merged
+    when their messages are equal apart from the row, so no information is
+    lost: the error gets a "first-last" row and its message names the rows.
+    Rules that fail together in a block of rows give a range each, written
+    in the order of their first error. Errors are only rendered when they
+    can continue a run.
+    """
+
+    def __init__(self, error_sink, max_pending=10000):
+        """
+        Args:
+            error_sink: sink to write the merged errors
+            max_pending: max runs waiting for an earlier run to be closed
+        """
+        self.error_sink = error_sink
+        self.max_pending = max_pending
+        self.name = None
+        self.runs = {}  # (rule, cols) -> open run
+        self.pending = deque()  # runs not written, in order of their first error
+
+    def write(self, name, error) -> None:
+        rule, row, columns = key = get_error_key(error)
+        if name != self.name:
+            self.write_runs()
+            self.name = name
+        run = ErrorRun(name, error, key)
+        if isinstance(row, int):
+            open_run = self.runs.get((rule, columns))
+            if open_run is not None and open_run.extends(row, error):
+                open_run.last_row = row
+                return
+            # rules that did not fail in the previous row end their runs
+            for run_key, open_run in list(self.runs.items()):
+                if open_run.last_row < row - 1 or run_key == (rule, columns):
+                    open_run.closed = True
+                    del self.runs[run_key]
+            self.runs[(rule, columns)] = run
+        else:
+            run.closed = True
+        self.pending.append(run)
+        self.write_closed_runs()
+
+    def write_closed_runs(self) -> None:
+        """Write the pending runs up to the first open one."""
+        pending = self.pending
+        while pending and (pending[0].closed or len(pending) > self.max_pending):
+            run = pending.popleft()
+            if not run.closed:
+                del self.runs[(run.key[0], run.key[2])]
+            self.error_sink.write(run.name, run.get_error())
+
+    def write_runs(self) -> None:
+        """Close and write all the pending runs."""
+        for run in self.pending:
+            run.closed = True
+        self.runs = {}
+        self.write_closed_runs()
+
+    def write_summary(self, summaries) -> None:
+        self.write_runs()
+        self.error_sink.write_summary(summaries)
+
+    def flush(self) -> None:
+        # runs do not go over files, the sink is flushed after every file
+        self.write_runs()
+        self.error_sink.flush()
+
+    def close(self) -> None:
+        self.write_runs()
+        self.error_sink.close()
+
+
+error_sinks = {
+    "csv": CsvErrorSink,
+    "jsonl": JsonLinesErrorSink,
+    "sqlite": SqliteErrorSink,
+    "parquet": ParquetErrorSink,
+}
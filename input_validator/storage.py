@@ -0,0 +1,203 @@
+import copyreg
+import math
+import os
+import pickle
+import tempfile
+from collections import defaultdict
+
+SNAPSHOT_VERSION = 1
+
+
+class StorageList(list):
+    """A list of stored values with a hash index for membership checks.
+
+    The index is built the first time the storage is queried and then kept in
+    sync with every value added later, so `value in storage` is O(1) instead
+    of a scan over the whole list.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._index = None
+
+    def __contains__(self, value) -> bool:
+        if self._index is None:
+            try:
+                self._index = set(self)
+            except TypeError:
+                # unhashable stored values, like [x, y] lists, are scanned
+                return super().__contains__(value)
+        return value in self._index
+
+    def _add_to_index(self, values) -> None:
+        if self._index is not None:
+            try:
+                self._index.update(values)
+            except TypeError:
+                self._invalidate()
+
+    def append(self, value) -> None:
+        super().append(value)
+        self._add_to_index((value,))
+
+    def extend(self, values) -> None:
+        values = list(values)
+        super().extend(values)
+        self._add_to_index(values)
+
+    def insert(self, position, value) -> None:
+        super().insert(position, value)
+        self._add_to_index((value,))
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __reduce__(self):
+        # the index is rebuilt after unpickling, it is not sent to workers
+        return self.__class__, (list(self),)
+
+    def _invalidate(self):
+        """Drop the index, it will be rebuilt on the next query."""
+        self._index = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate()
+
+    def remove(self, value) -> None:
+        super().remove(value)
+        self._invalidate()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._invalidate()
+        return value
+
+    def clear(self) -> None:
+        super().clear()
+        self._invalidate()
+
+
+class PointIndex:
+    """A grid index of 2D points to find stored points close to a given one.
+
+    Points are parsed (and projected, if needed) once when they are added, and
+    bucketed in square cells twice as wide as the tolerance, so a lookup only
+    has to compare the points of the 3x3 cells around the queried point.
+    """
+
+    def __init__(self, tolerance: float = 0.1, source=None):
+        """
+        Args:
+            tolerance: absolute tolerance used by `math.isclose`
+            source: stored values list this index was built from
+        """
+        self.tolerance = tolerance
+        self.cell_size = 2 * tolerance
+        self.source = source
+        self.cells = defaultdict(list)
+        self.points = []
+        self.not_finite_points = []
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def add(self, x: float, y: float) -> None:
+        """Add a point to the index."""
+        self.points.append((x, y))
+        if math.isfinite(x) and math.isfinite(y):
+            self.cells[self._get_cell(x, y)].append((x, y))
+        else:
+            self.not_finite_points.append((x, y))
+
+    def _get_cell(self, x: float, y: float) -> tuple:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _is_close(self, point: tuple, x: float, y: float) -> bool:
+        return math.isclose(point[0], x, abs_tol=self.tolerance) and math.isclose(
+            point[1], y, abs_tol=self.tolerance
+        )
+
+    def has_close(self, x: float, y: float) -> bool:
+        """Check if a stored point is close to (x, y).
+
+        The result is the same as comparing (x, y) against every stored point
+        with `math.isclose(..., abs_tol=tolerance)` on both coordinates.
+        """
+        # math.isclose relative tolerance is wider than the grid for huge values
+        if not (math.isfinite(x) and math.isfinite(y)) or max(
+                abs(x), abs(y)
+        ) * 1e-9 > self.tolerance:
+            return any(self._is_close(point, x, y) for point in self.points)
+
+        cell_x, cell_y = self._get_cell(x, y)
+        for i in (cell_x - 1, cell_x, cell_x + 1):
+            for j in (cell_y - 1, cell_y, cell_y + 1):
+                for point in self.cells.get((i, j), ()):
+                    if self._is_close(point, x, y):
+                        return True
+        return any(self._is_close(point, x, y) for point in self.not_finite_points)
+
+
+def restore_storage_list(values, index):
+    storage_list = StorageList(values)
+    storage_list._index = index
+    return storage_list
+
+
+def reduce_storage_list(storage_list):
+    # snapshots keep the index, so it is not built again after loading
+    index = storage_list._index
+    if index is None:
+        try:
+            index = set(storage_list)
+        except TypeError:
+            index = None
+    return restore_storage_list, (list(storage_list), index)
+
+
+def save_storage_snapshot(storage: dict, file_path: str, date=None) -> None:
+    """Save the storage of a validation to a snapshot file.
+
+    Args:
+        storage: data validator storage
+        file_path: snapshot file path
+        date: delivery date of the validation
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    file_descriptor, temporal_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(file_descriptor, "wb") as file:
+        pickler = pickle.Pickler(file, protocol=5)
+        pickler.dispatch_table = copyreg.dispatch_table.copy()
+        pickler.dispatch_table[StorageList] = reduce_storage_list
+        pickler.dump({"version": SNAPSHOT_VERSION, "date": date, "storage": storage})
+    os.replace(temporal_path, file_path)
+
+
+def load_storage_snapshot(file_path: str) -> dict:
+    """Load a snapshot file made by save_storage_snapshot.
+
+    Args:
+        file_path: snapshot file path
+
+    Returns:
+        dict: version, date and storage of the snapshot
+
+    Raises:
+        ValueError: if the file is not a snapshot of this version
+    """
+    with open(file_path, "rb") as file:
+        try:
+            snapshot = pickle.load(file)
+        except Exception:
+            snapshot = None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(
+            "El archivo {0} no es un snapshot de almacenamiento válido.".format(file_path)
+        )
+    return snapshot
@@ -0,0 +1,134 @@
+import datetime
+from functools import lru_cache
+
+TIME_FORMAT = "%H:%M:%S"
+DATE_FORMAT = "%Y-%m-%d"
+
+_DIGITS = frozenset("0123456789")
+
+
+def _parse_fixed_time(value: str):
+    """Parse `HH:MM:SS` with two ASCII digits per field.
+
+    Returns:
+        datetime.datetime: parsed time, None if the value is not a valid
+        time, or False if the value does not have the fixed width layout
+    """
+    if len(value) != 8 or value[2] != ":" or value[5] != ":":
+        return False
+    digits = value[0:2] + value[3:5] + value[6:8]
+    if not _DIGITS.issuperset(digits):
+        return False
+    hour, minute, second = int(digits[0:2]), int(digits[2:4]), int(digits[4:6])
+    # strptime accepts seconds 60 and 61, but datetime rejects them
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    return datetime.datetime(1900, 1, 1, hour, minute, second)
+
+
+def _parse_fixed_date(value: str):
+    """Parse `YYYY-MM-DD` with ASCII digits.
+
+    Returns:
+        datetime.datetime: parsed date, None if the value is not a valid
+        date, or False if the value does not have the fixed width layout
+    """
+    if len(value) != 10 or value[4] != "-" or value[7] != "-":
+        return False
+    digits = value[0:4] + value[5:7] + value[8:10]
+    if not _DIGITS.issuperset(digits):
+        return False
+    try:
+        return datetime.datetime(int(digits[0:4]), int(digits[4:6]), int(digits[6:8]))
+    except ValueError:
+        return None
+
+
+def _strptime(value: str, date_format: str):
+    try:
+        return datetime.datetime.strptime(value, date_format)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=65536)
+def _parse_time(value: str):
+    result = _parse_fixed_time(value)
+    return _strptime(value, TIME_FORMAT) if result is False else result
+
+
+@lru_cache(maxsize=65536)
+def _parse_date(value: str):
+    result = _parse_fixed_date(value)
+    return _strptime(value, DATE_FORMAT) if result is False else result
+
+
+def _raise_not_valid(value: str, date_format: str):
+    raise ValueError(
+        "time data {0!r} does not match format {1!r}".format(value, date_format)
+    )
+
+
+def parse_time(value: str) -> datetime.datetime:
+    """Parse a time with the same result as `strptime(value, "%H:%M:%S")`.
+
+    Values with the usual fixed width layout are parsed by hand, any other
+    value is checked by strptime. Results, valid or not, are memoized.
+
+    Args:
+        value: time string
+
+    Returns:
+        datetime.datetime: time on 1900-01-01
+
+    Raises:
+        ValueError: if strptime does not accept the value
+    """
+    result = _parse_time(value)
+    if result is None:
+        _raise_not_valid(value, TIME_FORMAT)
+    return result
+
+
+def parse_date(value: str) -> datetime.datetime:
+    """Parse a date with the same result as `strptime(value, "%Y-%m-%d")`.
+
+    Args:
+        value: date string
+
+    Returns:
+        datetime.datetime: date at midnight
+
+    Raises:
+        ValueError: if strptime does not accept the value
+    """
+    result = _parse_date(value)
+    if result is None:
+        _raise_not_valid(value, DATE_FORMAT)
+    return result
+
+
+def parse_time_batch(values) -> list:
+    """Parse a column chunk of times, every distinct value is parsed once.
+
+    Args:
+        values: time strings
+
+    Returns:
+        list: a datetime.datetime per value, None for values strptime rejects
+    """
+    parsed = {value: _parse_time(value) for value in set(values)}
+    return [parsed[value] for value in values]
+
+
+def parse_date_batch(values) -> list:
+    """Parse a column chunk of dates, every distinct value is parsed once.
+
+    Args:
+        values: date strings
+
+    Returns:
+        list: a datetime.datetime per value, None for values strptime rejects
+    """
+    parsed = {value: _parse_date(value) for value in set(values)}
+    return [parsed[value] for value in values]
@@ -1,7 +1,13 @@
 import csv
 import math
+from functools import lru_cache
 
+import numpy
 
+from input_validator.sinks import CSV_HEADER, get_csv_row
+
+
+@lru_cache(maxsize=65536)
 def utm_to_wsg84(
         east_coordinate: float,
         north_coordinate: float,
@@ -11,6 +17,9 @@ def utm_to_wsg84(
     """
     Convert utm to wsg84 coordinates
 
+    Results are memoized because the same stop and zone coordinates repeat
+    across rows.
+
     Args:
 
         east_coordinate: easting
@@ -96,21 +105,133 @@ def utm_to_wsg84(
     return latitude, longitude
 
 
+# max difference in degrees between utm_to_wsg84_array and utm_to_wsg84
+UTM_ARRAY_TOLERANCE = 1e-9
+
+_A = 6378137
+_E = 0.081819191
+_E1SQ = 0.006739497
+_K0 = 0.9996
+_MU_DIVISOR = _A * (
+        1
+        - math.pow(_E, 2) / 4.0
+        - 3 * math.pow(_E, 4) / 64.0
+        - 5 * math.pow(_E, 6) / 256.0
+)
+_EI = (1 - math.pow((1 - _E * _E), (1 / 2.0))) / (1 + math.pow((1 - _E * _E), (1 / 2.0)))
+_CA = 3 * _EI / 2 - 27 * math.pow(_EI, 3) / 32.0
+_CB = 21 * math.pow(_EI, 2) / 16 - 55 * math.pow(_EI, 4) / 32
+_CC = 151 * math.pow(_EI, 3) / 96
+_CD = 1097 * math.pow(_EI, 4) / 512
+
+
+def _utm_to_wsg84_array(east_coordinate, north_coordinate, zone, north_hemisphere):
+    """
+    Convert utm to wsg84 coordinates of numpy arrays
+
+    The formula of utm_to_wsg84 with integer powers written as products,
+    pow(x, 0.5) as sqrt and tan as sin/cos, and the series constants
+    computed once. The results differ from utm_to_wsg84 by less than
+    UTM_ARRAY_TOLERANCE degrees.
+    """
+    if not north_hemisphere:
+        north_coordinate = 10000000 - north_coordinate
+
+    arc = north_coordinate / _K0
+    mu = arc / _MU_DIVISOR
+
+    phi1 = (
+            mu
+            + _CA * numpy.sin(2 * mu)
+            + _CB * numpy.sin(4 * mu)
+            + _CC * numpy.sin(6 * mu)
+            + _CD * numpy.sin(8 * mu)
+    )
+    sin_phi1 = numpy.sin(phi1)
+    cos_phi1 = numpy.cos(phi1)
+    tan_phi1 = sin_phi1 / cos_phi1
+
+    e_sin_phi1 = _E * sin_phi1
+    w = 1 - e_sin_phi1 * e_sin_phi1
+    sqrt_w = numpy.sqrt(w)
+    n0 = _A / sqrt_w
+    r0 = _A * (1 - _E * _E) / (w * sqrt_w)
+    fact1 = n0 * tan_phi1 / r0
+
+    _a1 = 500000 - east_coordinate
+    dd0 = _a1 / (n0 * _K0)
+    dd0_2 = dd0 * dd0
+    dd0_3 = dd0_2 * dd0
+    dd0_4 = dd0_3 * dd0
+    dd0_5 = dd0_4 * dd0
+    dd0_6 = dd0_5 * dd0
+    fact2 = dd0_2 / 2
+
+    t0 = tan_phi1 * tan_phi1
+    q0 = _E1SQ * (cos_phi1 * cos_phi1)
+    fact3 = (5 + 3 * t0 + 10 * q0 - 4 * q0 * q0 - 9 * _E1SQ) * dd0_4 / 24
+
+    fact4 = (
+            (61 + 90 * t0 + 298 * q0 + 45 * t0 * t0 - 252 * _E1SQ - 3 * q0 * q0)
+            * dd0_6
+            / 720
+    )
+
+    lof1 = _a1 / (n0 * _K0)
+    lof2 = (1 + 2 * t0 + q0) * dd0_3 / 6.0
+    lof3 = (
+            (5 - 2 * q0 + 28 * t0 - 3 * (q0 * q0) + 8 * _E1SQ + 24 * (t0 * t0))
+            * dd0_5
+            / 120
+    )
+    _a2 = (lof1 - lof2 + lof3) / cos_phi1
+    _a3 = _a2 * 180 / math.pi
+
+    latitude = 180 * (phi1 - fact1 * (fact2 + fact3 + fact4)) / math.pi
+
+    if not north_hemisphere:
+        latitude = -latitude
+
+    longitude = ((zone > 0) and (6 * zone - 183.0) or 3.0) - _a3
+
+    return latitude, longitude
+
+
+def utm_to_wsg84_array(
+        east_coordinates,
+        north_coordinates,
+        zone: int = 19,
+        north_hemisphere: bool = False,
+) -> tuple:
+    """
+    Convert utm to wsg84 coordinates for whole columns at once
+
+    Values differ from the ones `utm_to_wsg84` gives by less than
+    UTM_ARRAY_TOLERANCE degrees, so a point at that distance from a border
+    has to be converted again with `utm_to_wsg84` to decide its side.
+
+    Args:
+
+        east_coordinates: easting values
+        north_coordinates: northing values
+        zone:  zone
+        north_hemisphere: true | false
+
+    Returns:
+
+        tuple: (lat array, long array)
+
+    """
+    east_coordinates = numpy.asarray(east_coordinates, dtype=float)
+    north_coordinates = numpy.asarray(north_coordinates, dtype=float)
+    return _utm_to_wsg84_array(east_coordinates, north_coordinates, zone, north_hemisphere)
+
+
 def write_errors_to_csv(file_path, validator_obj):
     with open(
             file_path, "w", newline="", encoding="utf-8-SIG"
     ) as f:
         writer = csv.writer(f)
-        writer.writerow(["Archivo", "Error", "Tipo", "Fila", "Columna(s)", "Detalle"])
-        for key, value in validator_obj.report_errors.items():
-            for error in value:
-                writer.writerow(
-                    [
-                        key,
-                        error["name"],
-                        error["type"],
-                        error["row"],
-                        ",".join(error["cols"]) if isinstance(error["cols"], list) else error["cols"],
-                        error["message"],
-                    ]
-                )
+        writer.writerow(CSV_HEADER)
+        for key, error in validator_obj.iter_errors():
+            writer.writerow(get_csv_row(key, error))
@@ -1,18 +1,27 @@
+import bisect
+import copy
 import datetime
-import glob
-import math
 import operator
 import os
 import pathlib
-import re
 import sys
 from abc import ABCMeta, abstractmethod
 from enum import Enum
 from functools import wraps
 
-from shapely.geometry import Point, Polygon
+import numpy
+from shapely import contains_xy, dwithin, points, prepare
+from shapely.geometry import Polygon
 
-from input_validator.utils import utm_to_wsg84
+from input_validator.errors import ErrorRecord
+from input_validator.patterns import compile_regex, find_names, search_batch
+from input_validator.storage import PointIndex, StorageList
+from input_validator.temporal import parse_date, parse_time, parse_time_batch
+from input_validator.utils import (
+    UTM_ARRAY_TOLERANCE,
+    utm_to_wsg84,
+    utm_to_wsg84_array,
+)
 
 
 class FunType(Enum):
@@ -24,6 +33,14 @@ class FunType(Enum):
 
 
 class Validator(object, metaclass=ABCMeta):
+    stores_data = False  # True if the validator writes in the data validator storage
+    required_width = 0  # number of columns a row needs to be validated
+    stateless = False  # True if every row is checked on its own, without state of other rows
+    counts_rows = False  # True if the validator only counts the rows of a file
+    reads_file_name = False  # True if args are read from the file name, unknown in the plan
+    file_data = ()  # attributes with data of the whole file that get_error does not read
+    error_validator = None  # copy of the validator kept by its error records
+
     def __init__(self, args):
         """
         Init method, storage args and initialize a row counter
@@ -47,6 +64,108 @@ class Validator(object, metaclass=ABCMeta):
         """
         pass
 
+    def compile_apply(self):
+        """
+        Return the apply method to use on rows with required_width columns
+
+        Returns:
+            apply method
+        """
+        return self.apply
+
+    def get_error_state(self) -> tuple:
+        """
+        Return the state read by get_error that changes from row to row
+
+        Validators assign new objects to that state on every row, so the
+        returned values are not copied.
+
+        Returns:
+            tuple: state values
+        """
+        return self.row_counter, self.args.get("row")
+
+    def set_error_state(self, state: tuple) -> None:
+        """
+        Restore a state returned by get_error_state
+
+        Args:
+            state: state values
+        """
+        self.row_counter, row = state
+        if row is not None:
+            self.args["row"] = row
+
+    def get_error_validator(self) -> "Validator":
+        """
+        Return the copy of the validator its error records keep
+
+        The copy is made at the first error and shared by the later ones, it
+        has not the file_data attributes nor the data validator, so the
+        records of a file do not keep its data alive once it is validated.
+
+        Returns:
+            Validator: validator copy that only formats errors
+        """
+        if self.error_validator is None:
+            error_validator = copy.copy(self)
+            for name in self.file_data:
+                setattr(error_validator, name, None)
+            error_validator.args = {
+                key: value for key, value in self.args.items() if key != "data_validator"
+            }
+            self.error_validator = error_validator
+        return self.error_validator
+
+    def get_error_columns(self, state: tuple) -> tuple:
+        """
+        Return the col indexes an error is about, without building the error
+
+        Args:
+            state: state values returned by get_error_state
+
+        Returns:
+            tuple: col indexes, empty if the error is not about columns
+        """
+        return ()
+
+    def get_rule_indexes(self) -> list:
+        """
+        Return the col indexes the rule checks, the same for all its errors
+
+        Returns:
+            list: col indexes, empty if the rule does not check columns
+        """
+        return []
+
+    def get_rule_columns(self) -> list:
+        """
+        Return the names of the columns the rule checks, to tell apart rules
+        with the same error name
+
+        Returns:
+            list: column names
+        """
+        header = self.args.get("header") or []
+        return [
+            header[index] for index in self.get_rule_indexes() if index < len(header)
+        ]
+
+    def apply_batch(self, chunk):
+        """
+        Apply the validator method over a chunk of rows at once
+
+        Validators without a batch implementation return None and they are
+        applied row by row.
+
+        Args:
+            chunk: RowChunk with the rows to validate
+
+        Returns:
+            list: offsets of the rows that are not valid, or None
+        """
+        return None
+
     @abstractmethod
     def get_error(self):
         """
@@ -72,6 +191,8 @@ class Validator(object, metaclass=ABCMeta):
 
 
 class ColumnValidator(Validator):
+    file_data = ("batch_state",)
+
     def get_fun_type(self):
         pass
 
@@ -84,7 +205,27 @@ class ColumnValidator(Validator):
     def __init__(self, args):
         self.cols_error = []
         self.not_valid_indexes = []
+        self.batch_state = None
         super().__init__(args)
+        self.cols_indexes = self.get_cols_indexes()
+        self.required_width = max(self.cols_indexes, default=-1) + 1
+
+    def get_cols_indexes(self) -> list:
+        """Return the col indexes the validator reads from a row."""
+        col_indexes = list(
+            self.args.get("value_indexes", []) or self.args.get("col_indexes", [])
+        )
+        for arg_name in [
+            "col_index",
+            "upper_col",
+            "lower_col",
+            "x_coordinate_index",
+            "y_coordinate_index",
+        ]:
+            index = self.args.get(arg_name, None)
+            if index:
+                col_indexes.append(index)
+        return col_indexes
 
     def get_not_valid_cols_indexes(self, row) -> bool:
         """Check if col indexes exist in row, if not return False.
@@ -93,31 +234,130 @@ class ColumnValidator(Validator):
         Returns: True if all indexes are valid in row.
 
         """
-        self.not_valid_indexes = []
-        col_indexes = self.args.get("col_indexes", [])
-        value_indexes = self.args.get("value_indexes", [])
-        if value_indexes:
-            col_indexes = value_indexes
-        col_index = self.args.get("col_index", None)
-        upper_col = self.args.get("upper_col", None)
-        lower_col = self.args.get("lower_col", None)
-        x_coordinate_index = self.args.get("x_coordinate_index", None)
-        y_coordinate_index = self.args.get("y_coordinate_index", None)
-        if col_index:
-            col_indexes.append(col_index)
-        if upper_col:
-            col_indexes.append(upper_col)
-        if lower_col:
-            col_indexes.append(lower_col)
-        if x_coordinate_index:
-            col_indexes.append(x_coordinate_index)
-        if y_coordinate_index:
-            col_indexes.append(y_coordinate_index)
-        for index in col_indexes:
-            if len(row) <= index:
-                self.not_valid_indexes.append(index)
+        if len(row) >= self.required_width:
+            if self.not_valid_indexes:
+                self.not_valid_indexes = []
+            return False
+        self.not_valid_indexes = [
+            index for index in self.cols_indexes if len(row) <= index
+        ]
         return True if self.not_valid_indexes else False
 
+    def get_error_state(self) -> tuple:
+        return super().get_error_state() + (self.cols_error, self.not_valid_indexes)
+
+    def set_error_state(self, state: tuple) -> None:
+        super().set_error_state(state[:2])
+        self.cols_error, self.not_valid_indexes = state[2:]
+
+    def get_error_columns(self, state: tuple) -> tuple:
+        cols_error, not_valid_indexes = state[2:4]
+        return tuple(not_valid_indexes or cols_error or self.cols_indexes)
+
+    def get_rule_indexes(self) -> list:
+        return self.cols_indexes
+
+    def compile_apply(self):
+        """
+        Return the apply method to use on rows with required_width columns
+
+        The col indexes check done by check_not_valid_col_indexes is skipped,
+        the caller compares the row width once for all its validators.
+
+        Returns:
+            apply method
+        """
+        unchecked_apply = getattr(self.apply, "__wrapped__", None)
+        if unchecked_apply is None:
+            return self.apply
+        unchecked_apply = unchecked_apply.__get__(self)
+
+        def apply_wide_row(row):
+            if self.not_valid_indexes:
+                self.not_valid_indexes = []
+            return unchecked_apply(row)
+
+        return apply_wide_row
+
+    def check_batch(self, chunk):
+        """Check a chunk of rows that have all the validator columns.
+
+        Args:
+            chunk: RowChunk with the rows to check
+
+        Returns:
+            list: a bool per row, True if the row is valid, or None if the
+            validator has no batch check
+        """
+        return None
+
+    @staticmethod
+    def check_columns_batch(chunk, col_indexes, is_valid) -> list:
+        """Check every value of the given columns with is_valid.
+
+        Returns:
+            list: a bool per row, True if all the row values are valid
+        """
+        status = [True] * len(chunk)
+        for index in col_indexes:
+            status = [
+                valid and is_valid(value)
+                for valid, value in zip(status, chunk.column(index))
+            ]
+        return status
+
+    def apply_batch(self, chunk):
+        """
+        Apply check_batch over a chunk of rows
+
+        The row counter ends as if apply had been called on every row, and
+        get_batch_error gives the error of any failed row.
+
+        Args:
+            chunk: RowChunk with the rows to validate
+
+        Returns:
+            list: offsets of the rows that are not valid, or None
+        """
+        wide_chunk, wide_offsets = chunk.get_wide_rows(self.required_width)
+        status = self.check_batch(wide_chunk)
+        if status is None:
+            return None
+
+        failed_offsets = [
+            offset for offset, valid in zip(wide_offsets, status) if not valid
+        ]
+        if wide_chunk is not chunk:
+            wide_offsets_set = set(wide_offsets)
+            failed_offsets.extend(
+                offset for offset in range(len(chunk)) if offset not in wide_offsets_set
+            )
+            failed_offsets.sort()
+        self.batch_state = (self.row_counter, wide_offsets)
+        self.row_counter += len(wide_offsets)
+        return failed_offsets
+
+    def get_batch_error(self, chunk, offset) -> ErrorRecord:
+        """Return the error of a row that failed in the last apply_batch call.
+
+        The row is validated again with apply, from the row counter it had in
+        the chunk, so the error is the same one the row by row validation gives.
+
+        Args:
+            chunk: RowChunk given to apply_batch
+            offset: offset of the failed row in the chunk
+
+        Returns:
+            ErrorRecord: error record
+        """
+        first_row_counter, wide_offsets = self.batch_state
+        row_counter = self.row_counter
+        self.row_counter = first_row_counter + bisect.bisect_left(wide_offsets, offset)
+        self.apply(chunk.rows[offset])
+        error = ErrorRecord(self)
+        self.row_counter = row_counter
+        return error
+
     @staticmethod
     def check_not_valid_col_indexes(method):
         """Decorator that check if col indexes are valid."""
@@ -208,10 +448,14 @@ class NameValidator(Validator):
 
             path: name path to search
             name: filename
+            file_system: file system to search (optional)
         """
         path = self.args["path"]
         name = self.args["name"]
         real_path = os.path.join(path, name)
+        file_system = self.args.get("file_system")
+        if file_system:
+            return file_system.exists(real_path)
         return os.path.exists(real_path)
 
     def get_error(self) -> dict:
@@ -239,14 +483,15 @@ class RegexNameValidator(Validator):
 
             path: path name to search
             name: filename in unix regex format
+            file_system: file system to search (optional)
         """
         path = self.args["path"]
         regex = self.args["name"]
         date = self.args["date"]
-        name = glob.glob(os.path.join(path, regex))
+        name = find_names(path, regex, self.args.get("file_system"))
         self.args["date_is_in_name"] = True
         if name:
-            name = os.path.split(name[0])[1]
+            name = name[0]
             self.args["date_is_in_name"] = date in name
         validator = args
         validator.temp_name = name
@@ -285,14 +530,18 @@ class RegexMultiNameValidator(Validator):
 
             path: path name to search
             name: filename list with unix regex format
+            file_system: file system to search (optional)
 
         """
         path = self.args["path"]
         regex_list = self.args["name"]
         date = self.args["date"]
-        name_list = [glob.glob(os.path.join(path, regex)) for regex in regex_list]
+        name_list = [
+            find_names(path, regex, self.args.get("file_system"))
+            for regex in regex_list
+        ]
         if name_list[0]:
-            name_list = [os.path.split(name[0])[1] for name in name_list]
+            name_list = [name[0] for name in name_list]
             self.args["names_with_incorrect_date"] = [
                 name for name in name_list if date not in name
             ]
@@ -346,6 +595,7 @@ class RegexServiceDetailNameValidator(Validator):
             path: path name to search
             name: filename list with unix regex format
             date: date to validate
+            file_system: file system to search (optional)
         """
 
         def string_date_to_date(string_date: str) -> datetime.date:
@@ -362,12 +612,11 @@ class RegexServiceDetailNameValidator(Validator):
         path = self.args["path"]
         regex = self.args["name"]
         date = self.args["date"]
-        name_list = glob.glob(os.path.join(path, regex))
+        name_list = find_names(path, regex, self.args.get("file_system"))
         valid_name_list = []
         error_date_list = []
         error_format = False
         if name_list:
-            name_list = [os.path.split(name)[1] for name in name_list]
             name_list = [
                 [name, *get_date_from_service_detail(name)] for name in name_list
             ]
@@ -432,6 +681,8 @@ class RegexServiceDetailNameValidator(Validator):
 
 
 class MinRowsValidator(Validator):
+    counts_rows = True
+
     def __init__(self, args):
         self.counter = 0
         self.status = False
@@ -453,6 +704,19 @@ class MinRowsValidator(Validator):
             self.status = True
         return res
 
+    def apply_count(self, rows: int) -> bool:
+        """
+        Check if a file has the minimal rows from its row count, as if apply
+        was called on every row
+
+        Args:
+            rows: rows of the file that are not empty, without the header
+        """
+        self.counter = rows
+        # apply is not called on a file without rows
+        self.status = rows > 0 and rows >= self.args["min"]
+        return self.status
+
     def get_error(self) -> dict:
         return {
             "name": "Número de filas menor al correcto",
@@ -469,6 +733,8 @@ class MinRowsValidator(Validator):
 
 
 class ASCIIColValidator(ColumnValidator):
+    stateless = True
+
     @ColumnValidator.check_not_valid_col_indexes
     def apply(self, args=None) -> bool:
         """
@@ -492,6 +758,9 @@ class ASCIIColValidator(ColumnValidator):
         else:
             return False
 
+    def check_batch(self, chunk) -> list:
+        return self.check_columns_batch(chunk, self.args["col_indexes"], str.isascii)
+
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
         var = [self.args["row"][index] for index in self.cols_error]
@@ -520,43 +789,66 @@ class ASCIIColValidator(ColumnValidator):
 
 
 class DuplicateValueValidator(Validator):
-    def __init__(self, args):
+    file_data = ("values",)
 
-        self.values = []
+    def __init__(self, args):
+        self.values = {}
+        self.first_row = None
         super().__init__(args)
+        self.key_indexes = self.args.get("col_indexes") or [self.args["col_index"]]
 
     def apply(self, args=None) -> bool:
         """
         Check if col has not duplicated value
 
+        Every value is indexed with the row where it first appeared, when
+        several columns are given their values are checked as a composite key.
+
         Validator args:
             col_index: column index to check
-
+            col_indexes: column index list to check as a composite key
         """
         self.row_counter += 1
         self.args["row"] = args
-        col_to_check = self.args["col_index"]
-        value = self.args["row"][col_to_check]
-        if value in self.values:
-            return False
+        if len(self.key_indexes) == 1:
+            value = self.args["row"][self.key_indexes[0]]
         else:
-            self.values.append(value)
+            value = tuple(self.args["row"][index] for index in self.key_indexes)
+        first_row = self.values.setdefault(value, self.row_counter)
+        if first_row != self.row_counter:
+            self.first_row = first_row
+            return False
         return True
 
+    def get_error_state(self) -> tuple:
+        return super().get_error_state() + (self.first_row,)
+
+    def set_error_state(self, state: tuple) -> None:
+        super().set_error_state(state[:2])
+        self.first_row = state[2]
+
+    def get_rule_indexes(self) -> list:
+        return self.key_indexes
+
     def get_error(self) -> dict:
-        index = self.args["col_index"]
-        var = self.args["row"][index]
         header = self.args["header"]
-        col_name = header[index]
+        var = [self.args["row"][index] for index in self.key_indexes]
+        cols_names = [header[index] for index in self.key_indexes]
+        if len(cols_names) == 1:
+            message = "La variable '{0}' está duplicada en la fila {1}, columna {2}, primera aparición en la fila {3}."
+            cols = cols_names[0]
+        else:
+            message = "Las variables '{0}' están duplicadas en la fila {1}, columnas {2}, primera aparición en la fila {3}."
+            cols = cols_names
 
         return {
             "name": "Valor duplicado",
             "type": "formato",
-            "message": "La variable '{0}' está duplicada en la fila {1}, columna {2}.".format(
-                var, self.row_counter, col_name
+            "message": message.format(
+                ", ".join(var), self.row_counter, ", ".join(cols_names), self.first_row
             ),
             "row": self.row_counter,
-            "cols": col_name,
+            "cols": cols,
         }
 
     def get_fun_type(self) -> FunType:
@@ -622,6 +914,8 @@ class HeaderValidator(Validator):
 
 
 class NotEmptyValueValidator(ColumnValidator):
+    stateless = True
+
     def __init__(self, args):
         self.valid_operators = {
             "==": operator.eq,
@@ -673,6 +967,27 @@ class NotEmptyValueValidator(ColumnValidator):
         else:
             return False
 
+    def check_batch(self, chunk):
+        conditions = self.args["conditions_to_ignore_row"]
+        for condition in conditions:
+            # bad operators and missing columns fail in apply
+            if (
+                condition[1] not in self.valid_operators
+                or int(condition[0]) >= chunk.min_width
+            ):
+                return None
+        status = self.check_columns_batch(chunk, self.args["col_indexes"], bool)
+        if not conditions or all(status):
+            return status
+        ignored = [True] * len(chunk)
+        for condition in conditions:
+            compare = self.valid_operators[condition[1]]
+            ignored = [
+                ignore and compare(value, condition[2])
+                for ignore, value in zip(ignored, chunk.column(int(condition[0])))
+            ]
+        return [valid or ignore for valid, ignore in zip(status, ignored)]
+
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
         header = self.args["header"]
@@ -698,6 +1013,8 @@ class NotEmptyValueValidator(ColumnValidator):
 
 
 class StringDomainValueValidator(ColumnValidator):
+    stateless = True
+
     @ColumnValidator.check_not_valid_col_indexes
     def apply(self, args=None) -> bool:
         """Check if columns are in domain list.
@@ -722,6 +1039,16 @@ class StringDomainValueValidator(ColumnValidator):
         else:
             return False
 
+    def check_batch(self, chunk) -> list:
+        domain = self.args["domain"]
+        is_valid = domain.__contains__
+        if isinstance(domain, list):
+            try:
+                is_valid = set(domain).__contains__
+            except TypeError:
+                pass
+        return self.check_columns_batch(chunk, self.args["col_indexes"], is_valid)
+
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
         header = self.args["header"]
@@ -747,6 +1074,12 @@ class StringDomainValueValidator(ColumnValidator):
 
 
 class RegexValueValidator(ColumnValidator):
+    stateless = True
+
+    def __init__(self, args):
+        super().__init__(args)
+        self.regex = compile_regex(self.args["regex"])
+
     @ColumnValidator.check_not_valid_col_indexes
     def apply(self, args=None) -> bool:
         """
@@ -761,8 +1094,22 @@ class RegexValueValidator(ColumnValidator):
         self.args["row"] = args
         col_to_check = self.args["col_index"]
         value = self.args["row"][col_to_check]
-        regex = self.args["regex"]
-        return True if re.search(regex, value) else False
+        return True if self.regex.search(value) else False
+
+    def match_batch(self, values) -> list:
+        """
+        Check a whole column chunk with the compiled regex
+
+        Args:
+            values: column values to check
+
+        Returns:
+            list: a bool per value, True if the value matches the regex
+        """
+        return search_batch(self.regex, values)
+
+    def check_batch(self, chunk) -> list:
+        return self.match_batch(chunk.column(self.args["col_index"]))
 
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
@@ -786,6 +1133,8 @@ class RegexValueValidator(ColumnValidator):
 
 
 class NumericRangeValueValidator(ColumnValidator):
+    stateless = True
+
     @ColumnValidator.check_not_valid_col_indexes
     def apply(self, args=None) -> bool:
         """
@@ -816,6 +1165,16 @@ class NumericRangeValueValidator(ColumnValidator):
         else:
             return False
 
+    def check_batch(self, chunk) -> list:
+        lower_bound = float(self.args["lower_bound"])
+        upper_bound = float(self.args["upper_bound"])
+
+        def is_valid(value):
+            value = float(value) if value else sys.maxsize
+            return not (value < lower_bound or value > upper_bound)
+
+        return self.check_columns_batch(chunk, self.args["col_indexes"], is_valid)
+
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
         header = self.args["header"]
@@ -846,6 +1205,8 @@ class NumericRangeValueValidator(ColumnValidator):
 
 
 class TimeValueValidator(ColumnValidator):
+    stateless = True
+
     @ColumnValidator.check_not_valid_col_indexes
     def apply(self, args=None) -> bool:
         """
@@ -855,7 +1216,6 @@ class TimeValueValidator(ColumnValidator):
 
             col_indexes: column index list to check
         """
-        time_format = "%H:%M:%S"
         self.cols_error = []
         self.row_counter += 1
         self.args["row"] = args
@@ -863,7 +1223,7 @@ class TimeValueValidator(ColumnValidator):
         for col in cols_to_check:
             value = self.args["row"][col]
             try:
-                datetime.datetime.strptime(value, time_format)
+                parse_time(value)
             except ValueError:
                 self.cols_error.append(col)
 
@@ -872,6 +1232,15 @@ class TimeValueValidator(ColumnValidator):
         else:
             return False
 
+    def check_batch(self, chunk) -> list:
+        status = [True] * len(chunk)
+        for col in self.args["col_indexes"]:
+            status = [
+                valid and time is not None
+                for valid, time in zip(status, parse_time_batch(chunk.column(col)))
+            ]
+        return status
+
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
         header = self.args["header"]
@@ -897,6 +1266,8 @@ class TimeValueValidator(ColumnValidator):
 
 
 class FloatValueValidator(ColumnValidator):
+    stateless = True
+
     @ColumnValidator.check_not_valid_col_indexes
     def apply(self, args=None) -> bool:
         """
@@ -919,6 +1290,13 @@ class FloatValueValidator(ColumnValidator):
         else:
             return False
 
+    def check_batch(self, chunk) -> list:
+        return self.check_columns_batch(
+            chunk,
+            self.args["col_indexes"],
+            lambda value: value.replace(".", "", 1).isdigit(),
+        )
+
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
         header = self.args["header"]
@@ -944,6 +1322,8 @@ class FloatValueValidator(ColumnValidator):
 
 
 class GreaterThanValueValidator(ColumnValidator):
+    stateless = True
+
     @ColumnValidator.check_not_valid_col_indexes
     def apply(self, args=None) -> bool:
         """
@@ -961,16 +1341,27 @@ class GreaterThanValueValidator(ColumnValidator):
         lower_col = args[self.args["lower_col"]]
         comparison_type = self.args["type"]
         if comparison_type == "time":
-            time_format = "%H:%M:%S"
             try:
-                upper_time = datetime.datetime.strptime(upper_col, time_format)
-                lower_time = datetime.datetime.strptime(lower_col, time_format)
+                upper_time = parse_time(upper_col)
+                lower_time = parse_time(lower_col)
             except ValueError:
                 return False
             return upper_time > lower_time
         else:
             return upper_col > lower_col
 
+    def check_batch(self, chunk) -> list:
+        upper_values = chunk.column(self.args["upper_col"])
+        lower_values = chunk.column(self.args["lower_col"])
+        if self.args["type"] == "time":
+            upper_values = parse_time_batch(upper_values)
+            lower_values = parse_time_batch(lower_values)
+            return [
+                upper is not None and lower is not None and upper > lower
+                for upper, lower in zip(upper_values, lower_values)
+            ]
+        return [upper > lower for upper, lower in zip(upper_values, lower_values)]
+
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
         first_value_header = self.args["header"][self.args["upper_col"]]
@@ -991,6 +1382,8 @@ class GreaterThanValueValidator(ColumnValidator):
 
 
 class StoreColValue(ColumnValidator):
+    stores_data = True
+
     @ColumnValidator.check_not_valid_col_indexes
     def apply(self, args=None) -> bool:
         """
@@ -1006,7 +1399,7 @@ class StoreColValue(ColumnValidator):
         data_validator = self.args["data_validator"]
         storage_name = self.args["storage_name"]
         if data_validator.storage.get(storage_name, 0) == 0:
-            data_validator.storage[storage_name] = [var]
+            data_validator.storage[storage_name] = StorageList([var])
         else:
             data_validator.storage[storage_name].append(var)
         return True
@@ -1026,6 +1419,8 @@ class StoreColValue(ColumnValidator):
 
 
 class CheckColStorageValueValidator(ColumnValidator):
+    stateless = True  # the storage it reads is not written by the same file
+
     @ColumnValidator.check_not_valid_col_indexes
     def apply(self, args=None) -> bool:
         """
@@ -1044,6 +1439,11 @@ class CheckColStorageValueValidator(ColumnValidator):
         storage = data_validator.storage.get(self.args["storage_name"], [])
         return val in storage
 
+    def check_batch(self, chunk) -> list:
+        data_validator = self.args["data_validator"]
+        storage = data_validator.storage.get(self.args["storage_name"], [])
+        return [value in storage for value in chunk.column(self.args["col_index"])]
+
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
         index = self.args["col_index"]
@@ -1066,6 +1466,21 @@ class CheckColStorageValueValidator(ColumnValidator):
 
 
 class BoundingBoxValueValidator(ColumnValidator):
+    stateless = True
+
+    def __init__(self, args):
+        super().__init__(args)
+        self.bounding_box = Polygon(self.args["bounding_box"])
+        self.border = self.bounding_box.boundary
+        prepare(self.bounding_box)
+        prepare(self.border)
+
+    def __setstate__(self, state):
+        # a pickled polygon is not prepared, validators are sent to range tasks
+        self.__dict__.update(state)
+        prepare(self.bounding_box)
+        prepare(self.border)
+
     @ColumnValidator.check_not_valid_col_indexes
     def apply(self, args=None) -> bool:
         """
@@ -1089,12 +1504,56 @@ class BoundingBoxValueValidator(ColumnValidator):
 
         if self.args["coordinate_system"] == "utm":
             x, y = utm_to_wsg84(x, y, 19)
-            point = Point(x, y)
-            bounding_box = Polygon(self.args["bounding_box"])
         else:
             raise ValueError('There is no coordinate system defined')
 
-        return bounding_box.contains(point)
+        return bool(contains_xy(self.bounding_box, x, y))
+
+    def contains_batch(self, x_values, y_values) -> numpy.ndarray:
+        """
+        Check a whole chunk of coordinates against the bounding box
+
+        Args:
+            x_values: x coordinate column values
+            y_values: y coordinate column values
+
+        Returns:
+            numpy.ndarray: a bool per row, False if the coordinates are outside
+            the bounding box or can not be read as numbers
+        """
+        if self.args["coordinate_system"] != "utm":
+            raise ValueError('There is no coordinate system defined')
+
+        positions = []
+        xs = []
+        ys = []
+        for position, (x, y) in enumerate(zip(x_values, y_values)):
+            try:
+                x = float(x)
+                y = float(y)
+            except ValueError:
+                continue
+            positions.append(position)
+            xs.append(x)
+            ys.append(y)
+
+        result = numpy.zeros(len(x_values), dtype=bool)
+        latitudes, longitudes = utm_to_wsg84_array(xs, ys, 19)
+        contained = contains_xy(self.bounding_box, latitudes, longitudes)
+        # the array conversion differs from utm_to_wsg84 in the last digits,
+        # points at the border are converted again as in apply
+        at_border = dwithin(self.border, points(latitudes, longitudes), UTM_ARRAY_TOLERANCE)
+        for index in numpy.flatnonzero(at_border):
+            latitude, longitude = utm_to_wsg84(xs[index], ys[index], 19)
+            contained[index] = contains_xy(self.bounding_box, latitude, longitude)
+        result[positions] = contained
+        return result
+
+    def check_batch(self, chunk) -> list:
+        return self.contains_batch(
+            chunk.column(self.args["x_coordinate_index"]),
+            chunk.column(self.args["y_coordinate_index"]),
+        ).tolist()
 
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
@@ -1142,6 +1601,8 @@ class BoundingBoxValueValidator(ColumnValidator):
 
 
 class StoreColDictValues(ColumnValidator):
+    stores_data = True
+
     def apply(self, args=None) -> bool:
         """
         Save cols index in args
@@ -1160,11 +1621,11 @@ class StoreColDictValues(ColumnValidator):
         storage_name = self.args["storage_name"]
         unique = True if self.args.get("unique") == "True" else False
         if data_validator.storage.get(storage_name, 0) == 0:
-            value_dict = {key_value: []}
+            value_dict = {key_value: StorageList()}
         else:
             if data_validator.storage[storage_name].get(key_value, 0) == 0:
                 value_dict = data_validator.storage[storage_name]
-                value_dict[key_value] = []
+                value_dict[key_value] = StorageList()
             else:
                 value_dict = data_validator.storage[storage_name]
         var = []
@@ -1190,6 +1651,84 @@ class StoreColDictValues(ColumnValidator):
 
 
 class CheckStoreColDictValuesValidator(ColumnValidator):
+    stateless = True  # the storage it reads is not written by the same file
+    file_data = ColumnValidator.file_data + ("point_indexes", "zone_polygons")
+
+    def __init__(self, args):
+        self.point_indexes = {}
+        self.zone_polygons = {}
+        super().__init__(args)
+
+    def get_point_index(self, key_name, storage_key, transform=None) -> PointIndex:
+        """
+        Return the point index of a storage key, parsing and projecting only the
+        values stored since the last call
+
+        Args:
+            key_name: key name in storage
+            storage_key: stored [x, y] values of the key
+            transform: function to project the stored values, if needed
+
+        Returns:
+            PointIndex: index with all the stored values of the key
+        """
+        point_index = self.point_indexes.get(key_name)
+        if point_index is None or point_index.source is not storage_key:
+            point_index = PointIndex(0.1, source=storage_key)
+            self.point_indexes[key_name] = point_index
+        for storage_values in storage_key[len(point_index):]:
+            x, y = float(storage_values[0]), float(storage_values[1])
+            if transform is not None:
+                x, y = transform(x, y)
+            point_index.add(x, y)
+        return point_index
+
+    def get_zone_polygon(self, key_name, storage_key) -> Polygon:
+        """
+        Return the prepared polygon of a storage key, it is only built again if
+        the stored vertices change
+
+        Args:
+            key_name: key name in storage
+            storage_key: stored [x, y] vertices of the key
+
+        Returns:
+            Polygon: prepared polygon in wsg84 coordinates
+        """
+        polygon, source, size = self.zone_polygons.get(key_name, (None, None, 0))
+        if polygon is None or source is not storage_key or size != len(storage_key):
+            polygon = Polygon(
+                [
+                    utm_to_wsg84(float(storage_values[0]), float(storage_values[1]))
+                    for storage_values in storage_key
+                ]
+            )
+            prepare(polygon)
+            self.zone_polygons[key_name] = (polygon, storage_key, len(storage_key))
+        return polygon
+
+    def get_storage_key(self) -> list:
+        """Return the stored values for the validator key name."""
+        data_validator = self.args["data_validator"]
+        storage = data_validator.storage.get(self.args["storage_name"], [])
+        return storage.get(self.args["key_name"], []) if storage != [] else []
+
+    def zone_contains_batch(self, x_values, y_values) -> numpy.ndarray:
+        """
+        Check a chunk of rows that share the validator zone in one call
+
+        Args:
+            x_values: x coordinate column values
+            y_values: y coordinate column values
+
+        Returns:
+            numpy.ndarray: a bool per row, True if the point is in the zone
+        """
+        polygon = self.get_zone_polygon(self.args["key_name"], self.get_storage_key())
+        x_values = numpy.asarray(x_values, dtype=float)
+        y_values = numpy.asarray(y_values, dtype=float)
+        return contains_xy(polygon, x_values, y_values)
+
     @ColumnValidator.check_not_valid_col_indexes
     def apply(self, args=None) -> bool:
         """
@@ -1207,43 +1746,31 @@ class CheckStoreColDictValuesValidator(ColumnValidator):
         key_name = self.args["key_name"]
         value_indexes = self.args["value_indexes"]
         values = [float(args[value]) for value in value_indexes]
-        data_validator = self.args["data_validator"]
-        storage = data_validator.storage.get(self.args["storage_name"], [])
-        storage_key = storage.get(key_name, []) if storage != [] else []
+        storage_key = self.get_storage_key()
         transform_data = self.args.get("transform_data", [])
         res = False
         if transform_data == "wsg84_to_utm":
-            for storage_values in storage_key:
-                storage_values = utm_to_wsg84(
-                    float(storage_values[0]), float(storage_values[1])
-                )
-                if math.isclose(
-                        storage_values[0], values[0], abs_tol=0.1
-                ) and math.isclose(storage_values[1], values[1], abs_tol=0.1):
-                    res = True
-                    break
+            point_index = self.get_point_index(key_name, storage_key, utm_to_wsg84)
+            res = point_index.has_close(values[0], values[1])
         elif transform_data == "wsg84_to_utm_as_bounding_box":
-            point = Point(*values)
-            bounding_box = []
-            for storage_values in storage_key:
-                storage_values = utm_to_wsg84(
-                    float(storage_values[0]), float(storage_values[1])
-                )
-                bounding_box.append(storage_values)
-            bounding_box = Polygon(bounding_box)
-            res = bounding_box.contains(point)
+            polygon = self.get_zone_polygon(key_name, storage_key)
+            res = bool(contains_xy(polygon, values[0], values[1]))
         elif transform_data == "None":
             res = True if args[value_indexes[0]] in storage_key else False
         else:
-            for storage_values in storage_key:
-                storage_values = [float(storage_values[0]), float(storage_values[1])]
-                if math.isclose(
-                        storage_values[0], values[0], abs_tol=0.1
-                ) and math.isclose(storage_values[1], values[1], abs_tol=0.1):
-                    res = True
-                    break
+            point_index = self.get_point_index(key_name, storage_key)
+            res = point_index.has_close(values[0], values[1])
         return res
 
+    def check_batch(self, chunk):
+        if self.args.get("transform_data", []) != "wsg84_to_utm_as_bounding_box":
+            return None
+        columns = [
+            [float(value) for value in chunk.column(index)]
+            for index in self.args["value_indexes"]
+        ]
+        return self.zone_contains_batch(columns[0], columns[1]).tolist()
+
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
         header = self.args["header"]
@@ -1270,6 +1797,8 @@ class CheckStoreColDictValuesValidator(ColumnValidator):
 
 
 class CheckColStorageMultiValueValidator(ColumnValidator):
+    stateless = True  # the storage it reads is not written by the same file
+
     def __init__(self, args):
         super().__init__(args)
 
@@ -1300,6 +1829,22 @@ class CheckColStorageMultiValueValidator(ColumnValidator):
 
         return status
 
+    def get_error_state(self) -> tuple:
+        return super().get_error_state() + (self.args.get("error_values"),)
+
+    def set_error_state(self, state: tuple) -> None:
+        super().set_error_state(state[:4])
+        self.args["error_values"] = state[4]
+
+    def check_batch(self, chunk) -> list:
+        separator = self.args["separator"]
+        data_validator = self.args["data_validator"]
+        storage = data_validator.storage.get(self.args["storage_name"], [])
+        return [
+            all(value in storage for value in values.split(separator))
+            for values in chunk.column(self.args["col_index"])
+        ]
+
     @ColumnValidator.check_not_valid_col_error
     def get_error(self) -> dict:
         index = self.args["col_index"]
@@ -1378,8 +1923,13 @@ class MultiRowColValueValidator(Validator):
     def get_fun_type(self) -> FunType:
         return FunType.MULTIROW
 
+    def get_rule_indexes(self) -> list:
+        return self.args["col_indexes"]
+
 
 class CompareValueValidator(ColumnValidator):
+    stateless = True
+
     def __init__(self, args):
         super().__init__(args)
         self.comparators_translator = {
@@ -1391,13 +1941,13 @@ class CompareValueValidator(ColumnValidator):
     @staticmethod
     def check_year_in_date(year, date):
         year_datetime = datetime.date(int(year), 1, 1)
-        date_datetime = datetime.datetime.strptime(date, "%Y-%m-%d")
+        date_datetime = parse_date(date)
         return year_datetime.year == date_datetime.year
 
     @staticmethod
     def check_month_in_date(month, date):
         month_datetime = datetime.date(1, int(month), 1)
-        date_datetime = datetime.datetime.strptime(date, "%Y-%m-%d")
+        date_datetime = parse_date(date)
         return month_datetime.month == date_datetime.month
 
     @staticmethod
@@ -1411,7 +1961,7 @@ class CompareValueValidator(ColumnValidator):
             "SABADO": 5,
             "DOMINGO": 6,
         }
-        date_datetime = datetime.datetime.strptime(date, "%Y-%m-%d")
+        date_datetime = parse_date(date)
         return week_day_dict[day_name] == date_datetime.weekday()
 
     comparators = {
@@ -1478,7 +2028,7 @@ class DateConsistencyValidator(ColumnValidator):
 
         self.row_counter += 1
         row = args
-        row_date = datetime.datetime.strptime(row[self.args["col_index"]], "%Y-%m-%d")
+        row_date = parse_date(row[self.args["col_index"]])
         one_day = datetime.timedelta(days=1)
         if not self.current_date or row_date == self.current_date:
             self.current_date = row_date + one_day
@@ -1503,6 +2053,8 @@ class DateConsistencyValidator(ColumnValidator):
 
 
 class CompleteYearFileConsistencyValidator(ColumnValidator):
+    reads_file_name = True
+
     def __init__(self, args):
         date_str = pathlib.Path(args["file_name"]).stem.split("_")[-1]
         self.op_date = datetime.datetime.strptime(date_str, "%Y%m%d")
@@ -1522,7 +2074,7 @@ class CompleteYearFileConsistencyValidator(ColumnValidator):
         """
         status = False
         row = args
-        date_to_check = datetime.datetime.strptime(row[2], "%Y-%m-%d")
+        date_to_check = parse_date(row[2])
         one_day = datetime.timedelta(days=1)
 
         # if PO date found start to check
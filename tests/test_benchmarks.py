@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+from contextlib import redirect_stdout
+from unittest import TestCase
+from unittest.mock import patch
+
+from benchmarks.generate import (
+    generate_delivery,
+    get_configurations,
+    get_fixtures,
+    inject_error,
+)
+from benchmarks.run import find_regressions, main, run_case
+from input_validator.configuration import ConfigFromFile
+from input_validator.data_validator import DataValidator
+
+
+class BenchmarkTest(TestCase):
+    def setUp(self):
+        self.temporal_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporal_dir.cleanup)
+
+    @staticmethod
+    def read_rows(path):
+        with open(path, encoding="UTF-8-SIG") as file:
+            return list(csv.reader(file, delimiter=";"))
+
+    def test_generate_delivery(self):
+        case = generate_delivery(
+            "diccionario_detalle_servicio", 2, 25, 0, 0, self.temporal_dir.name
+        )
+        self.assertEqual("diccionario_detalle_servicio_2x", case["name"])
+        file_name = "Diccionario-DetalleServicioZP_20200627_20200731.csv"
+        self.assertEqual({"rows": 50, "errors": 0}, case["files"][file_name])
+        rows = self.read_rows(os.path.join(case["data_path"], "Diccionario", file_name))
+        self.assertEqual(51, len(rows))
+
+        # dictionaries keep the fixture rows
+        fixture_path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "input",
+            "check_diccionario_detalle_servicio",
+        )
+        self.assertEqual(
+            self.read_rows(os.path.join(fixture_path, "Diccionario", "Diccionario-Comunas.csv")),
+            self.read_rows(os.path.join(case["data_path"], "Diccionario", "Diccionario-Comunas.csv")),
+        )
+
+    def test_inject_error(self):
+        case = generate_delivery("paraderos", 1, 30, 1, 0, self.temporal_dir.name)
+        self.assertEqual({"rows": 30, "errors": 30}, case["files"]["ConsolidadoParadas.csv"])
+        row = ["1", "2", "3"]
+        self.assertNotEqual(row, inject_error(row, random.Random(0)))
+        self.assertEqual(["1", "2", "3"], row)
+
+    def test_run_case(self):
+        case = generate_delivery("frecuencias", 1, 20, 0.5, 0, self.temporal_dir.name)
+        result = run_case(case, per_rule=True)
+        name = ", ".join(sorted(case["files"]))
+        self.assertEqual(80, result["rows"])
+        self.assertEqual(80, result["files"][name]["rows"])
+        self.assertGreater(result["files"][name]["seconds"], 0)
+        self.assertEqual([], find_regressions([result], [result], 0.2))
+
+        slow_result = dict(result, files={name: dict(result["files"][name], seconds=1000)})
+        self.assertEqual(1, len(find_regressions([slow_result], [result], 0.2)))
+
+        # multi-regex errors are reported under the names of all the files
+        data_validator = DataValidator(
+            ConfigFromFile(case["configuration"]), case["data_path"], case["date"]
+        )
+        data_validator.start_iteration_over_configuration_tree()
+        self.assertIn(name, data_validator.report_errors)
+
+    def test_every_case_runs(self):
+        fixtures = get_fixtures()
+        self.assertIn("evasion", fixtures)
+        self.assertIn("diccionario_calendario", fixtures)
+        for fixture in fixtures:
+            for configuration, date in get_configurations(fixture):
+                case = generate_delivery(
+                    fixture, 1, 200, 0.2, 0, self.temporal_dir.name, configuration, date
+                )
+                with self.subTest(case=case["name"]):
+                    # rows are only broken with errors that do not cancel the run
+                    result = run_case(case)
+                    self.assertEqual(case["name"], result["name"])
+
+        case = generate_delivery("evasion", 1, 20, 0, 0, self.temporal_dir.name, "evasion_servicio")
+        # the dependencies of the evasion file are added, so it is validated
+        result = run_case(case)
+        self.assertEqual(20, result["files"]["EvasionServicioSentidoParadaMH_20200627.csv"]["rows"])
+
+        with patch("benchmarks.generate.FIXTURE_CONFIGURATIONS", {}):
+            with self.assertRaises(ValueError):
+                get_configurations("evasion")
+
+    def test_failed_case_does_not_stop_the_run(self):
+        cases = [
+            dict(
+                generate_delivery("paraderos", 1, 20, 0, 0, self.temporal_dir.name),
+                name="cancelado",
+                configuration=os.path.join(
+                    os.path.dirname(os.path.realpath(__file__)),
+                    "input",
+                    "configuration_files",
+                    "configuration_wrong_fun_name.json",
+                ),
+            ),
+            generate_delivery("paraderos", 1, 20, 0, 0, self.temporal_dir.name),
+        ]
+        with open(os.path.join(self.temporal_dir.name, "manifest.json"), "w", encoding="UTF-8") as file:
+            json.dump(cases, file)
+        output = os.path.join(self.temporal_dir.name, "results.json")
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(1, main(["run", "--data", self.temporal_dir.name, "--output", output]))
+        with open(output, encoding="UTF-8") as file:
+            results = json.load(file)
+        self.assertEqual(["cancelado", "paraderos_1x"], [result["name"] for result in results])
+        self.assertIn("error", results[0])
+        self.assertIn("ConsolidadoParadas.csv", results[1]["files"])
@@ -0,0 +1,170 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from input_validator.cache import ResultCache
+from input_validator.configuration import ConfigFromFile
+from input_validator.data_validator import DataValidator
+from input_validator.profiling import Profiler
+from input_validator.sinks import CappedErrorSink, CsvErrorSink, RunLengthErrorSink
+
+ERROR = {
+    "name": "Valor vacío",
+    "type": "formato",
+    "message": "Existe un valor vacío en la fila 2, columna ID.",
+    "row": 2,
+    "cols": ["ID"],
+}
+
+
+class ResultCacheTest(TestCase):
+    def setUp(self):
+        self.cache_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_path)
+
+    def test_get_and_put(self):
+        cache = ResultCache(self.cache_path)
+        key = cache.get_key("file", "rules")
+        self.assertNotEqual(key, cache.get_key("file", "other rules"))
+        self.assertIsNone(cache.get(key))
+
+        cache.put(key, [ERROR], {"comunas": [1, 2]})
+        self.assertEqual({"errors": [ERROR], "storage": {"comunas": [1, 2]}}, cache.get(key))
+
+        # a broken entry is a miss
+        with open(cache.get_entry_path(key), "wb") as file:
+            file.write(b"broken")
+        self.assertIsNone(cache.get(key))
+
+    def test_evict_least_recently_used(self):
+        cache = ResultCache(self.cache_path)
+        keys = [cache.get_key(str(number), "rules") for number in range(3)]
+        for number, key in enumerate(keys):
+            cache.put(key, [ERROR], {})
+            os.utime(cache.get_entry_path(key), (number, number))
+        entry_size = os.path.getsize(cache.get_entry_path(keys[0]))
+
+        # the first entry is used again, the second one is the oldest
+        cache.get(keys[0])
+        cache.max_size = entry_size * 2
+        cache.evict()
+        self.assertEqual(
+            [True, False, True],
+            [os.path.exists(cache.get_entry_path(key)) for key in keys],
+        )
+
+
+class DataValidatorCacheTest(TestCase):
+    def setUp(self):
+        path = os.path.dirname(os.path.realpath(__file__))
+        self.input_path = os.path.join(path, "input")
+        self.configuration_path = os.path.join(self.input_path, "configuration_files")
+        self.cache_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_path)
+
+    def create_data_validator(self, configuration_name, data_path, **kwargs):
+        config_obj = ConfigFromFile(os.path.join(self.configuration_path, configuration_name))
+        return DataValidator(config_obj, data_path=data_path, date="20200627", **kwargs)
+
+    def test_replay_cached_results(self):
+        configuration_name = "configuration_diccionario_comunas_wrong.json"
+        data_path = os.path.join(self.input_path, "check_diccionario_comunas")
+        data = self.create_data_validator(configuration_name, data_path)
+        data.start_iteration_over_configuration_tree()
+
+        for jobs in [1, 1, 2]:
+            cached_data = self.create_data_validator(
+                configuration_name, data_path, jobs=jobs, cache=ResultCache(self.cache_path)
+            )
+            cached_data.start_iteration_over_configuration_tree()
+            with self.subTest(jobs=jobs):
+                self.assertEqual(data.report_errors, cached_data.report_errors)
+                self.assertEqual(data.storage, cached_data.storage)
+                self.assertEqual(data.files_checked, cached_data.files_checked)
+
+        # cached files are not read again
+        cached_data = self.create_data_validator(
+            configuration_name, data_path, cache=ResultCache(self.cache_path)
+        )
+        with patch.object(DataValidator, "check_rules") as check_rules:
+            cached_data.start_iteration_over_configuration_tree()
+        check_rules.assert_not_called()
+
+    def test_replay_cached_errors_to_sinks(self):
+        # two rules with the same name must be capped apart after a replay
+        configuration_name = "configuration_diccionario_comunas_wrong.json"
+        data_path = os.path.join(self.input_path, "check_diccionario_comunas")
+        reports = []
+        with tempfile.TemporaryDirectory() as temporal_dir:
+            for number in range(3):
+                file_path = os.path.join(temporal_dir, f"{number}.csv")
+                error_sink = CappedErrorSink(RunLengthErrorSink(CsvErrorSink(file_path)), max_rule_errors=3)
+                with error_sink:
+                    self.create_data_validator(
+                        configuration_name,
+                        data_path,
+                        error_sink=error_sink,
+                        cache=ResultCache(self.cache_path) if number else None,
+                    ).start_iteration_over_configuration_tree()
+                with open(file_path, encoding="utf-8") as file:
+                    reports.append(file.read())
+        self.assertEqual(reports[0], reports[1])
+        self.assertEqual(reports[0], reports[2])
+
+    def test_changed_files_and_storage_readers(self):
+        configuration_name = "configuration_diccionario_detalle_servicio.json"
+        with tempfile.TemporaryDirectory() as temporal_dir:
+            data_path = os.path.join(temporal_dir, "data")
+            shutil.copytree(
+                os.path.join(self.input_path, "check_diccionario_detalle_servicio"), data_path
+            )
+            cache = ResultCache(self.cache_path)
+            self.create_data_validator(
+                configuration_name, data_path, cache=cache
+            ).start_iteration_over_configuration_tree()
+            # files whose rules read storage of other files are not cached
+            self.assertEqual(1, len(os.listdir(self.cache_path)))
+
+            comunas_path = os.path.join(data_path, "Diccionario", "Diccionario-Comunas.csv")
+            with open(comunas_path, "a", encoding="utf-8") as file:
+                file.write("999;NUEVA\n")
+            data = self.create_data_validator(configuration_name, data_path, cache=cache)
+            with patch.object(DataValidator, "check_rules", wraps=data.check_rules) as check_rules:
+                data.start_iteration_over_configuration_tree()
+            self.assertIn(
+                "Diccionario-Comunas.csv",
+                [call.args[2] for call in check_rules.call_args_list],
+            )
+            self.assertEqual(2, len(os.listdir(self.cache_path)))
+
+    def test_no_cache_with_fail_fast(self):
+        data = self.create_data_validator(
+            "configuration_diccionario_comunas_wrong.json",
+            os.path.join(self.input_path, "check_diccionario_comunas"),
+            fail_fast=1,
+            cache=ResultCache(self.cache_path),
+        )
+        data.start_iteration_over_configuration_tree()
+        self.assertEqual([], os.listdir(self.cache_path))
+
+    def test_no_cache_with_profiler(self):
+        for _ in range(2):
+            data = self.create_data_validator(
+                "configuration_diccionario_comunas_wrong.json",
+                os.path.join(self.input_path, "check_diccionario_comunas"),
+                profiler=Profiler(),
+                cache=ResultCache(self.cache_path),
+            )
+            data.start_iteration_over_configuration_tree()
+            # profiled files are read on every run
+            self.assertEqual(
+                ["Diccionario-Comunas-Wrong.csv"],
+                [stats["file"] for stats in data.profiler.to_dict()["files"]],
+            )
+        self.assertEqual([], os.listdir(self.cache_path))
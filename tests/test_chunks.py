@@ -0,0 +1,89 @@
+import csv
+import io
+from unittest import TestCase
+
+from input_validator.chunks import (
+    RowChunk,
+    find_row_starts,
+    open_byte_range,
+    read_chunks,
+    split_byte_ranges,
+)
+
+
+class RowChunkTest(TestCase):
+    def test_column(self):
+        chunk = RowChunk([["1", "a"], ["2", "b"], ["3", "c"]])
+        self.assertEqual(3, len(chunk))
+        self.assertEqual(["a", "b", "c"], chunk.column(1))
+        self.assertIs(chunk.column(1), chunk.column(1))
+
+    def test_get_wide_rows(self):
+        chunk = RowChunk([["1", "a"], ["2"], ["3", "c", "x"]])
+        self.assertEqual(1, chunk.min_width)
+
+        wide_chunk, offsets = chunk.get_wide_rows(1)
+        self.assertIs(chunk, wide_chunk)
+        self.assertEqual(range(3), offsets)
+
+        wide_chunk, offsets = chunk.get_wide_rows(2)
+        self.assertEqual([["1", "a"], ["3", "c", "x"]], wide_chunk.rows)
+        self.assertEqual([0, 2], offsets)
+
+
+class ReadChunksTest(TestCase):
+    def test_read_chunks(self):
+        rows = [[str(i)] for i in range(5)]
+        self.assertEqual(
+            [rows[0:2], rows[2:4], rows[4:5]], list(read_chunks(iter(rows), 2))
+        )
+        self.assertEqual([], list(read_chunks(iter([]), 2)))
+
+    def test_read_chunks_error(self):
+        def reader():
+            yield ["1"]
+            yield ["2"]
+            raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+        chunks = read_chunks(reader(), 10)
+        self.assertEqual([["1"], ["2"]], next(chunks))
+        with self.assertRaises(UnicodeDecodeError):
+            next(chunks)
+
+
+class ByteRangesTest(TestCase):
+    DATA = (
+        'ID;NOMBRE\n1;"con ; y\nsalto"\n2;3" pulgadas\n'
+        '3;"dice ""hola""\n"\n\n4;ñandú\r\n5;x\n'
+    ).encode("utf-8")
+
+    def test_find_row_starts(self):
+        row_starts = [0, 10, 28, 42, 61, 62, 73, 77]
+        self.assertEqual(row_starts[:-1], find_row_starts(io.BytesIO(self.DATA), row_starts[:-1]))
+        self.assertEqual(77, len(self.DATA))
+
+        # newlines inside quoted fields do not start a row, quotes inside
+        # unquoted fields do not open one
+        offsets = list(range(len(self.DATA) + 2))
+        expected = [
+            next((start for start in row_starts if start >= offset), len(self.DATA))
+            for offset in offsets
+        ]
+        for block_size in [1, 2, 5, 1 << 20]:
+            with self.subTest(block_size=block_size):
+                self.assertEqual(
+                    expected, find_row_starts(io.BytesIO(self.DATA), offsets, block_size)
+                )
+
+    def test_split_byte_ranges(self):
+        rows = list(csv.reader(io.StringIO(self.DATA.decode("utf-8")), delimiter=";"))
+        for parts in [1, 2, 3, 20]:
+            file = io.BytesIO(self.DATA)
+            byte_ranges = split_byte_ranges(file, len(self.DATA), parts)
+            self.assertEqual(10, byte_ranges[0][0])
+            self.assertLessEqual(len(byte_ranges), parts)
+            range_rows = []
+            for start, end in byte_ranges:
+                range_rows.extend(csv.reader(open_byte_range(file, start, end), delimiter=";"))
+            with self.subTest(parts=parts):
+                self.assertEqual(rows[1:], range_rows)
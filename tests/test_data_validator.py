@@ -1,6 +1,8 @@
 import json
 import logging
 import os
+import shutil
+import tempfile
 from unittest import TestCase
 
 import mock
@@ -180,6 +182,25 @@ class DataValidatorTest(TestCase):
             self.assertEqual(1, len(rules_dict["FILE"]))
             self.assertEqual(3, len(rules_dict["ROW"]))
 
+    def test_dispatch_rules_wrong_regex(self):
+        config_obj = ConfigFromFile(
+            os.path.join(self.configuration_path, "configuration.json"))
+        data_validator = DataValidator(
+            config_obj,
+            self.data_path,
+            date="20200627",
+        )
+        rules = {
+            "formatRules": [
+                {
+                    "function": "regex_value",
+                    "args": {"col_index": 2, "regex": "^[A-Z{4}", "regex_name": "AAAA11"},
+                }
+            ]
+        }
+        with self.assertRaises(SystemExit):
+            data_validator.dispatch_rules(rules, ["FOLIO", "UN", "PLACA"], "Patentes.csv")
+
     def test_check_rules_utf8(self):
         path = os.path.join(self.input_path, "utf8_data")
         latin1_name = "Diccionario-Servicios-Latin1.csv"
@@ -368,7 +389,8 @@ class DataValidatorTest(TestCase):
                     "message": "La variable '0' "
                                "está duplicada en "
                                "la fila 3, columna "
-                               "ID.",
+                               "ID, primera aparición "
+                               "en la fila 2.",
                     "name": "Valor duplicado",
                     "row": 3,
                     "type": "formato",
@@ -379,7 +401,8 @@ class DataValidatorTest(TestCase):
                                "'LAMPA' está "
                                "duplicada en la "
                                "fila 3, columna "
-                               "NOMBRE.",
+                               "NOMBRE, primera "
+                               "aparición en la fila 2.",
                     "name": "Valor duplicado",
                     "row": 3,
                     "type": "formato",
@@ -435,7 +458,8 @@ class DataValidatorTest(TestCase):
                                "'T207 00R' está "
                                "duplicada en la "
                                "fila 41, columna "
-                               "COD_SINRUT.",
+                               "COD_SINRUT, primera "
+                               "aparición en la fila 40.",
                     "name": "Valor duplicado",
                     "row": 41,
                     "type": "formato",
@@ -447,7 +471,8 @@ class DataValidatorTest(TestCase):
                                "duplicada en la "
                                "fila 415, "
                                "columna "
-                               "COD_SINRUT.",
+                               "COD_SINRUT, primera "
+                               "aparición en la fila 267.",
                     "name": "Valor duplicado",
                     "row": 415,
                     "type": "formato",
@@ -459,7 +484,8 @@ class DataValidatorTest(TestCase):
                                "duplicada en la "
                                "fila 419, "
                                "columna "
-                               "COD_SINRUT.",
+                               "COD_SINRUT, primera "
+                               "aparición en la fila 267.",
                     "name": "Valor duplicado",
                     "row": 419,
                     "type": "formato",
@@ -471,7 +497,8 @@ class DataValidatorTest(TestCase):
                                "duplicada en la "
                                "fila 581, "
                                "columna "
-                               "COD_SINRUT.",
+                               "COD_SINRUT, primera "
+                               "aparición en la fila 267.",
                     "name": "Valor duplicado",
                     "row": 581,
                     "type": "formato",
@@ -483,7 +510,8 @@ class DataValidatorTest(TestCase):
                                "duplicada en la "
                                "fila 586, "
                                "columna "
-                               "COD_SINRUT.",
+                               "COD_SINRUT, primera "
+                               "aparición en la fila 267.",
                     "name": "Valor duplicado",
                     "row": 586,
                     "type": "formato",
@@ -495,7 +523,8 @@ class DataValidatorTest(TestCase):
                                "duplicada en la "
                                "fila 1315, "
                                "columna "
-                               "COD_SINRUT.",
+                               "COD_SINRUT, primera "
+                               "aparición en la fila 267.",
                     "name": "Valor duplicado",
                     "row": 1315,
                     "type": "formato",
@@ -507,7 +536,8 @@ class DataValidatorTest(TestCase):
                                "duplicada en la "
                                "fila 1406, "
                                "columna "
-                               "COD_SINRUT.",
+                               "COD_SINRUT, primera "
+                               "aparición en la fila 267.",
                     "name": "Valor duplicado",
                     "row": 1406,
                     "type": "formato",
@@ -1118,6 +1148,48 @@ class DataValidatorTest(TestCase):
         self.assertEqual(expected_report, data.report)
         self.assertEqual({}, data.report_errors)
 
+    def test_frecuencias_errors(self):
+        # errors of a multi-regex node are reported under all its file names
+        with tempfile.TemporaryDirectory() as temporal_dir:
+            data_path = os.path.join(temporal_dir, "data")
+            shutil.copytree(os.path.join(self.input_path, "check_frecuencias"), data_path)
+            file_path = os.path.join(data_path, "Frecuencias", "Capacidades_PO20200627.csv")
+            with open(file_path, encoding="utf-8") as file:
+                lines = file.read().split("\n")
+            row = lines[9].split(";")
+            row[6] = "x"
+            lines[9] = ";".join(row)
+            with open(file_path, "w", encoding="utf-8") as file:
+                file.write("\n".join(lines))
+
+            for jobs in [1, 2]:
+                data = DataValidator(
+                    ConfigFromFile(
+                        os.path.join(self.configuration_path, "configuration_frecuencias.json")
+                    ),
+                    data_path=data_path,
+                    date="20200627",
+                    jobs=jobs,
+                )
+                data.start_iteration_over_configuration_tree()
+                with self.subTest(jobs=jobs):
+                    self.assertEqual(
+                        {
+                            "Capacidades_PO20200627.csv, Distancias_PO20200627.csv, "
+                            "Frecuencias_PO20200627.csv, Velocidades_PO20200627.csv": [
+                                {
+                                    "name": "Formato float incorrecto",
+                                    "type": "formato",
+                                    "message": "Existe un valor en formato distinto a float "
+                                    "en la fila 18, columna 5:29.",
+                                    "row": 18,
+                                    "cols": ["5:29"],
+                                }
+                            ]
+                        },
+                        data.report_errors,
+                    )
+
     def test_evasion_777(self):
         # base case
         config_obj = ConfigFromFile(
@@ -1207,3 +1279,165 @@ class DataValidatorTest(TestCase):
         self.assertEqual(expected_report, data.report)
         expected_errors = {}
         self.assertEqual(expected_errors, data.report_errors)
+
+    def test_chunked_engine_gives_same_report(self):
+        cases = [
+            ("configuration_diccionario_comunas_wrong.json", "check_diccionario_comunas", "20200627"),
+            ("configuration_diccionario_servicios_wrong.json", "check_diccionario_servicios", "20200627"),
+            ("configuration_diccionario_patentes_wrong.json", "check_diccionario_patentes", "20200627"),
+            ("configuration_diccionario_periodos_ts_wrong.json", "check_diccionario_periodos_ts", "20200627"),
+            ("configuration_shape_rutas_wrong.json", "check_shape_rutas", "20200627"),
+            ("configuration_diccionario_zonificaciones_wrong.json", "check_diccionario_zonificaciones", "20200627"),
+            ("configuration_diccionario_estaciones_metro_wrong.json", "check_diccionario_estaciones_metro",
+             "20200627"),
+            ("configuration_diccionario_estaciones_metrotren_wrong.json", "check_diccionario_estaciones_metrotren",
+             "20200627"),
+            ("configuration_paraderos.json", "check_paraderos", "20200627"),
+            ("configuration_diccionario_detalle_servicio.json", "check_diccionario_detalle_servicio", "20200627"),
+            ("configuration_frecuencias.json", "check_frecuencias", "20200627"),
+            ("configuration_evasion_servicio.json", "check_evasion", "20200627"),
+            ("configuration_diccionario_tipo_dia.json", "check_diccionario_calendario", "20210405"),
+        ]
+        for configuration_name, data_name, date in cases:
+            reports = []
+            for engine, chunk_size in [("row", 1), ("chunked", 7), ("chunked", 65536)]:
+                config_obj = ConfigFromFile(os.path.join(self.configuration_path, configuration_name))
+                data = DataValidator(
+                    config_obj,
+                    data_path=os.path.join(self.input_path, data_name),
+                    date=date,
+                    engine=engine,
+                    chunk_size=chunk_size,
+                )
+                data.start_iteration_over_configuration_tree()
+                reports.append((data.report, dict(data.report_errors)))
+            with self.subTest(configuration_name=configuration_name):
+                self.assertEqual(reports[0], reports[1])
+                self.assertEqual(reports[0], reports[2])
+
+    def test_preflight(self):
+        config_obj = ConfigFromFile(os.path.join(self.configuration_path, "configuration_check_name.json"))
+        data_validator = DataValidator(
+            config_obj, data_path=self.data_path, date="20200627", preflight_lines=10
+        )
+        rules = {"formatRules": [{"function": "min_rows", "args": {"min": 1000}}]}
+
+        path = os.path.join(self.input_path, "utf8_data")
+        header = ["ROUTE_ID", "ROUTE_NAME"]
+        report = data_validator.validate_node_rules(
+            path, "Diccionario-Servicios-Latin1.csv", rules, header
+        )
+        self.assertEqual(["Error de encoding"], [error["name"] for error in report])
+
+        # only the header is checked, rules are not applied
+        path = os.path.join(self.input_path, "header_data")
+        header = ["ID", "NOMBRE"]
+        self.assertEqual(
+            [], data_validator.validate_node_rules(path, "Diccionario-Comunas.csv", rules, header)
+        )
+        report = data_validator.validate_node_rules(
+            path, "Diccionario-Comunas-Wrong-Header.csv", rules, header
+        )
+        self.assertEqual(["Header incorrecto"], [error["name"] for error in report])
+
+        # the tree is checked without reading the rows
+        config_obj = ConfigFromFile(
+            os.path.join(self.configuration_path, "configuration_diccionario_detalle_servicio.json"))
+        data = DataValidator(
+            config_obj,
+            data_path=os.path.join(self.input_path, "check_diccionario_detalle_servicio"),
+            date="20200627",
+            preflight_lines=10,
+        )
+        data.start_iteration_over_configuration_tree()
+        self.assertEqual(
+            ["Diccionario-Servicios.csv", "Diccionario-Zonificaciones.csv"],
+            sorted(data.report_errors),
+        )
+
+    def test_fail_fast(self):
+        config_path = os.path.join(
+            self.configuration_path, "configuration_diccionario_detalle_servicio.json"
+        )
+        data_path = os.path.join(self.input_path, "check_diccionario_detalle_servicio")
+        data = DataValidator(ConfigFromFile(config_path), data_path=data_path, date="20200627")
+        data.start_iteration_over_configuration_tree()
+        report_errors = data.report_errors
+
+        # every file stops after its first errors
+        for kwargs in [{}, {"engine": "chunked", "chunk_size": 7}, {"jobs": 2}]:
+            data = DataValidator(
+                ConfigFromFile(config_path),
+                data_path=data_path,
+                date="20200627",
+                fail_fast=3,
+                **kwargs
+            )
+            data.start_iteration_over_configuration_tree()
+            with self.subTest(**kwargs):
+                self.assertEqual(
+                    {name: errors[:3] for name, errors in report_errors.items()},
+                    data.report_errors,
+                )
+
+        # the run stops after its first errors
+        data = DataValidator(
+            ConfigFromFile(config_path),
+            data_path=data_path,
+            date="20200627",
+            fail_fast=3,
+            fail_fast_run=True,
+        )
+        data.start_iteration_over_configuration_tree()
+        self.assertEqual(3, sum(len(errors) for errors in data.report_errors.values()))
+        self.assertNotIn(
+            "Diccionario-DetalleServicioZP_20200801_20200830.csv", data.report_errors
+        )
+
+    def test_path_list_storage_snapshot(self):
+        config_obj = ConfigFromFile(os.path.join(self.configuration_path, "configuration_paraderos.json"))
+        data_path = os.path.join(self.input_path, "check_paraderos")
+        paradas_path = os.path.join(data_path, "Paraderos", "ConsolidadoParadas.csv")
+        with tempfile.TemporaryDirectory() as temporal_dir:
+            snapshot_path = os.path.join(temporal_dir, "storage.pickle")
+            data = DataValidator(
+                config_obj, data_path=data_path, date="20200627", storage_snapshot=snapshot_path
+            )
+            data.start_iteration_over_configuration_tree()
+
+            # without the comunas storage every row fails
+            path_list_data = DataValidator(config_obj, data_path=[paradas_path], date="20200627")
+            with self.assertLogs("test", level="WARNING"):
+                path_list_data.log = logging.getLogger("test")
+                path_list_data.start_iteration_over_path_list()
+            self.assertNotEqual(
+                data.report_errors["ConsolidadoParadas.csv"],
+                path_list_data.report_errors["ConsolidadoParadas.csv"],
+            )
+
+            path_list_data = DataValidator(
+                config_obj, data_path=[paradas_path], date="20200627", storage_snapshot=snapshot_path
+            )
+            path_list_data.start_iteration_over_path_list()
+            self.assertEqual(data.storage, path_list_data.storage)
+            self.assertEqual(
+                data.report_errors["ConsolidadoParadas.csv"],
+                path_list_data.report_errors["ConsolidadoParadas.csv"],
+            )
+
+    def test_no_storage_snapshot_with_fail_fast(self):
+        # files that stop at their first errors do not store all their values
+        config_obj = ConfigFromFile(os.path.join(self.configuration_path, "configuration_paraderos.json"))
+        data_path = os.path.join(self.input_path, "check_paraderos")
+        with tempfile.TemporaryDirectory() as temporal_dir:
+            snapshot_path = os.path.join(temporal_dir, "storage.pickle")
+            data = DataValidator(
+                config_obj,
+                data_path=data_path,
+                date="20200627",
+                fail_fast=1,
+                storage_snapshot=snapshot_path,
+            )
+            data.start_iteration_over_configuration_tree()
+            self.assertFalse(data.stopped)
+            self.assertFalse(os.path.exists(snapshot_path))
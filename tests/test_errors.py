@@ -0,0 +1,127 @@
+import os
+import pickle
+from unittest import TestCase
+
+from input_validator.configuration import ConfigFromFile
+from input_validator.data_validator import DataValidator
+from input_validator.errors import ErrorRecord, render_error
+from input_validator.validators import (
+    CheckColStorageMultiValueValidator,
+    DuplicateValueValidator,
+    StringDomainValueValidator,
+)
+
+
+class Storage:
+    def __init__(self, storage):
+        self.storage = storage
+
+
+class ErrorRecordTest(TestCase):
+    def test_render_keeps_failure_state(self):
+        header = ["ID", "SENTIDO"]
+        validator = StringDomainValueValidator(
+            {"header": header, "col_indexes": [1], "domain": ["I", "R"]}
+        )
+        self.assertFalse(validator.apply(["1", "X"]))
+        expected = validator.get_error()
+        record = ErrorRecord(validator)
+
+        self.assertFalse(validator.apply(["2"]))
+        self.assertTrue(validator.apply(["3", "I"]))
+        self.assertEqual(expected, record.render())
+        self.assertEqual(expected, record)
+        self.assertEqual(expected["message"], record["message"])
+        self.assertEqual(repr(expected), repr(record))
+        # rendering does not change the validator state
+        self.assertEqual(3, validator.row_counter)
+        self.assertEqual(["3", "I"], validator.args["row"])
+
+    def test_validator_specific_state(self):
+        validator = DuplicateValueValidator({"header": ["ID"], "col_index": 0})
+        for row in [["1"], ["2"], ["1"]]:
+            validator.apply(row)
+        first_record = ErrorRecord(validator)
+        validator.apply(["2"])
+        second_record = ErrorRecord(validator)
+        self.assertIn("primera aparición en la fila 2.", first_record["message"])
+        self.assertIn("primera aparición en la fila 3.", second_record["message"])
+
+        validator = CheckColStorageMultiValueValidator(
+            {
+                "header": ["ID", "COMUNAS"],
+                "col_index": 1,
+                "separator": "-",
+                "storage_name": "COMUNAS",
+                "data_validator": Storage({"COMUNAS": ["NUNOA", "MAIPU"]}),
+            }
+        )
+        self.assertFalse(validator.apply(["1", "NUNOA-LAMPA"]))
+        record = ErrorRecord(validator)
+        self.assertFalse(validator.apply(["2", "PIRQUE"]))
+        self.assertIn("'['LAMPA']'", record["message"])
+
+    def test_records_do_not_keep_file_data(self):
+        validator = DuplicateValueValidator({"header": ["ID"], "col_index": 0})
+        records = []
+        for row in [["1"], ["2"], ["1"], ["2"]]:
+            if not validator.apply(row):
+                records.append(ErrorRecord(validator))
+        first_record, second_record = records
+        # the records share a copy of the validator without its indexed values
+        self.assertIs(first_record.validator, second_record.validator)
+        self.assertIsNot(validator, first_record.validator)
+        self.assertIsNone(first_record.validator.values)
+        self.assertIn("primera aparición en la fila 2.", first_record["message"])
+        self.assertIn("primera aparición en la fila 3.", second_record["message"])
+
+        validator = CheckColStorageMultiValueValidator(
+            {
+                "header": ["ID", "COMUNAS"],
+                "col_index": 1,
+                "separator": "-",
+                "storage_name": "COMUNAS",
+                "data_validator": Storage({"COMUNAS": ["NUNOA", "MAIPU"]}),
+            }
+        )
+        self.assertFalse(validator.apply(["1", "NUNOA-LAMPA"]))
+        record = ErrorRecord(validator)
+        self.assertNotIn("data_validator", record.validator.args)
+        self.assertIn("data_validator", validator.args)
+        self.assertIn("'['LAMPA']'", record["message"])
+
+    def test_pickle_and_render_error(self):
+        validator = StringDomainValueValidator(
+            {"header": ["ID", "SENTIDO"], "col_indexes": [1], "domain": ["I", "R"]}
+        )
+        validator.apply(["1", "X"])
+        record = ErrorRecord(validator)
+        error = pickle.loads(pickle.dumps(record))
+        self.assertIs(dict, type(error))
+        self.assertEqual(record.render(), error)
+        self.assertIs(error, render_error(error))
+        self.assertEqual(error, render_error(record))
+
+    def test_data_validator_records(self):
+        path = os.path.dirname(os.path.realpath(__file__))
+        input_path = os.path.join(path, "input")
+        config_obj = ConfigFromFile(
+            os.path.join(input_path, "configuration_files", "configuration_diccionario_comunas_wrong.json"))
+        data = DataValidator(
+            config_obj,
+            data_path=os.path.join(input_path, "check_diccionario_comunas"),
+            date="20200627",
+        )
+        data.start_iteration_over_configuration_tree()
+
+        records = data.error_records["Diccionario-Comunas-Wrong.csv"]
+        self.assertEqual(2, len(records))
+        self.assertTrue(all(isinstance(record, ErrorRecord) for record in records))
+        self.assertEqual(
+            [record.render() for record in records],
+            data.report_errors["Diccionario-Comunas-Wrong.csv"],
+        )
+        self.assertEqual(
+            [("Diccionario-Comunas-Wrong.csv", record.render()) for record in records],
+            list(data.iter_errors()),
+        )
@@ -0,0 +1,110 @@
+import os
+import pickle
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from input_validator.configuration import ConfigFromFile
+from input_validator.data_validator import DataValidator
+from input_validator.filesystem import LocalFileSystem, ZipFileSystem
+from input_validator.patterns import find_names
+
+
+class ZipFileSystemTest(TestCase):
+    def setUp(self):
+        path = os.path.dirname(os.path.realpath(__file__))
+        self.input_path = os.path.join(path, "input")
+        self.configuration_path = os.path.join(self.input_path, "configuration_files")
+        self.temporal_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporal_dir.cleanup)
+
+    def create_zip(self, data_name):
+        """Zip a test data directory, with the directory as zip root."""
+        zip_path = os.path.join(self.temporal_dir.name, "{0}.zip".format(data_name))
+        data_path = os.path.join(self.input_path, data_name)
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+            zip_ref.write(data_path, data_name)
+            for root, dirs, files in sorted(os.walk(data_path)):
+                for name in sorted(dirs + files):
+                    path = os.path.join(root, name)
+                    zip_ref.write(path, os.path.relpath(path, self.input_path))
+        return zip_path
+
+    def test_file_system(self):
+        file_system = ZipFileSystem(self.create_zip("check_diccionario_servicios"))
+        self.addCleanup(file_system.close)
+        local_path = os.path.join(self.input_path, "check_diccionario_servicios", "Diccionario")
+
+        self.assertTrue(file_system.exists("check_diccionario_servicios"))
+        self.assertTrue(file_system.exists(os.path.join("check_diccionario_servicios", "Diccionario")))
+        self.assertFalse(file_system.exists("Diccionario"))
+        self.assertEqual(["check_diccionario_servicios"], file_system.listdir(""))
+        self.assertEqual(
+            sorted(os.listdir(local_path)),
+            sorted(file_system.listdir(os.path.join("check_diccionario_servicios", "Diccionario"))),
+        )
+        self.assertEqual(
+            find_names(local_path, "Diccionario-Servicios*.csv", LocalFileSystem()),
+            find_names(
+                os.path.join("check_diccionario_servicios", "Diccionario"),
+                "Diccionario-Servicios*.csv",
+                file_system,
+            ),
+        )
+        with self.assertRaises(FileNotFoundError):
+            file_system.listdir("Diccionario")
+
+        name = os.listdir(local_path)[0]
+        with open(os.path.join(local_path, name), encoding="UTF-8-SIG") as file:
+            expected = file.read()
+        with file_system.open(os.path.join("check_diccionario_servicios", "Diccionario", name)) as file:
+            self.assertEqual(expected, file.read())
+        self.assertEqual(
+            os.path.getsize(os.path.join(local_path, name)),
+            file_system.getsize(os.path.join("check_diccionario_servicios", "Diccionario", name)),
+        )
+        with self.assertRaises(FileNotFoundError):
+            file_system.getsize(name)
+
+        file_system = pickle.loads(pickle.dumps(file_system))
+        with file_system.open(os.path.join("check_diccionario_servicios", "Diccionario", name)) as file:
+            self.assertEqual(expected, file.read())
+        file_system.close()
+
+    def test_validate_zip(self):
+        cases = [
+            ("configuration_diccionario_servicios_wrong.json", "check_diccionario_servicios"),
+            ("configuration_diccionario_detalle_servicio.json", "check_diccionario_detalle_servicio"),
+            ("configuration_frecuencias.json", "check_frecuencias"),
+        ]
+        for configuration_name, data_name in cases:
+            config_path = os.path.join(self.configuration_path, configuration_name)
+            data = DataValidator(
+                ConfigFromFile(config_path),
+                data_path=os.path.join(self.input_path, data_name),
+                date="20200627",
+            )
+            data.start_iteration_over_configuration_tree()
+
+            zip_path = self.create_zip(data_name)
+            # members are also checked over byte ranges
+            for jobs, split_size in [(1, None), (3, 1)]:
+                file_system = ZipFileSystem(zip_path)
+                zip_data = DataValidator(
+                    ConfigFromFile(config_path),
+                    data_path=data_name,
+                    date="20200627",
+                    jobs=jobs,
+                    file_system=file_system,
+                    split_size=split_size,
+                )
+                zip_data.start_iteration_over_configuration_tree()
+                file_system.close()
+
+                with self.subTest(configuration_name=configuration_name, jobs=jobs):
+                    self.assertEqual(data.report, zip_data.report)
+                    # messages show the data path, which is relative to the zip root
+                    self.assertEqual(
+                        str(data.report_errors).replace(self.input_path + os.sep, ""),
+                        str(zip_data.report_errors),
+                    )
@@ -0,0 +1,58 @@
+import csv
+import os
+import tempfile
+from unittest import TestCase
+
+from input_validator.chunks import open_byte_range
+from input_validator.filesystem import LocalFileSystem
+from input_validator.lineindex import open_line_index
+
+
+class LineIndexTest(TestCase):
+    DATA = (
+        '\ufeffID;NOMBRE\n1;"con ; y\nsalto"\n2;3" pulgadas\n'
+        '3;"dice ""hola""\n"\n\n4;ñandú\r\n5;x'
+    ).encode("utf-8")
+
+    def setUp(self):
+        temporal_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal_dir.cleanup)
+        self.file_path = os.path.join(temporal_dir.name, "datos.csv")
+        with open(self.file_path, "wb") as file:
+            file.write(self.DATA)
+
+    def test_rows(self):
+        with open(self.file_path, encoding="UTF-8-SIG", newline="") as file:
+            rows = list(csv.reader(file, delimiter=";"))
+        with LocalFileSystem().open_line_index(self.file_path) as line_index:
+            # newlines inside quoted fields do not start a row
+            self.assertEqual([0, 13, 31, 45, 64, 65, 76], list(line_index.starts))
+            self.assertEqual(len(rows), len(line_index))
+
+    def test_split(self):
+        with open(self.file_path, encoding="UTF-8-SIG", newline="") as file:
+            rows = list(csv.reader(file, delimiter=";"))
+        with open_line_index(self.file_path) as line_index, open(self.file_path, "rb") as file:
+            for parts in [1, 2, 3, 20]:
+                byte_ranges = line_index.split(parts)
+                self.assertEqual(13, byte_ranges[0][0])
+                range_rows = []
+                for start, end in byte_ranges:
+                    range_rows.append(
+                        list(csv.reader(open_byte_range(file, start, end), delimiter=";"))
+                    )
+                with self.subTest(parts=parts):
+                    self.assertEqual(min(parts, 6), len(byte_ranges))
+                    self.assertEqual(rows[1:], sum(range_rows, []))
+                    self.assertLessEqual(
+                        max(map(len, range_rows)) - min(map(len, range_rows)), 1
+                    )
+
+    def test_small_files(self):
+        for data, rows in [(b"", 0), (b"ID\n", 1), (b"ID\n\n", 2)]:
+            with open(self.file_path, "wb") as file:
+                file.write(data)
+            with open_line_index(self.file_path) as line_index:
+                with self.subTest(data=data):
+                    self.assertEqual(rows, len(line_index))
+                    self.assertEqual(len(data) > 3, bool(line_index.split(2)))
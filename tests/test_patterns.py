@@ -0,0 +1,32 @@
+import glob
+import os
+from unittest import TestCase
+
+from input_validator.patterns import compile_regex, find_names, search_batch
+
+
+class PatternsTest(TestCase):
+    def setUp(self):
+        path = os.path.dirname(os.path.realpath(__file__))
+        self.path = os.path.join(path, "input", "check_name_data", "Frecuencias2")
+
+    def test_find_names(self):
+        for pattern in ["Capacidades_PO*.csv", "*_PO2020062[0-9].csv", "wrong.csv"]:
+            expected = [
+                os.path.split(name)[1]
+                for name in glob.glob(os.path.join(self.path, pattern))
+            ]
+            self.assertEqual(expected, find_names(self.path, pattern))
+
+        self.assertEqual([], find_names(os.path.join(self.path, "wrong"), "*.csv"))
+
+    def test_compile_regex(self):
+        regex = compile_regex("^[A-Z]{4}[0-9]{2}$")
+        self.assertIs(regex, compile_regex("^[A-Z]{4}[0-9]{2}$"))
+
+    def test_search_batch(self):
+        regex = compile_regex("^[A-Z]{4}[0-9]{2}|[A-Z]{2}[0-9]{4}$")
+        self.assertEqual(
+            [True, True, False, False],
+            search_batch(regex, ["BJFB28", "FH1234", "1234", ""]),
+        )
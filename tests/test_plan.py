@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from input_validator.configuration import ConfigFromFile
+from input_validator.data_validator import DataValidator
+from input_validator.plan import PlanError, compile_plan, load_plan
+from input_validator.validators import MinRowsValidator
+
+
+class ExecutionPlanTest(TestCase):
+    def setUp(self):
+        path = os.path.dirname(os.path.realpath(__file__))
+        self.input_path = os.path.join(path, "input")
+        self.configuration_path = os.path.join(self.input_path, "configuration_files")
+
+    def read_configuration(self, configuration_name) -> str:
+        with open(
+            os.path.join(self.configuration_path, configuration_name), encoding="utf-8-SIG"
+        ) as file:
+            return file.read()
+
+    def test_compile_plan(self):
+        config = json.loads(self.read_configuration("configuration_paraderos.json"))
+        plan = compile_plan(config)
+        self.assertEqual(
+            [
+                "",
+                "Diccionario",
+                "Diccionario-Comunas.csv",
+                "Diccionario-Zonificaciones.csv",
+                "Paraderos",
+                "ConsolidadoParadas.csv",
+            ],
+            [node.name for node in plan.nodes],
+        )
+        self.assertEqual([], list(plan.warnings))
+        comunas = plan.nodes[2]
+        self.assertEqual(frozenset({"comunas"}), comunas.produced)
+        self.assertEqual(frozenset({"comunas"}), plan.nodes[5].consumed)
+        self.assertEqual((0, 0), comunas.position)
+        self.assertIs(comunas, plan.get_node_plan((0, 0)))
+        self.assertIsNone(plan.get_node_plan((2,)))
+        self.assertIs(MinRowsValidator, comunas.rule_specs[0].fun_class)
+
+    def test_every_error_is_reported(self):
+        with self.assertRaises(PlanError) as context:
+            compile_plan(json.loads(self.read_configuration("configuration_wrong_name.json")))
+        self.assertEqual(
+            [
+                "Nombre de función 'max_cols' no válida.",
+                "Nombre de función 'date_time_cols' no válida.",
+            ],
+            context.exception.messages,
+        )
+
+        rules = {"formatRules": [{"function": "regex_value", "args": {"col_index": 2, "regex": "^[A-Z{4}"}}]}
+        config = {"path": {"type": "root", "name": ""}, "rules": rules, "children": [{"path": {}}]}
+        with self.assertRaises(PlanError) as context:
+            compile_plan(config)
+        self.assertEqual(
+            [
+                "Expresión regular '^[A-Z{4}' no válida en la función 'regex_value'.",
+                "Nodo de la configuración en '' sin la llave 'name'.",
+            ],
+            context.exception.messages,
+        )
+
+    def test_validator_args_errors(self):
+        rules = {
+            "formatRules": [
+                {"function": "bounding_box", "args": {"col_indexes": [1, 2], "bounding_box": 5}},
+                # the op date is read from the name of the file found
+                {"function": "complete_year_file_consistency", "args": {"col_index": 2}},
+            ]
+        }
+        config = {
+            "path": {"type": "root", "name": ""},
+            "rules": {},
+            "children": [{"path": {"type": "regex", "name": "Datos_\\d{8}.csv"}, "rules": rules}],
+        }
+        with self.assertRaises(PlanError) as context:
+            compile_plan(config)
+        self.assertEqual(
+            [
+                "Error en la función bounding_box del archivo Datos_\\d{8}.csv, argumentos "
+                "no válidos: 'int' object is not iterable"
+            ],
+            context.exception.messages,
+        )
+
+        rules["formatRules"].pop(0)
+        plan = compile_plan(config)
+        self.assertEqual(
+            ["complete_year_file_consistency"],
+            [rule_spec.function for rule_spec in plan.get_node_plan((0,)).rule_specs],
+        )
+
+    def test_configuration_errors_stop_before_reading_files(self):
+        data = DataValidator(
+            ConfigFromFile(os.path.join(self.configuration_path, "configuration_wrong_name.json")),
+            data_path=os.path.join(self.input_path, "check_name_data"),
+            date="20200627",
+        )
+        with patch.object(DataValidator, "validate_node_rules") as validate_node_rules:
+            with self.assertRaises(SystemExit):
+                data.start_iteration_over_configuration_tree()
+        validate_node_rules.assert_not_called()
+
+    def test_load_plan(self):
+        configuration = self.read_configuration("configuration_paraderos.json")
+        with tempfile.TemporaryDirectory() as cache_path:
+            plan = load_plan(configuration, cache_path)
+            with patch("input_validator.plan.compile_plan") as compile_plan_mock:
+                cached_plan = load_plan(configuration, cache_path)
+            compile_plan_mock.assert_not_called()
+
+        # a cached plan is a configuration object with its rule specs
+        self.assertEqual(plan.config, cached_plan.config)
+        self.assertEqual(plan.nodes, cached_plan.nodes)
+        self.assertIs(cached_plan.nodes[2], cached_plan.get_node_plan((0, 0)))
+
+        reports = []
+        for config_obj in [
+            ConfigFromFile(os.path.join(self.configuration_path, "configuration_paraderos.json")),
+            cached_plan,
+        ]:
+            data = DataValidator(
+                config_obj,
+                data_path=os.path.join(self.input_path, "check_paraderos"),
+                date="20200627",
+            )
+            data.start_iteration_over_configuration_tree()
+            reports.append((data.report, data.report_errors))
+        self.assertEqual(reports[0], reports[1])
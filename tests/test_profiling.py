@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+from collections import Counter
+from unittest import TestCase
+
+from input_validator.configuration import ConfigFromFile
+from input_validator.data_validator import DataValidator
+from input_validator.profiling import Profiler, get_rule_name
+from input_validator.validators import NotEmptyValueValidator
+
+
+class ProfilerTest(TestCase):
+    def setUp(self):
+        path = os.path.dirname(os.path.realpath(__file__))
+        self.input_path = os.path.join(path, "input")
+        self.configuration_path = os.path.join(self.input_path, "configuration_files")
+
+    def create_data_validator(self, fixture="diccionario_detalle_servicio", **kwargs):
+        config_obj = ConfigFromFile(
+            os.path.join(self.configuration_path, f"configuration_{fixture}.json")
+        )
+        return DataValidator(
+            config_obj,
+            data_path=os.path.join(self.input_path, f"check_{fixture}"),
+            date="20200627",
+            **kwargs
+        )
+
+    def get_counters(self, profiler):
+        return sorted(
+            (stats["file"], stats["rule"], stats["calls"], stats["failures"])
+            for stats in profiler.to_dict()["validators"]
+        )
+
+    def test_profile(self):
+        data = self.create_data_validator()
+        data.start_iteration_over_configuration_tree()
+
+        profiler = Profiler()
+        profiled_data = self.create_data_validator(profiler=profiler)
+        profiled_data.start_iteration_over_configuration_tree()
+        self.assertEqual(data.report_errors, profiled_data.report_errors)
+
+        file_name = "Diccionario-DetalleServicioZP_20200627_20200731.csv"
+        files = {stats["file"]: stats for stats in profiler.to_dict()["files"]}
+        self.assertEqual(248, files[file_name]["rows"])
+        self.assertGreater(files[file_name]["seconds"], files[file_name]["read_seconds"])
+
+        # failures of the row validators are the reported errors
+        errors = Counter(
+            name for name, errors in data.report_errors.items() for _ in errors
+        )
+        counters = self.get_counters(profiler)
+        self.assertEqual(
+            errors[file_name],
+            sum(failures for name, _, _, failures in counters if name == file_name),
+        )
+        self.assertIn(
+            (file_name, "CheckColStorageMultiValueValidator(Servicios)", 247, 247),
+            counters,
+        )
+
+        # same counters with the chunked engine and with workers
+        for kwargs in [{"engine": "chunked"}, {"jobs": 2}]:
+            other_profiler = Profiler()
+            self.create_data_validator(
+                profiler=other_profiler, **kwargs
+            ).start_iteration_over_configuration_tree()
+            self.assertEqual(counters, self.get_counters(other_profiler))
+
+    def test_profile_multiple_files(self):
+        profiler = Profiler()
+        self.create_data_validator(
+            "frecuencias", profiler=profiler
+        ).start_iteration_over_configuration_tree()
+        files = [stats["file"] for stats in profiler.to_dict()["files"]]
+        self.assertEqual(
+            [
+                "Capacidades_PO20200627.csv, Distancias_PO20200627.csv, "
+                "Frecuencias_PO20200627.csv, Velocidades_PO20200627.csv",
+                "Capacidades_PO20200627.csv",
+                "Distancias_PO20200627.csv",
+                "Frecuencias_PO20200627.csv",
+                "Velocidades_PO20200627.csv",
+            ],
+            [files[0]] + sorted(files[1:]),
+        )
+
+    def test_file_times_only(self):
+        profiler = Profiler(validators=False)
+        self.create_data_validator(profiler=profiler).start_iteration_over_configuration_tree()
+        profile = profiler.to_dict()
+        self.assertEqual([], profile["validators"])
+        self.assertTrue(all(stats["rows"] == 0 for stats in profile["files"]))
+        self.assertTrue(all(stats["seconds"] > 0 for stats in profile["files"]))
+
+    def test_rule_name_and_output(self):
+        header = ["ID", "NOMBRE", "X", "Y", "Z"]
+        validator = NotEmptyValueValidator(
+            {"header": header, "col_indexes": [0, 1, 2, 3, 4], "conditions_to_ignore_row": []}
+        )
+        self.assertEqual("NotEmptyValueValidator(ID,NOMBRE,X,+2)", get_rule_name(validator))
+
+        profiler = Profiler()
+        apply = profiler.wrap_apply("Archivo.csv", validator, validator.apply)
+        apply(["1", "a", "2", "3", "4"])
+        apply(["", "a", "2", "3", "4"])
+        self.assertIn("Archivo.csv", profiler.format_table())
+        with tempfile.TemporaryDirectory() as temporal_dir:
+            file_path = os.path.join(temporal_dir, "perfil.json")
+            profiler.write_json(file_path)
+            with open(file_path, encoding="utf-8") as file:
+                profile = json.load(file)
+        self.assertEqual(
+            [2, 1],
+            [profile["validators"][0]["calls"], profile["validators"][0]["failures"]],
+        )
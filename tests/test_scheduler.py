@@ -0,0 +1,233 @@
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import Future
+from unittest import TestCase
+from unittest.mock import patch
+
+from input_validator.configuration import ConfigFromFile, ConfigFromString
+from input_validator.data_validator import DataValidator
+from input_validator.plan import compile_plan
+from input_validator.scheduler import NodeScheduler, get_node_predecessors, get_storage_names
+
+
+class SchedulerTest(TestCase):
+    def setUp(self):
+        path = os.path.dirname(os.path.realpath(__file__))
+        self.input_path = os.path.join(path, "input")
+        self.configuration_path = os.path.join(self.input_path, "configuration_files")
+
+    def test_get_storage_names(self):
+        rules = {
+            "formatRules": [
+                {"function": "not_empty_row", "args": {}},
+            ],
+            "semanticRules": [
+                {"function": "store_col_value", "args": {"col_index": 0, "storage_name": "SERVICIOS"}},
+                {"function": "check_col_storage_value", "args": {"col_index": 1, "storage_name": "COMUNAS"}},
+            ],
+        }
+        self.assertEqual(({"SERVICIOS"}, {"COMUNAS"}), get_storage_names(rules))
+        self.assertEqual((set(), set()), get_storage_names({}))
+
+    def test_get_node_predecessors(self):
+        with open(
+            os.path.join(self.configuration_path, "configuration_evasion_servicio.json"),
+            encoding="utf-8-SIG",
+        ) as file:
+            plan = compile_plan(json.load(file))
+        predecessors = get_node_predecessors(plan.nodes)
+        self.assertEqual(((0, 0), (0, 1), (1, 0)), predecessors[(2, 0)])
+        self.assertEqual((), predecessors[(1, 0)])
+
+        # a dependency that matches no previous node name waits for every previous node
+        config = {
+            "path": {"type": "root", "name": ""},
+            "rules": {},
+            "children": [
+                {"path": {"type": "name", "name": "a.csv"}, "rules": {}},
+                {"path": {"type": "name", "name": "b.csv", "dependencies": ["z*.csv"]}, "rules": {}},
+            ],
+        }
+        self.assertEqual(((), (0,)), get_node_predecessors(compile_plan(config).nodes)[(1,)])
+
+    def test_nodes_do_not_wait_for_previous_nodes(self):
+        rules = {
+            "semanticRules": [
+                {"function": "store_col_value", "args": {"col_index": 0, "storage_name": "IDS"}},
+            ],
+        }
+        config = {
+            "path": {"type": "root", "name": ""},
+            "rules": {},
+            "children": [
+                {"path": {"type": "name", "name": "a.csv"}, "rules": rules},
+                {"path": {"type": "name", "name": "b.csv", "dependencies": ["a.csv"]}, "rules": {}},
+                {"path": {"type": "name", "name": "c.csv"}, "rules": {}},
+            ],
+        }
+        data = DataValidator(ConfigFromString("{}"), data_path="", date="20200627")
+        scheduler = NodeScheduler(data, 2, compile_plan(config).nodes)
+        future = Future()
+        visited = []
+
+        def validate_a():
+            scheduler.add_errors("a.csv", scheduler.submit(None, rules))
+            visited.append("a.csv")
+
+        def validate_c():
+            visited.append("c.csv")
+            scheduler.add_errors("c.csv", [{"name": "c"}])
+            future.set_result(
+                {
+                    "errors": [{"name": "a"}],
+                    "summaries": None,
+                    "profiler": None,
+                    "files_checked": {"a.csv"},
+                    "storage": {"IDS": ["1"]},
+                }
+            )
+
+        def validate_root():
+            scheduler.add_node((0,), validate_a)
+            scheduler.add_node((1,), visited.append, "b.csv")
+            scheduler.add_node((2,), validate_c)
+
+        scheduler.add_node((), validate_root)
+        try:
+            with patch.object(scheduler.executor, "submit", return_value=future):
+                scheduler.join()
+        finally:
+            scheduler.close()
+        # b.csv waits for the task of a.csv, c.csv does not
+        self.assertEqual(["a.csv", "c.csv", "b.csv"], visited)
+        self.assertEqual(["a.csv", "c.csv"], list(data.report_errors))
+        self.assertEqual({"IDS": ["1"]}, data.storage)
+        self.assertEqual({"a.csv"}, data.files_checked)
+
+    def test_parallel_run_gives_same_report(self):
+        cases = [
+            ("configuration_diccionario_servicios_wrong.json", "check_diccionario_servicios"),
+            ("configuration_diccionario_estaciones_metro_wrong.json", "check_diccionario_estaciones_metro"),
+            ("configuration_diccionario_detalle_servicio.json", "check_diccionario_detalle_servicio"),
+            ("configuration_evasion_servicio.json", "check_evasion"),
+            ("configuration_frecuencias.json", "check_frecuencias"),
+        ]
+        for configuration_name, data_name in cases:
+            results = []
+            for jobs in [1, 3]:
+                config_obj = ConfigFromFile(os.path.join(self.configuration_path, configuration_name))
+                data = DataValidator(
+                    config_obj,
+                    data_path=os.path.join(self.input_path, data_name),
+                    date="20200627",
+                    jobs=jobs,
+                )
+                data.start_iteration_over_configuration_tree()
+                results.append(
+                    (
+                        data.report,
+                        list(data.report_errors.items()),
+                        data.files_checked,
+                        data.storage,
+                    )
+                )
+            with self.subTest(configuration_name=configuration_name):
+                self.assertEqual(results[0], results[1])
+
+    def test_parallel_run_wrong_fun_args(self):
+        config_obj = ConfigFromFile(
+            os.path.join(self.configuration_path, "configuration_wrong_fun_args.json"))
+        data = DataValidator(
+            config_obj,
+            data_path=os.path.join(self.input_path, "check_fun_name"),
+            logger=logging.getLogger(__name__),
+            date="20200627",
+            jobs=2,
+        )
+        with self.assertRaises(SystemExit):
+            data.start_iteration_over_configuration_tree()
+
+    def test_split_files_give_same_report(self):
+        header = ["ID", "NOMBRE", "VALOR"]
+        rules = {
+            "formatRules": [
+                {"function": "not_empty_col", "args": {"col_indexes": [0, 1], "conditions_to_ignore_row": []}},
+                {"function": "duplicate", "args": {"col_index": 0}},
+                {"function": "numeric_range", "args": {"col_indexes": [2], "lower_bound": 0, "upper_bound": 10}},
+                {"function": "min_rows", "args": {"min": 1000}},
+            ],
+            "semanticRules": [
+                {"function": "store_col_value", "args": {"col_index": 0, "storage_name": "IDS"}},
+                {"function": "check_col_storage_value", "args": {"col_index": 1, "storage_name": "IDS"}},
+            ],
+        }
+        configuration = json.dumps(
+            {
+                "path": {"type": "root", "name": ""},
+                "rules": {},
+                "children": [
+                    {"path": {"type": "name", "name": "datos.csv", "header": header}, "rules": rules},
+                    # storage checks of a file that only reads storage are split
+                    {
+                        "path": {"type": "name", "name": "otros.csv", "header": ["ID"]},
+                        "rules": {
+                            "formatRules": [{"function": "min_rows", "args": {"min": 300}}],
+                            "semanticRules": [
+                                {"function": "check_col_storage_value", "args": {"col_index": 0, "storage_name": "IDS"}},
+                            ],
+                        },
+                    },
+                ],
+            }
+        )
+        lines = []
+        for number in range(600):
+            if number % 97 == 0:
+                lines.append("")
+            elif number % 89 == 0:
+                lines.append(str(number))
+            elif number % 83 == 0:
+                lines.append('{0};"{1}\n{1}";5'.format(number, number - 1))
+            else:
+                lines.append("{0};{1};{2}".format(number - number % 71 // 70, number - 1, number % 13))
+
+        with tempfile.TemporaryDirectory() as data_path:
+            with open(os.path.join(data_path, "datos.csv"), "w", encoding="utf-8") as file:
+                file.write("\n".join([";".join(header)] + lines) + "\n")
+            with open(os.path.join(data_path, "otros.csv"), "w", encoding="utf-8") as file:
+                file.write("ID\n" + "".join("{0}\n".format(number * 7) for number in range(200)))
+            for engine in ["row", "chunked"]:
+                results = []
+                for jobs, split_size in [(1, None), (3, 1)]:
+                    data = DataValidator(
+                        ConfigFromString(configuration),
+                        data_path=data_path,
+                        date="20200627",
+                        engine=engine,
+                        chunk_size=50,
+                        jobs=jobs,
+                        split_size=split_size,
+                    )
+                    with patch.object(
+                        DataValidator,
+                        "check_rules_by_ranges",
+                        autospec=True,
+                        side_effect=DataValidator.check_rules_by_ranges,
+                    ) as check_rules_by_ranges:
+                        data.start_iteration_over_configuration_tree()
+                    self.assertEqual(bool(split_size), check_rules_by_ranges.called)
+                    results.append((list(data.report_errors.items()), data.files_checked, data.storage))
+                with self.subTest(engine=engine):
+                    self.assertEqual(results[0], results[1])
+                    self.assertEqual(
+                        {"Fila vacía", "Fila inválida", "Valor duplicado", "Valores fuera de rango",
+                         "El valor no es válido", "Número de filas menor al correcto"},
+                        {error["name"] for error in results[1][0][0][1]},
+                    )
+                    self.assertEqual("otros.csv", results[1][0][1][0])
+                    self.assertEqual(
+                        {"El valor no es válido", "Número de filas menor al correcto"},
+                        {error["name"] for error in results[1][0][1][1]},
+                    )
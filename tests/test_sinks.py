@@ -0,0 +1,440 @@
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+from collections import Counter
+from unittest import TestCase
+from unittest.mock import patch
+
+from input_validator.configuration import ConfigFromFile
+from input_validator.data_validator import DataValidator
+from input_validator.errors import ErrorRecord
+from input_validator.sinks import (
+    CappedErrorSink,
+    CsvErrorSink,
+    JsonLinesErrorSink,
+    MemoryErrorSink,
+    ParquetErrorSink,
+    RunLengthErrorSink,
+    SqliteErrorSink,
+    StreamingReport,
+    get_row_range,
+)
+from input_validator.utils import write_errors_to_csv
+from input_validator.validators import DuplicateValueValidator, NotEmptyValueValidator
+
+ERROR = {
+    "name": "Valor vacío",
+    "type": "formato",
+    "message": "Existe un valor vacío en la fila 2, columna ID.",
+    "row": 2,
+    "cols": ["ID"],
+}
+
+
+class ErrorSinkTest(TestCase):
+    def setUp(self):
+        path = os.path.dirname(os.path.realpath(__file__))
+        self.input_path = os.path.join(path, "input")
+        self.configuration_path = os.path.join(self.input_path, "configuration_files")
+        self.temporal_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporal_dir.cleanup)
+
+    def create_data_validator(self, **kwargs):
+        config_obj = ConfigFromFile(
+            os.path.join(self.configuration_path, "configuration_diccionario_detalle_servicio.json"))
+        return DataValidator(
+            config_obj,
+            data_path=os.path.join(self.input_path, "check_diccionario_detalle_servicio"),
+            date="20200627",
+            **kwargs
+        )
+
+    def test_memory_sink(self):
+        data = self.create_data_validator()
+        data.start_iteration_over_configuration_tree()
+
+        for jobs in [1, 2]:
+            error_sink = MemoryErrorSink()
+            sink_data = self.create_data_validator(error_sink=error_sink, jobs=jobs)
+            sink_data.start_iteration_over_configuration_tree()
+            self.assertEqual({}, sink_data.report_errors)
+            self.assertEqual(data.report_errors, error_sink.report_errors)
+            self.assertEqual(list(data.iter_errors()), error_sink.errors)
+
+    def test_csv_sink(self):
+        data = self.create_data_validator()
+        data.start_iteration_over_configuration_tree()
+        expected_path = os.path.join(self.temporal_dir.name, "expected.csv")
+        write_errors_to_csv(expected_path, data)
+
+        file_path = os.path.join(self.temporal_dir.name, "errores.csv")
+        with CsvErrorSink(file_path, buffer_size=7) as error_sink:
+            self.create_data_validator(error_sink=error_sink).start_iteration_over_configuration_tree()
+        with open(expected_path, encoding="utf-8-SIG") as expected_file, open(
+                file_path, encoding="utf-8-SIG"
+        ) as file:
+            self.assertEqual(expected_file.read(), file.read())
+
+    def test_buffered_sink_flushes(self):
+        file_path = os.path.join(self.temporal_dir.name, "errores.csv")
+        error_sink = CsvErrorSink(file_path, buffer_size=2)
+        error_sink.write("Diccionario.csv", ERROR)
+        with open(file_path, encoding="utf-8-SIG") as file:
+            self.assertEqual(1, len(list(csv.reader(file))))
+        error_sink.write("Diccionario.csv", ERROR)
+        # a full buffer is on disk before the sink is closed
+        with open(file_path, encoding="utf-8-SIG") as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(3, len(rows))
+        self.assertEqual(
+            ["Diccionario.csv", "Valor vacío", "formato", "2", "ID", ERROR["message"]], rows[1]
+        )
+        error_sink.close()
+
+    def test_json_lines_sink(self):
+        file_path = os.path.join(self.temporal_dir.name, "errores.jsonl")
+        with JsonLinesErrorSink(file_path) as error_sink:
+            report = StreamingReport(error_sink, "Diccionario.csv")
+            report.append(ERROR)
+            report.extend([ERROR])
+            self.assertEqual([], report)
+        with open(file_path, encoding="utf-8") as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual([{"file": "Diccionario.csv", **ERROR}] * 2, lines)
+
+
+class CappedErrorSinkTest(TestCase):
+    setUp = ErrorSinkTest.setUp
+    create_data_validator = ErrorSinkTest.create_data_validator
+
+    def test_caps(self):
+        data = self.create_data_validator()
+        data.start_iteration_over_configuration_tree()
+        errors = list(data.iter_errors())
+        rule_errors = Counter((name, error["name"]) for name, error in errors)
+
+        for jobs in [1, 2]:
+            error_sink = MemoryErrorSink()
+            with CappedErrorSink(error_sink, max_file_errors=3, max_rule_errors=2) as capped_sink:
+                self.create_data_validator(
+                    error_sink=capped_sink, jobs=jobs
+                ).start_iteration_over_configuration_tree()
+
+            # the first errors of every rule are kept
+            capped_rules = Counter()
+            expected_errors = []
+            for name, error in errors:
+                if capped_rules[(name, error["name"])] < 2:
+                    capped_rules[(name, error["name"])] += 1
+                    expected_errors.append((name, error))
+            self.assertEqual(expected_errors, error_sink.errors)
+
+            summaries = {
+                (summary["file"], summary["name"]): summary
+                for summary in error_sink.summaries
+            }
+            self.assertEqual(len(rule_errors), len(error_sink.summaries))
+            for key, count in rule_errors.items():
+                summary = summaries[key]
+                self.assertEqual(count, summary["errors"])
+                self.assertEqual(count - min(count, 2), summary["suppressed"])
+                rows = [
+                    error["row"]
+                    for name, error in errors
+                    if (name, error["name"]) == key and error["row"] != ""
+                ]
+                self.assertEqual(rows[0] if rows else "", summary["first_row"])
+                self.assertEqual(rows[-1] if rows else "", summary["last_row"])
+
+    def test_column_cap(self):
+        header = ["ID", "NOMBRE"]
+        validator = NotEmptyValueValidator(
+            {"header": header, "col_indexes": [0, 1], "conditions_to_ignore_row": []}
+        )
+        rows = [["", "a"], ["", "b"], ["1", ""], ["", "c"], ["2", ""]]
+        error_sink = MemoryErrorSink()
+        capped_sink = CappedErrorSink(error_sink, max_column_errors=1)
+        with patch.object(
+            NotEmptyValueValidator,
+            "get_error",
+            autospec=True,
+            side_effect=NotEmptyValueValidator.get_error,
+        ) as get_error:
+            for row in rows:
+                if not validator.apply(row):
+                    capped_sink.write("Archivo.csv", ErrorRecord(validator))
+            # errors over the cap are not rendered
+            self.assertEqual(0, get_error.call_count)
+            capped_sink.close()
+        self.assertEqual([2, 4], [error["row"] for _, error in error_sink.errors])
+        self.assertEqual(
+            [
+                {
+                    "file": "Archivo.csv",
+                    "name": error_sink.errors[0][1]["name"],
+                    "type": "formato",
+                    "cols": ["ID", "NOMBRE"],
+                    "errors": 5,
+                    "suppressed": 3,
+                    "first_row": 2,
+                    "last_row": 6,
+                }
+            ],
+            error_sink.summaries,
+        )
+
+    def test_summary_columns(self):
+        header = ["ID", "NOMBRE"]
+        validators = [
+            DuplicateValueValidator({"header": header, "col_index": index})
+            for index in [0, 1]
+        ]
+        rows = [["1", "a"], ["1", "b"], ["2", "b"]]
+        error_sink = MemoryErrorSink()
+        with CappedErrorSink(error_sink, max_rule_errors=1) as capped_sink:
+            for row in rows:
+                for validator in validators:
+                    if not validator.apply(row):
+                        capped_sink.write("Archivo.csv", ErrorRecord(validator))
+        # rules with the same name are told apart by their columns
+        self.assertEqual(
+            [("Valor duplicado", ["ID"]), ("Valor duplicado", ["NOMBRE"])],
+            [(summary["name"], summary["cols"]) for summary in error_sink.summaries],
+        )
+
+    def test_csv_summary(self):
+        file_path = os.path.join(self.temporal_dir.name, "errores.csv")
+        with CappedErrorSink(CsvErrorSink(file_path), max_file_errors=1) as capped_sink:
+            capped_sink.write("Diccionario.csv", ERROR)
+            capped_sink.write("Diccionario.csv", dict(ERROR, row=5))
+        with open(file_path, encoding="utf-8-SIG") as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(5, len(rows))
+        self.assertEqual([], rows[2])
+        self.assertEqual(
+            ["Diccionario.csv", "Valor vacío", "formato", "ID", "2", "1", "2", "5"],
+            rows[4],
+        )
+
+
+def get_empty_error(row, col="ID"):
+    return {
+        "name": "Valor vacío",
+        "type": "formato",
+        "message": "Existe un valor vacío en la fila {0}, columna {1}.".format(row, col),
+        "row": row,
+        "cols": [col],
+    }
+
+
+class RunLengthErrorSinkTest(TestCase):
+    def write(self, errors, **kwargs):
+        error_sink = MemoryErrorSink()
+        with RunLengthErrorSink(error_sink, **kwargs) as run_length_sink:
+            for name, error in errors:
+                run_length_sink.write(name, error)
+        return error_sink.errors
+
+    def test_merge_consecutive_rows(self):
+        errors = [("Archivo.csv", get_empty_error(row)) for row in range(2, 9)]
+        errors.append(("Archivo.csv", get_empty_error(10)))
+        merged_error = dict(
+            get_empty_error(2),
+            row="2-8",
+            message="Existe un valor vacío en las filas 2-8, columna ID.",
+        )
+        self.assertEqual(
+            [("Archivo.csv", merged_error), ("Archivo.csv", get_empty_error(10))],
+            self.write(errors),
+        )
+
+    def test_interleaved_rules(self):
+        # every rule gives a range when a block of rows fails all of them
+        errors = []
+        for row in range(2, 6):
+            errors.append(("Archivo.csv", get_empty_error(row, "ID")))
+            errors.append(("Archivo.csv", get_empty_error(row, "NOMBRE")))
+        errors.append(("Archivo.csv", get_empty_error(6, "NOMBRE")))
+        errors.append(("Otro.csv", get_empty_error(7, "NOMBRE")))
+        self.assertEqual(
+            [
+                ("Archivo.csv", "2-5", ["ID"]),
+                ("Archivo.csv", "2-6", ["NOMBRE"]),
+                ("Otro.csv", 7, ["NOMBRE"]),
+            ],
+            [(name, error["row"], error["cols"]) for name, error in self.write(errors)],
+        )
+
+    def test_different_messages_are_kept(self):
+        errors = [
+            ("Archivo.csv", dict(ERROR, row=row, message="'{0}' en la fila {1}.".format(row, row)))
+            for row in [2, 3]
+        ]
+        errors.append(("Archivo.csv", dict(ERROR, row="", message="Error de archivo.")))
+        self.assertEqual(errors, self.write(errors))
+
+    def test_max_pending(self):
+        # an open run is written when too many runs wait for it
+        error_sink = MemoryErrorSink()
+        run_length_sink = RunLengthErrorSink(error_sink, max_pending=2)
+        for row in range(2, 8):
+            run_length_sink.write("Archivo.csv", get_empty_error(row, "ID"))
+            if row % 2 == 0:
+                run_length_sink.write("Archivo.csv", get_empty_error(row, "NOMBRE"))
+            self.assertLessEqual(len(run_length_sink.pending), 2)
+        run_length_sink.close()
+        self.assertEqual(
+            [("2-4", "ID"), (2, "NOMBRE"), (4, "NOMBRE"), ("5-7", "ID"), (6, "NOMBRE")],
+            [(error["row"], error["cols"][0]) for _, error in error_sink.errors],
+        )
+
+    def test_records(self):
+        header = ["ID", "NOMBRE"]
+        validator = NotEmptyValueValidator(
+            {"header": header, "col_indexes": [0, 1], "conditions_to_ignore_row": []}
+        )
+        errors = []
+        for row in [["", "a"], ["", "b"], ["", "c"], ["1", ""]]:
+            if not validator.apply(row):
+                errors.append(("Archivo.csv", ErrorRecord(validator)))
+        self.assertEqual(
+            [("2-4", "ID"), (5, "NOMBRE")],
+            [(error["row"], error["cols"][0]) for _, error in self.write(errors)],
+        )
+
+
+class ReportErrorSinkTest(TestCase):
+    setUp = ErrorSinkTest.setUp
+    create_data_validator = ErrorSinkTest.create_data_validator
+
+    def test_row_range(self):
+        self.assertEqual((None, None), get_row_range(""))
+        self.assertEqual((5, 5), get_row_range(5))
+        self.assertEqual((1200, 9800), get_row_range("1200-9800"))
+
+    def test_sqlite_sink(self):
+        data = self.create_data_validator()
+        data.start_iteration_over_configuration_tree()
+        errors = list(data.iter_errors())
+
+        file_path = os.path.join(self.temporal_dir.name, "errores.sqlite")
+        for report_name in ["20200627", "20200628", "20200627"]:
+            error_sink = CappedErrorSink(
+                SqliteErrorSink(file_path, report_name=report_name, buffer_size=100)
+            )
+            with error_sink:
+                self.create_data_validator(error_sink=error_sink).start_iteration_over_configuration_tree()
+
+        connection = sqlite3.connect(file_path)
+        self.addCleanup(connection.close)
+        # a report written again replaces its rows
+        self.assertEqual(
+            [("20200627", len(errors)), ("20200628", len(errors))],
+            connection.execute(
+                "SELECT report, COUNT(*) FROM errors GROUP BY report ORDER BY report"
+            ).fetchall(),
+        )
+        rows = connection.execute(
+            "SELECT file, rule, first_row, message FROM errors WHERE report = ? ORDER BY rowid",
+            ("20200628",),
+        ).fetchall()
+        self.assertEqual(
+            [
+                (name, error["name"], error["row"] or None, error["message"])
+                for name, error in errors
+            ],
+            rows,
+        )
+        name, error = errors[-1]
+        self.assertEqual(
+            [(Counter(errors_name for errors_name, _ in errors)[name], 0)],
+            connection.execute(
+                "SELECT errors, suppressed FROM summary WHERE report = ? AND file = ? AND rule = ?",
+                ("20200628", name, error["name"]),
+            ).fetchall(),
+        )
+
+    def test_sqlite_sink_capped_summary(self):
+        file_path = os.path.join(self.temporal_dir.name, "errores.sqlite")
+        with CappedErrorSink(SqliteErrorSink(file_path), max_rule_errors=1) as error_sink:
+            error_sink.write("Diccionario.csv", get_empty_error(2))
+            error_sink.write("Diccionario.csv", dict(get_empty_error(5), row="5-7"))
+        connection = sqlite3.connect(file_path)
+        self.addCleanup(connection.close)
+        self.assertEqual(
+            [("errores", "Diccionario.csv", "Valor vacío", 2, 2, "ID")],
+            connection.execute(
+                "SELECT report, file, rule, first_row, last_row, cols FROM errors"
+            ).fetchall(),
+        )
+        self.assertEqual(
+            [(4, 3, 2, 7)],
+            connection.execute(
+                "SELECT errors, suppressed, first_row, last_row FROM summary"
+            ).fetchall(),
+        )
+
+    def test_sqlite_summary_without_caps(self):
+        # two rules with the same name are summarized apart with or without caps
+        config_obj = ConfigFromFile(
+            os.path.join(self.configuration_path, "configuration_diccionario_comunas_wrong.json")
+        )
+        file_path = os.path.join(self.temporal_dir.name, "errores.sqlite")
+        for report_name, jobs, max_rule_errors in [
+            ("sin_limite", 1, None),
+            ("sin_limite_jobs", 2, None),
+            ("con_limite", 1, 1),
+        ]:
+            error_sink = CappedErrorSink(
+                RunLengthErrorSink(SqliteErrorSink(file_path, report_name=report_name)),
+                max_rule_errors=max_rule_errors,
+            )
+            with error_sink:
+                DataValidator(
+                    config_obj,
+                    data_path=os.path.join(self.input_path, "check_diccionario_comunas"),
+                    date="20200627",
+                    error_sink=error_sink,
+                    jobs=jobs,
+                ).start_iteration_over_configuration_tree()
+
+        connection = sqlite3.connect(file_path)
+        self.addCleanup(connection.close)
+        summaries = [
+            connection.execute(
+                "SELECT file, rule, cols, errors, first_row, last_row FROM summary"
+                " WHERE report = ? ORDER BY rowid",
+                (report_name,),
+            ).fetchall()
+            for report_name in ["sin_limite", "sin_limite_jobs", "con_limite"]
+        ]
+        rules = [(rule, cols) for _, rule, cols, *_ in summaries[0]]
+        self.assertEqual(len(set(rules)), len(rules))
+        self.assertGreater(len(rules), len({rule for rule, _ in rules}))
+        self.assertEqual(summaries[0], summaries[1])
+        self.assertEqual(summaries[0], summaries[2])
+
+    def test_parquet_sink(self):
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            with self.assertRaises(ImportError):
+                ParquetErrorSink(os.path.join(self.temporal_dir.name, "errores.parquet"))
+            return
+        file_path = os.path.join(self.temporal_dir.name, "errores.parquet")
+        with CappedErrorSink(ParquetErrorSink(file_path, buffer_size=1)) as error_sink:
+            error_sink.write("Diccionario.csv", get_empty_error(2))
+            error_sink.write("Diccionario.csv", dict(get_empty_error(3), row="3-4"))
+        self.assertEqual(
+            [[2, 3], [2, 4]],
+            [
+                pyarrow.parquet.read_table(file_path).column(column).to_pylist()
+                for column in ["first_row", "last_row"]
+            ],
+        )
+        summary = pyarrow.parquet.read_table(
+            os.path.join(self.temporal_dir.name, "errores_resumen.parquet")
+        )
+        self.assertEqual([2], summary.column("errors").to_pylist())
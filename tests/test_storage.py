@@ -0,0 +1,111 @@
+import math
+import os
+import pickle
+import random
+import tempfile
+from unittest import TestCase
+
+from input_validator.storage import (
+    PointIndex,
+    StorageList,
+    load_storage_snapshot,
+    save_storage_snapshot,
+)
+
+
+class StorageListTest(TestCase):
+    def test_membership(self):
+        storage = StorageList(["NUNOA", "SANTIAGO"])
+        self.assertEqual(["NUNOA", "SANTIAGO"], storage)
+        self.assertIn("NUNOA", storage)
+        self.assertNotIn("MAIPU", storage)
+
+    def test_index_is_kept_in_sync(self):
+        storage = StorageList(["NUNOA"])
+        self.assertNotIn("MAIPU", storage)
+
+        storage.append("MAIPU")
+        storage.extend(["PUENTE ALTO", "LA FLORIDA"])
+        storage += ["PENALOLEN"]
+        storage.insert(0, "RECOLETA")
+        for value in ["MAIPU", "PUENTE ALTO", "LA FLORIDA", "PENALOLEN", "RECOLETA"]:
+            self.assertIn(value, storage)
+
+        storage.remove("MAIPU")
+        self.assertNotIn("MAIPU", storage)
+        storage[0] = "INDEPENDENCIA"
+        self.assertNotIn("RECOLETA", storage)
+        self.assertIn("INDEPENDENCIA", storage)
+        storage.pop()
+        self.assertNotIn("PENALOLEN", storage)
+        storage.clear()
+        self.assertNotIn("NUNOA", storage)
+
+    def test_unhashable_values(self):
+        storage = StorageList([["338029", "6306246"]])
+        self.assertIn(["338029", "6306246"], storage)
+        storage.append(["338030", "6306247"])
+        self.assertIn(["338030", "6306247"], storage)
+        self.assertNotIn("338029", storage)
+
+    def test_pickle(self):
+        storage = StorageList(["NUNOA", "SANTIAGO"])
+        self.assertIn("NUNOA", storage)
+        storage = pickle.loads(pickle.dumps(storage))
+        self.assertIsInstance(storage, StorageList)
+        self.assertEqual(["NUNOA", "SANTIAGO"], storage)
+        storage.append("MAIPU")
+        self.assertIn("MAIPU", storage)
+
+
+class StorageSnapshotTest(TestCase):
+    def test_save_and_load(self):
+        storage = {
+            "comunas": StorageList(["NUNOA", "SANTIAGO"]),
+            "zone": {"Z1": StorageList([["1.0", "2.0"], ["3.0", "4.0"]])},
+        }
+        with tempfile.TemporaryDirectory() as temporal_dir:
+            file_path = os.path.join(temporal_dir, "storage.pickle")
+            save_storage_snapshot(storage, file_path, "20200627")
+            snapshot = load_storage_snapshot(file_path)
+
+            with open(file_path, "wb") as file:
+                file.write(b"broken")
+            with self.assertRaises(ValueError):
+                load_storage_snapshot(file_path)
+
+        self.assertEqual("20200627", snapshot["date"])
+        self.assertEqual(storage, snapshot["storage"])
+        # the index is loaded with the values and kept in sync
+        comunas = snapshot["storage"]["comunas"]
+        self.assertEqual({"NUNOA", "SANTIAGO"}, comunas._index)
+        comunas.append("MAIPU")
+        self.assertIn("MAIPU", comunas)
+        self.assertIsNone(snapshot["storage"]["zone"]["Z1"]._index)
+
+
+class PointIndexTest(TestCase):
+    def test_has_close_matches_linear_scan(self):
+        generator = random.Random(0)
+        points = [
+            (generator.uniform(0, 20), generator.uniform(0, 20)) for _ in range(500)
+        ]
+        point_index = PointIndex(0.1)
+        for x, y in points:
+            point_index.add(x, y)
+        self.assertEqual(500, len(point_index))
+
+        for _ in range(2000):
+            x, y = generator.uniform(-1, 21), generator.uniform(-1, 21)
+            expected = any(
+                math.isclose(px, x, abs_tol=0.1) and math.isclose(py, y, abs_tol=0.1)
+                for px, py in points
+            )
+            self.assertEqual(expected, point_index.has_close(x, y))
+
+    def test_tolerance_border(self):
+        point_index = PointIndex(0.1)
+        point_index.add(-33.4, -70.6)
+        self.assertTrue(point_index.has_close(-33.35, -70.65))
+        self.assertFalse(point_index.has_close(-33.29, -70.6))
+        self.assertFalse(point_index.has_close(float("nan"), -70.6))
@@ -0,0 +1,58 @@
+import datetime
+import random
+from unittest import TestCase
+
+from input_validator.temporal import (
+    parse_date,
+    parse_date_batch,
+    parse_time,
+    parse_time_batch,
+)
+
+
+def strptime(value, date_format):
+    try:
+        return datetime.datetime.strptime(value, date_format)
+    except ValueError:
+        return None
+
+
+class TemporalTest(TestCase):
+    def test_parse_time(self):
+        self.assertEqual(datetime.datetime(1900, 1, 1, 23, 59, 59), parse_time("23:59:59"))
+        self.assertEqual(datetime.datetime(1900, 1, 1, 5, 3, 0), parse_time("5:3:0"))
+        for value in ["24:00:00", "12:60:00", "12:00:60", "12:00", "12:00:00 ", "", "١٢:00:00x"]:
+            with self.assertRaises(ValueError):
+                parse_time(value)
+
+    def test_parse_date(self):
+        self.assertEqual(datetime.datetime(2020, 2, 29), parse_date("2020-02-29"))
+        self.assertEqual(datetime.datetime(2020, 2, 3), parse_date("2020-2-3"))
+        for value in ["2021-02-29", "2020-13-01", "2020-00-10", "0000-01-01", "20200101", "2020-01-01 "]:
+            with self.assertRaises(ValueError):
+                parse_date(value)
+
+    def test_same_as_strptime(self):
+        generator = random.Random(0)
+        characters = "0123456789:- ١"
+        values = []
+        for _ in range(5000):
+            values.append(
+                "%02d:%02d:%02d" % (generator.randint(0, 99), generator.randint(0, 99), generator.randint(0, 99))
+            )
+            values.append(
+                "%04d-%02d-%02d" % (generator.randint(0, 2100), generator.randint(0, 14), generator.randint(0, 33))
+            )
+            values.append("".join(generator.choice(characters) for _ in range(generator.randint(0, 11))))
+
+        expected_times = [strptime(value, "%H:%M:%S") for value in values]
+        expected_dates = [strptime(value, "%Y-%m-%d") for value in values]
+        self.assertEqual(expected_times, parse_time_batch(values))
+        self.assertEqual(expected_dates, parse_date_batch(values))
+        for value, expected_time, expected_date in zip(values, expected_times, expected_dates):
+            for parse, expected in [(parse_time, expected_time), (parse_date, expected_date)]:
+                try:
+                    result = parse(value)
+                except ValueError:
+                    result = None
+                self.assertEqual(expected, result, value)
@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+import numpy
+
+from input_validator.utils import UTM_ARRAY_TOLERANCE, utm_to_wsg84, utm_to_wsg84_array
+
+
+class UtmToWsg84Test(TestCase):
+    def test_scalar_outputs(self):
+        # bounding boxes and stored points are compared to these exact values
+        for point, expected in [
+            ((338029, 6306246), (-33.37083676362541, -70.74108491315275)),
+            ((250000, 6200000), (-34.31110970462585, -71.7167292189491)),
+            ((450000, 6350000), (-32.98724437531445, -69.5351609827837)),
+            ((346000.5, 6290000.25), (-33.51848118057495, -70.65821363210046)),
+            ((317177, 6318519), (-33.25685008064583, -70.9626409159279)),
+        ]:
+            with self.subTest(point=point):
+                self.assertEqual(expected, utm_to_wsg84(*point))
+
+    def test_array_matches_scalar(self):
+        generator = numpy.random.default_rng(0)
+        east = generator.uniform(250000, 450000, 5000)
+        north = generator.uniform(6200000, 6350000, 5000)
+
+        latitudes, longitudes = utm_to_wsg84_array(east, north)
+        for index in range(len(east)):
+            latitude, longitude = utm_to_wsg84(float(east[index]), float(north[index]))
+            self.assertLess(abs(latitudes[index] - latitude), UTM_ARRAY_TOLERANCE)
+            self.assertLess(abs(longitudes[index] - longitude), UTM_ARRAY_TOLERANCE)
+
+    def test_array_accepts_lists(self):
+        latitudes, longitudes = utm_to_wsg84_array([338029], [6306246])
+        self.assertAlmostEqual(-33.37083676362541, latitudes[0], places=12)
+        self.assertAlmostEqual(-70.74108491315275, longitudes[0], places=12)
+
+    def test_scalar_is_memoized(self):
+        utm_to_wsg84.cache_clear()
+        utm_to_wsg84(338029, 6306246)
+        utm_to_wsg84(338029, 6306246)
+        self.assertEqual(1, utm_to_wsg84.cache_info().hits)
@@ -32,6 +32,8 @@ from input_validator.validators import (
     DateConsistencyValidator,
     CompleteYearFileConsistencyValidator,
 )
+from input_validator.chunks import RowChunk
+from input_validator.storage import StorageList
 
 
 class Dummy:
@@ -301,7 +303,8 @@ class MultiValidatorTest(ValidatorTest):
         self.assertFalse(validator.apply(row))
         error_message = {
             "cols": "ID",
-            "message": "La variable '0' está duplicada en la fila 3, columna ID.",
+            "message": "La variable '0' está duplicada en la fila 3, columna ID, "
+            "primera aparición en la fila 2.",
             "name": "Valor duplicado",
             "row": 3,
             "type": "formato",
@@ -310,6 +313,27 @@ class MultiValidatorTest(ValidatorTest):
 
         self.assertEqual(FunType.ROW, validator.get_fun_type())
 
+    def test_duplicate_value_validator_composite_key(self):
+        header = ["SERVICIO", "SENTIDO", "COMUNA"]
+        validator = DuplicateValueValidator(
+            {"header": header, "col_indexes": [0, 1]}
+        )
+        self.assertTrue(validator.apply(["T201", "I", "NUNOA"]))
+        self.assertTrue(validator.apply(["T201", "R", "NUNOA"]))
+        self.assertTrue(validator.apply(["T202", "I", "NUNOA"]))
+
+        # wrong case
+        self.assertFalse(validator.apply(["T201", "R", "MAIPU"]))
+        error_message = {
+            "cols": ["SERVICIO", "SENTIDO"],
+            "message": "Las variables 'T201, R' están duplicadas en la fila 5, columnas "
+            "SERVICIO, SENTIDO, primera aparición en la fila 3.",
+            "name": "Valor duplicado",
+            "row": 5,
+            "type": "formato",
+        }
+        self.assertEqual(error_message, validator.get_error())
+
     def test_not_empty_row_validator(self):
         # base case
         row = ["0", "NUNOA"]
@@ -650,6 +674,11 @@ class MultiValidatorTest(ValidatorTest):
 
         self.assertEqual(FunType.ROW, validator.get_fun_type())
 
+        # batch case
+        self.assertEqual(
+            [True, True, False], validator.match_batch(["BC1111", "BCBC11", "BXBXBX"])
+        )
+
     def test_numeric_domain_value_validator(self):
         # base case
         header = [
@@ -789,6 +818,7 @@ class MultiValidatorTest(ValidatorTest):
         validator.apply(row)
         expected_storage = ["NUNOA", "SANTIAGO"]
         self.assertEqual(expected_storage, dummy_object.storage["communes"])
+        self.assertIsInstance(dummy_object.storage["communes"], StorageList)
         expected_error = {
             "cols": "",
             "message": "Error al almacenar valor",
@@ -866,6 +896,39 @@ class MultiValidatorTest(ValidatorTest):
         self.assertEqual(expected_error, validator.get_error())
         self.assertEqual(FunType.ROW, validator.get_fun_type())
 
+        # batch case
+        self.assertEqual(
+            [True, False, False, False],
+            validator.contains_batch(
+                ["338029", "28029", "x", "338029"], ["6306246", "1006246", "6306246", ""]
+            ).tolist(),
+        )
+
+    def test_bounding_box_border_in_batch(self):
+        # the array conversion of the point is inside the box in its last
+        # digit, utm_to_wsg84 puts it on the border
+        latitude = -33.25685008064583
+        validator = BoundingBoxValueValidator(
+            {
+                "header": ["X", "Y"],
+                "x_coordinate_index": 0,
+                "y_coordinate_index": 1,
+                "coordinate_system": "utm",
+                "bounding_box": [
+                    [latitude, -72],
+                    [latitude + 1, -72],
+                    [latitude + 1, -69],
+                    [latitude, -69],
+                ],
+            }
+        )
+        self.assertEqual((latitude, -70.9626409159279), utm_to_wsg84(317177, 6318519))
+        self.assertFalse(validator.apply(["317177", "6318519"]))
+        self.assertEqual(
+            [False, True],
+            validator.contains_batch(["317177", "450000"], ["6318519", "6350000"]).tolist(),
+        )
+
     def test_utm_to_wsg84(self):
         test_case = [338029, 6306246]
         expected_res = (-33.37083676362541, -70.74108491315275)
@@ -1059,6 +1122,42 @@ class MultiValidatorTest(ValidatorTest):
 
         self.assertEqual(FunType.STORAGE, validator.get_fun_type())
 
+    def test_check_store_col_dict_values_validator_as_bounding_box(self):
+        dummy_object = Dummy()
+        dummy_object.storage["zone"] = {
+            "zonas_6": [
+                ["340000", "6290000"],
+                ["360000", "6290000"],
+                ["360000", "6310000"],
+            ],
+        }
+        header = ["ZONA", "LATITUD", "LONGITUD"]
+        validator = CheckStoreColDictValuesValidator(
+            {
+                "header": header,
+                "key_name": "zonas_6",
+                "value_indexes": [1, 2],
+                "storage_name": "zone",
+                "data_validator": dummy_object,
+                "transform_data": "wsg84_to_utm_as_bounding_box",
+            }
+        )
+
+        self.assertTrue(validator.apply(["zonas_6", "-33.45", "-70.52"]))
+        self.assertFalse(validator.apply(["zonas_6", "-33.35", "-70.62"]))
+        polygon = validator.get_zone_polygon("zonas_6", validator.get_storage_key())
+        self.assertIs(
+            polygon, validator.get_zone_polygon("zonas_6", validator.get_storage_key())
+        )
+        self.assertEqual(
+            [True, False],
+            validator.zone_contains_batch(["-33.45", "-33.35"], ["-70.52", "-70.62"]).tolist(),
+        )
+
+        # the polygon is built again when the zone changes
+        dummy_object.storage["zone"]["zonas_6"].append(["340000", "6310000"])
+        self.assertTrue(validator.apply(["zonas_6", "-33.35", "-70.62"]))
+
     def test_check_col_storage_multi_value(self):
         # base case
         dummy_object = Dummy()
@@ -1688,6 +1787,86 @@ class MultiValidatorTest(ValidatorTest):
         self.assertEqual(error_message, validator.get_error())
 
 
+class ColumnValidatorTest(ValidatorTest):
+    def test_apply_batch_matches_apply(self):
+        header = ["ID", "SENTIDO", "VALOR"]
+        rows = [
+            ["1", "I", "10"],
+            ["2", "X", "10"],
+            ["3"],
+            ["4", "R", "200"],
+            ["5", "R", ""],
+            ["6", "R", ""],
+        ]
+        for build in [
+            lambda: StringDomainValueValidator(
+                {"header": header, "col_indexes": [1], "domain": ["I", "R"]}
+            ),
+            lambda: NumericRangeValueValidator(
+                {"header": header, "col_indexes": [2], "lower_bound": 0, "upper_bound": 100}
+            ),
+            lambda: RegexValueValidator(
+                {"header": header, "col_index": 2, "regex": "^[0-9]+$", "regex_name": "entero"}
+            ),
+            lambda: TimeValueValidator({"header": header, "col_indexes": [1, 2]}),
+            lambda: GreaterThanValueValidator(
+                {"header": header, "upper_col": 2, "lower_col": 0, "type": "string"}
+            ),
+            lambda: NotEmptyValueValidator(
+                {
+                    "header": header,
+                    "col_indexes": [2],
+                    "conditions_to_ignore_row": [[1, "==", "R"], [0, "==", "5"]],
+                }
+            ),
+        ]:
+            row_validator = build()
+            expected = [
+                row_validator.get_error() for row in rows if not row_validator.apply(row)
+            ]
+
+            validator = build()
+            chunk = RowChunk(rows)
+            failed_offsets = validator.apply_batch(chunk)
+            errors = [validator.get_batch_error(chunk, offset) for offset in failed_offsets]
+            self.assertEqual(expected, errors)
+            self.assertEqual(row_validator.row_counter, validator.row_counter)
+
+        # a bad operator is reported by apply
+        validator = NotEmptyValueValidator(
+            {"header": header, "col_indexes": [2], "conditions_to_ignore_row": [[1, "!=", "R"]]}
+        )
+        self.assertIsNone(validator.apply_batch(RowChunk(rows)))
+
+    def test_compile_apply_short_rows(self):
+        header = ["ID", "SENTIDO", "VALOR"]
+        validator = StringDomainValueValidator(
+            {"header": header, "col_indexes": [1, 2], "domain": ["I", "R"]}
+        )
+        self.assertEqual(3, validator.required_width)
+        apply = validator.compile_apply()
+
+        self.assertFalse(validator.apply(["1"]))
+        self.assertEqual(
+            {
+                "name": "Fila inválida",
+                "type": "formato",
+                "message": "Columnas faltantes en la fila 1, columnas SENTIDO, VALOR.",
+                "row": 1,
+                "cols": ["SENTIDO", "VALOR"],
+            },
+            validator.get_error(),
+        )
+
+        # a wide row after a short one does not keep the missing columns
+        self.assertFalse(apply(["2", "X", "R"]))
+        self.assertEqual(
+            "Existe un valor incorrecto en la fila 2, columna SENTIDO. Los valores solo pueden ser '['I', 'R']'",
+            validator.get_error()["message"],
+        )
+        self.assertTrue(apply(["3", "I", "R"]))
+
+
 class CompareValueValidatorTest(ValidatorTest):
     def setUp(self):
         header = ["Ano", "Mes", "Fecha", "Tipo_Dia", "Dia", "Observacion"]